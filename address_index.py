@@ -0,0 +1,124 @@
+"""
+Canonical address key index for Manager Wizard.
+
+Provides:
+- Exact lookup from normalized street ("1234 oak dr") to homeowner accounts
+- Match-key lookup (street number + first street word) as the next tier
+- Street-name lookup for addresses typed without a street number
+- JSON serialization so the index can be persisted and shared by instances
+
+The index is precomputed from every cr258_property_address value, so
+"1234 Oak Dr" and "1234 Oak Drive" resolve through one dict lookup before
+any Dataverse contains() filter or fuzzy scoring runs.
+"""
+
+import time
+from dataclasses import replace
+from typing import Dict, Iterable, List, Optional
+
+from address_utils import ParsedAddress, cached_parse_address
+
+
+INDEX_VERSION = 1
+
+# Cap on accounts returned per lookup (keeps the follow-up OData filter short)
+MAX_LOOKUP_ACCOUNTS = 50
+
+
+def _add(index: Dict[str, List[str]], key: str, account: str) -> None:
+    """Append account to index[key], skipping empty keys and duplicates."""
+    if not key:
+        return
+    bucket = index.setdefault(key, [])
+    if account not in bucket:
+        bucket.append(account)
+
+
+def street_name_key(parsed: ParsedAddress) -> str:
+    """Key for the street-name index: directional + name + canonical type."""
+    return replace(parsed, street_number='', street_number_suffix='').normalized_street()
+
+
+class AddressIndex:
+    """Lookup tables from canonical address keys to homeowner account numbers."""
+
+    def __init__(self,
+                 by_street: Optional[Dict[str, List[str]]] = None,
+                 by_match_key: Optional[Dict[str, List[str]]] = None,
+                 by_street_name: Optional[Dict[str, List[str]]] = None,
+                 built_at: Optional[float] = None,
+                 record_count: int = 0):
+        self.by_street = by_street or {}
+        self.by_match_key = by_match_key or {}
+        self.by_street_name = by_street_name or {}
+        self.built_at = built_at or time.time()
+        self.record_count = record_count
+
+    @classmethod
+    def build(cls, records: Iterable[dict]) -> 'AddressIndex':
+        """Build the index from Dataverse homeowner rows."""
+        index = cls()
+        for rec in records:
+            account = rec.get('cr258_accountnumber')
+            address = rec.get('cr258_property_address')
+            if not account or not address:
+                continue
+            parsed = cached_parse_address(address)
+            index.record_count += 1
+            if parsed.street_number:
+                _add(index.by_street, parsed.normalized_street(), account)
+                _add(index.by_match_key, parsed.match_key(), account)
+            if parsed.street_name:
+                _add(index.by_street_name, street_name_key(parsed), account)
+                _add(index.by_street_name, parsed.street_name.lower(), account)
+        return index
+
+    def lookup(self, parsed: ParsedAddress, limit: int = MAX_LOOKUP_ACCOUNTS) -> List[str]:
+        """
+        Return accounts for an address with a street number.
+        Exact normalized street wins; otherwise fall back to the match key
+        (number + first street word), which tolerates a wrong or missing type.
+        """
+        if not parsed.street_number:
+            return []
+        accounts = self.by_street.get(parsed.normalized_street())
+        if not accounts and parsed.street_name:
+            accounts = self.by_match_key.get(parsed.match_key())
+        return (accounts or [])[:limit]
+
+    def lookup_street_name(self, parsed: ParsedAddress, limit: int = MAX_LOOKUP_ACCOUNTS) -> List[str]:
+        """Return accounts on a street for an address typed without a number."""
+        if not parsed.street_name:
+            return []
+        accounts = self.by_street_name.get(street_name_key(parsed))
+        if not accounts:
+            accounts = self.by_street_name.get(parsed.street_name.lower())
+        return (accounts or [])[:limit]
+
+    def age_seconds(self) -> float:
+        """Seconds since the index was built."""
+        return time.time() - self.built_at
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON persistence."""
+        return {
+            'version': INDEX_VERSION,
+            'built_at': self.built_at,
+            'record_count': self.record_count,
+            'by_street': self.by_street,
+            'by_match_key': self.by_match_key,
+            'by_street_name': self.by_street_name,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Optional['AddressIndex']:
+        """Restore a persisted index. Returns None for an incompatible version."""
+        if not data or data.get('version') != INDEX_VERSION:
+            return None
+        return cls(
+            by_street=data.get('by_street'),
+            by_match_key=data.get('by_match_key'),
+            by_street_name=data.get('by_street_name'),
+            built_at=data.get('built_at'),
+            record_count=data.get('record_count', 0),
+        )
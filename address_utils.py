@@ -12,7 +12,8 @@ Date: 2026-01-28
 """
 
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from functools import lru_cache
 from typing import Optional, Dict, List, Tuple, Any
 
 
@@ -165,14 +166,17 @@ UNIT_TYPE_MAPPINGS: Dict[str, str] = {
 MIN_ADDRESS_MATCH_SCORE = 0.70  # 70% similarity required for exact match
 FUZZY_ADDRESS_MATCH_SCORE = 0.55  # 55-70% = fuzzy match (shown with warning)
 
+# Parsed addresses kept in memory (covers every address in the homeowner table)
+PARSE_CACHE_SIZE = 50000
+
 
 # =============================================================================
 # PARSED ADDRESS DATA CLASS
 # =============================================================================
 
-@dataclass
+@dataclass(frozen=True)
 class ParsedAddress:
-    """Structured representation of a parsed address."""
+    """Structured representation of a parsed address (immutable: cached instances are shared)."""
     original: str
     street_number: str
     street_number_suffix: str
@@ -227,6 +231,63 @@ class ParsedAddress:
         }
 
 
+# =============================================================================
+# PARSER LOOKUP TABLES
+# =============================================================================
+
+# Primary street types that should END the street name
+# (these are unambiguous and shouldn't appear mid-name)
+PRIMARY_STREET_TYPES = frozenset({
+    'st', 'street', 'ave', 'avenue', 'blvd', 'boulevard',
+    'dr', 'drive', 'ln', 'lane', 'rd', 'road', 'ct', 'court',
+    'cir', 'circle', 'way', 'pl', 'place', 'trl', 'trail',
+    'pkwy', 'parkway', 'ter', 'terrace', 'hwy', 'highway',
+    'xing', 'crossing', 'loop', 'run', 'path', 'bend', 'pass'
+})
+
+# Secondary types that could be part of street names
+# (e.g., "Falcon Pointe Blvd" - Pointe is part of name, Blvd is type)
+SECONDARY_STREET_WORDS = frozenset({
+    'pointe', 'point', 'pt', 'creek', 'crk', 'ridge', 'rdg',
+    'oaks', 'hills', 'hls', 'heights', 'hts', 'vista', 'vis',
+    'valley', 'vly', 'view', 'vw', 'estates', 'ests', 'ranch',
+    'rnch', 'springs', 'spgs', 'meadow', 'mdw', 'meadows', 'mdws',
+    'cove', 'cv'
+})
+
+# Token classes for the street scanner (lowercased token -> class)
+TOKEN_PRIMARY_TYPE = 1
+TOKEN_SECONDARY_WORD = 2
+TOKEN_DIRECTIONAL = 3
+
+STREET_TOKEN_CLASSES: Dict[str, int] = {
+    **{word: TOKEN_DIRECTIONAL for word in DIRECTIONAL_MAPPINGS},
+    **{word: TOKEN_SECONDARY_WORD for word in SECONDARY_STREET_WORDS},
+    **{word: TOKEN_PRIMARY_TYPE for word in PRIMARY_STREET_TYPES},
+}
+
+# Precompiled patterns (module level so every parser instance shares them)
+_ZIP_CONTEXT_RE = re.compile(r'(?:,\s*|\bTX\s*|\bTexas\s*)(\d{5})(?:-\d{4})?\b', re.IGNORECASE)
+_ZIP_STRIP_RE = re.compile(r'(?:,\s*)?\d{5}(?:-\d{4})?\s*(?:,|$)')
+_TX_ZIP_RE = re.compile(r'\bTX\s+\d{5}(?:-\d{4})?\b', re.IGNORECASE)
+_STATE_STRIP_RE = re.compile(r',?\s*(TX|Texas)\b', re.IGNORECASE)
+_COMMA_RUN_RE = re.compile(r',+')
+
+# Raw token -> (street token class, is directional) memo; bounded by clearing
+_TOKEN_INFO_CACHE: Dict[str, Tuple[Optional[int], bool]] = {}
+_TOKEN_INFO_CACHE_SIZE = 20000
+
+
+def _token_info(word: str) -> Tuple[Optional[int], bool]:
+    """Classify a raw token once: (class of word stripped of '.,', directional when stripped of '.')."""
+    if len(_TOKEN_INFO_CACHE) >= _TOKEN_INFO_CACHE_SIZE:
+        _TOKEN_INFO_CACHE.clear()
+    lowered = word.lower()
+    info = (STREET_TOKEN_CLASSES.get(lowered.rstrip('.,')), lowered.rstrip('.') in DIRECTIONAL_MAPPINGS)
+    _TOKEN_INFO_CACHE[word] = info
+    return info
+
+
 # =============================================================================
 # ADDRESS PARSER
 # =============================================================================
@@ -250,17 +311,39 @@ class AddressParser:
         'jarrell', 'liberty hill', 'marble falls', 'spicewood', 'wimberley'
     }
 
-    def __init__(self):
-        """Initialize parser with compiled regex patterns."""
-        self._street_number_re = re.compile(self.STREET_NUMBER_PATTERN)
-        self._unit_re = re.compile(self.UNIT_PATTERN, re.IGNORECASE)
-        self._zip_re = re.compile(self.ZIP_PATTERN)
-        self._state_re = re.compile(self.STATE_PATTERN, re.IGNORECASE)
+    # Shared compiled state (built once per process, not per instance)
+    _street_number_re = re.compile(STREET_NUMBER_PATTERN)
+    _unit_re = re.compile(UNIT_PATTERN, re.IGNORECASE)
+    _zip_re = re.compile(ZIP_PATTERN)
+    _state_re = re.compile(STATE_PATTERN, re.IGNORECASE)
+    # One longest-first alternation anchored on commas replaces the per-city loop.
+    # A character trie walked from each comma gives the same answers but
+    # measured slower in CPython (4.4 us vs 2.6 us for a comma-separated
+    # address), since the regex engine walks its alternation in C
+    _city_re = re.compile(
+        r',\s*(' + '|'.join(re.escape(c) for c in sorted(KNOWN_CITIES, key=len, reverse=True)) + r')\b'
+    )
+    _city_strip_res = {
+        city: re.compile(rf',\s*{re.escape(city)}\b', re.IGNORECASE)
+        for city in KNOWN_CITIES
+    }
+
+    def _find_city(self, working_lower: str) -> str:
+        """
+        Return the longest known city that follows a comma (", Round Rock").
+        Equal-length cities resolve to the leftmost one (the old per-city loop
+        depended on set iteration order, which varies between processes).
+        """
+        best = ''
+        for match in self._city_re.finditer(working_lower):
+            if len(match.group(1)) > len(best):
+                best = match.group(1)
+        return best
 
     def parse(self, address: str) -> ParsedAddress:
         """Parse an address string into components."""
         if not address:
-            return self._empty_address('')
+            return EMPTY_ADDRESS
 
         original = address
         working = address.strip()
@@ -268,41 +351,48 @@ class AddressParser:
         # Extract and remove zip code
         # Zip codes appear after city/state, not at the start
         # Pattern: comma or state abbreviation followed by whitespace and 5 digits
+        # Cheap substring pre-checks skip the regexes for plain street addresses;
+        # non-ASCII input always takes the regex path (case folding differs)
+        is_ascii = working.isascii()
+        lower = working.lower()
+
         zip_code = ''
-        # Look for zip at end or after TX/state
-        zip_pattern = r'(?:,\s*|\bTX\s*|\bTexas\s*)(\d{5})(?:-\d{4})?\b'
-        zip_match = re.search(zip_pattern, working, re.IGNORECASE)
+        zip_match = None
+        if not is_ascii or ',' in working or 'tx' in lower or 'texas' in lower:
+            zip_match = _ZIP_CONTEXT_RE.search(working)
         if zip_match:
             zip_code = zip_match.group(1)
             # Remove zip code patterns (may appear multiple times in duplicated addresses)
-            working = re.sub(r'(?:,\s*)?\d{5}(?:-\d{4})?\s*(?:,|$)', '', working)
-            working = re.sub(r'\bTX\s+\d{5}(?:-\d{4})?\b', 'TX', working, flags=re.IGNORECASE)
+            working = _ZIP_STRIP_RE.sub('', working)
+            working = _TX_ZIP_RE.sub('TX', working)
 
         # Extract and remove state
         state = ''
-        state_match = self._state_re.search(working)
-        if state_match:
+        if zip_match:
+            lower = working.lower()
+        if (not is_ascii or 'tx' in lower or 'texas' in lower) and self._state_re.search(working):
             state = 'TX'
-            working = re.sub(r',?\s*(TX|Texas)\b', '', working, flags=re.IGNORECASE)
+            working = _STATE_STRIP_RE.sub('', working)
 
         # Extract and remove city
-        # Only remove city when it appears after a comma or at the end
+        # Only remove city when it appears after a comma
         # (to avoid removing "The Hills Dr" street name when city is also "The Hills")
         city = ''
-        working_lower = working.lower()
-        for known_city in sorted(self.KNOWN_CITIES, key=len, reverse=True):
-            # Look for city after comma, or city + state/zip at end
-            city_pattern = rf',\s*{re.escape(known_city)}\b'
-            if re.search(city_pattern, working_lower):
+        if ',' in working:
+            known_city = self._find_city(working.lower())
+            if known_city:
                 city = known_city.title()
-                # Only remove city when it appears after a comma
-                working = re.sub(city_pattern, '', working, flags=re.IGNORECASE)
-                break
+                working = self._city_strip_res[known_city].sub('', working)
 
         # Extract and remove unit
         unit_type = ''
         unit_number = ''
-        unit_match = self._unit_re.search(working)
+        unit_match = None
+        if state or city:
+            lower = working.lower()
+        if not is_ascii or ('#' in lower or 'unit' in lower or 'apt' in lower or 'apartment' in lower
+                            or 'suite' in lower or 'ste' in lower or 'room' in lower or 'rm' in lower):
+            unit_match = self._unit_re.search(working)
         if unit_match:
             unit_number = unit_match.group(1)
             # Determine unit type
@@ -317,14 +407,17 @@ class AddressParser:
                 unit_type = 'unit'
             working = working[:unit_match.start()] + working[unit_match.end():]
 
-        # Clean up remaining address
-        working = re.sub(r'\s+', ' ', working).strip()
-        working = re.sub(r'^,\s*|,\s*$', '', working)
-        working = re.sub(r',+', ',', working)
-        working = working.strip(' ,')
+        # Clean up remaining address: collapse whitespace and comma runs, trim edges
+        # (without commas, splitting on whitespace is already the cleaned form)
+        if ',' in working:
+            working = ' '.join(working.split())
+            if ',,' in working:
+                working = _COMMA_RUN_RE.sub(',', working)
+            working = working.strip(' ,')
 
         # Parse street components
         parts = working.split()
+        n_parts = len(parts)
 
         street_number = ''
         street_number_suffix = ''
@@ -336,57 +429,40 @@ class AddressParser:
         i = 0
 
         # Street number (required for most addresses)
-        if parts and re.match(r'^\d+', parts[0]):
+        if parts:
             num_match = self._street_number_re.match(parts[0])
             if num_match:
-                street_number = num_match.group(1)
-                street_number_suffix = num_match.group(2) or ''
-            i += 1
+                street_number, street_number_suffix = num_match.groups('')
+                i += 1
+
+        infos = list(map(_TOKEN_INFO_CACHE.get, parts))
+        if None in infos:
+            infos = [info or _token_info(word) for info, word in zip(infos, parts)]
 
         # Pre-directional (optional)
-        if i < len(parts) and parts[i].lower().rstrip('.') in DIRECTIONAL_MAPPINGS:
+        if i < n_parts and infos[i][1]:
             pre_directional = parts[i].rstrip('.')
             i += 1
 
-        # Primary street types that should END the street name
-        # (these are unambiguous and shouldn't appear mid-name)
-        PRIMARY_STREET_TYPES = {
-            'st', 'street', 'ave', 'avenue', 'blvd', 'boulevard',
-            'dr', 'drive', 'ln', 'lane', 'rd', 'road', 'ct', 'court',
-            'cir', 'circle', 'way', 'pl', 'place', 'trl', 'trail',
-            'pkwy', 'parkway', 'ter', 'terrace', 'hwy', 'highway',
-            'xing', 'crossing', 'loop', 'run', 'path', 'bend', 'pass'
-        }
-
-        # Secondary types that could be part of street names
-        # (e.g., "Falcon Pointe Blvd" - Pointe is part of name, Blvd is type)
-        SECONDARY_STREET_WORDS = {
-            'pointe', 'point', 'pt', 'creek', 'crk', 'ridge', 'rdg',
-            'oaks', 'hills', 'hls', 'heights', 'hts', 'vista', 'vis',
-            'valley', 'vly', 'view', 'vw', 'estates', 'ests', 'ranch',
-            'rnch', 'springs', 'spgs', 'meadow', 'mdw', 'meadows', 'mdws',
-            'cove', 'cv'
-        }
-
         # Street name and type - scan forward looking for end of street
-        while i < len(parts):
+        while i < n_parts:
             word = parts[i]
-            word_lower = word.lower().rstrip('.,')
+            token_class = infos[i][0]
 
             # Is this a primary street type? (definite end of street name)
-            if word_lower in PRIMARY_STREET_TYPES:
+            if token_class == TOKEN_PRIMARY_TYPE:
                 street_type = word.rstrip('.,')
                 i += 1
                 # Check for post-directional after street type
-                if i < len(parts) and parts[i].lower().rstrip('.') in DIRECTIONAL_MAPPINGS:
+                if i < n_parts and infos[i][1]:
                     post_directional = parts[i].rstrip('.')
                     i += 1
                 break
 
             # Is this a secondary street word?
             # Only treat as street type if it's the LAST word (no more parts after)
-            elif word_lower in SECONDARY_STREET_WORDS:
-                if i == len(parts) - 1:
+            elif token_class == TOKEN_SECONDARY_WORD:
+                if i == n_parts - 1:
                     # Last word and it's a secondary type - treat as type
                     street_type = word.rstrip('.,')
                     i += 1
@@ -397,7 +473,7 @@ class AddressParser:
                     i += 1
 
             # Check if this is a post-directional without explicit street type
-            elif word_lower.rstrip('.') in DIRECTIONAL_MAPPINGS and i == len(parts) - 1:
+            elif token_class == TOKEN_DIRECTIONAL and i == n_parts - 1:
                 post_directional = word.rstrip('.')
                 break
 
@@ -407,37 +483,33 @@ class AddressParser:
 
         street_name = ' '.join(street_name_parts)
 
+        # Positional in field order: keyword arguments cost ~1.5 us per parse here
         return ParsedAddress(
-            original=original,
-            street_number=street_number,
-            street_number_suffix=street_number_suffix,
-            pre_directional=pre_directional,
-            street_name=street_name,
-            street_type=street_type,
-            post_directional=post_directional,
-            unit_type=unit_type,
-            unit_number=unit_number,
-            city=city,
-            state=state,
-            zip_code=zip_code
+            original, street_number, street_number_suffix, pre_directional, street_name,
+            street_type, post_directional, unit_type, unit_number, city, state, zip_code
         )
 
     def _empty_address(self, original: str) -> ParsedAddress:
         """Return an empty ParsedAddress."""
-        return ParsedAddress(
-            original=original,
-            street_number='',
-            street_number_suffix='',
-            pre_directional='',
-            street_name='',
-            street_type='',
-            post_directional='',
-            unit_type='',
-            unit_number='',
-            city='',
-            state='',
-            zip_code=''
-        )
+        if not original:
+            return EMPTY_ADDRESS
+        return replace(EMPTY_ADDRESS, original=original)
+
+
+EMPTY_ADDRESS = ParsedAddress(
+    original='',
+    street_number='',
+    street_number_suffix='',
+    pre_directional='',
+    street_name='',
+    street_type='',
+    post_directional='',
+    unit_type='',
+    unit_number='',
+    city='',
+    state='',
+    zip_code=''
+)
 
 
 # =============================================================================
@@ -649,6 +721,17 @@ def parse_address(address: str) -> ParsedAddress:
     return get_address_parser().parse(address)
 
 
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def cached_parse_address(address: str) -> ParsedAddress:
+    """
+    Parse an address string, memoizing the result.
+    AddressParser.parse is deterministic, so repeated candidate addresses
+    (the same Dataverse rows come back for many searches) are parsed once.
+    The returned ParsedAddress is shared - treat it as read-only.
+    """
+    return get_address_parser().parse(address)
+
+
 def compare_addresses(addr1: str, addr2: str) -> float:
     """
     Compare two address strings and return similarity score.
@@ -9,15 +9,39 @@ import re
 import time
 import json
 import uuid
+import hashlib
+import queue
 import logging
 import threading
 from datetime import datetime, timedelta, timezone
 from functools import wraps
-from flask import Flask, jsonify, request, render_template, redirect, url_for, session, Response
-from flask_session import Session
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from flask import (
+    Flask, jsonify, request, render_template, redirect, url_for, session, Response, g, stream_with_context
+)
 import msal
 from google.cloud import storage as gcs_storage
 
+from dax_batcher import DaxBatcher
+from session_backend import configure_session
+from health import ProbeRunner, InflightTracker, hit_ratio
+from policy_facts import FACT_CATEGORIES, FactStore
+from reranker import LocalReranker, community_match_score
+from document_metadata import DocumentMetadataCache, has_date_intent
+from semantic_cache import SemanticCache
+from src.claude_stream import stream_claude_json, dispatcher as claude_dispatcher
+from src.context_builder import build_compact_context
+from src.optimized_extraction import extract_answer_map_reduce
+from src.rule_extractors import extract_rule_answer
+import metrics
+from metrics import instrument_backend
+from resilience import (
+    with_deadline, set_deadline, reset_deadline, backend_timeout, has_budget, remaining,
+    mark_degraded, degraded_stages, submit, run_cpu_bound,
+    CircuitBreaker, CircuitOpenError, hedged_call
+)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -27,14 +51,15 @@ app = Flask(__name__)
 # =============================================================================
 # SESSION CONFIGURATION
 # =============================================================================
-app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', str(uuid.uuid4()))
-app.config['SESSION_TYPE'] = 'filesystem'
+# Required for the default cookie sessions; left unset when missing so session_backend falls back to server-side files
+app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY')
 app.config['SESSION_PERMANENT'] = False
 app.config['SESSION_FILE_DIR'] = '/tmp/flask_session'
 # Cookie settings for Teams iframe embedding
 app.config['SESSION_COOKIE_SAMESITE'] = 'None'
 app.config['SESSION_COOKIE_SECURE'] = True
-Session(app)
+# cookie (default) | redis | filesystem - see session_backend.py
+SESSION_BACKEND = configure_session(app)
 
 
 @app.after_request
@@ -46,6 +71,44 @@ def add_security_headers(response):
     response.headers.pop('X-Frame-Options', None)
     return response
 
+
+# Concurrent requests this worker can serve (mirrors gunicorn.conf.py)
+WORKER_CONCURRENCY = int(
+    os.environ.get('GUNICORN_WORKER_CONNECTIONS', 500)
+    if os.environ.get('GUNICORN_WORKER_CLASS', 'gevent') == 'gevent'
+    else os.environ.get('GUNICORN_THREADS', 8)
+)
+_inflight = InflightTracker(WORKER_CONCURRENCY)
+
+http_requests = metrics.Counter('mw_http_requests', 'HTTP requests by route, method and status',
+                                ('route', 'method', 'status'))
+http_latency = metrics.Histogram('mw_http_request_duration_seconds', 'HTTP request latency by route',
+                                 ('route', 'method'))
+
+
+@app.before_request
+def track_request_start():
+    g.request_started = time.perf_counter()
+    _inflight.start()
+
+
+@app.after_request
+def track_request_status(response):
+    g.response_status = response.status_code
+    return response
+
+
+@app.teardown_request
+def track_request_end(exc):
+    _inflight.finish()
+    started = g.pop('request_started', None)
+    if started is None:
+        return
+    # Route template, not the raw path, keeps label cardinality bounded
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    http_latency.observe(time.perf_counter() - started, route, request.method)
+    http_requests.inc(route, request.method, str(g.get('response_status', 500)))
+
 # =============================================================================
 # MICROSOFT AUTH CONFIGURATION
 # =============================================================================
@@ -138,6 +201,15 @@ def get_supabase():
     return _supabase_client
 
 
+# Search events are written by one background worker; the queue is bounded so
+# a Supabase outage drops events instead of growing memory
+ANALYTICS_QUEUE_MAX = int(os.environ.get('ANALYTICS_QUEUE_MAX', 1000))
+_analytics_queue = queue.Queue(maxsize=ANALYTICS_QUEUE_MAX)
+_analytics_stats = {'sent': 0, 'failed': 0, 'dropped': 0}
+_analytics_worker = None
+_analytics_worker_lock = threading.Lock()
+
+
 def log_search_analytics(
     query_raw,
     detected_type='auto',
@@ -153,40 +225,61 @@ def log_search_analytics(
     error_type=None,
     error_message=None
 ):
-    """Log search event to Supabase analytics (fire-and-forget in background thread)."""
-    def _log():
+    """Queue a search event for the Supabase analytics worker (never blocks the response)."""
+    # Read the session here - the worker thread has no request context
+    user = session.get('user') or {}
+    user_email = user.get('preferred_username', user.get('email', None))
+    user_name = user.get('name', None)
+    session_id = session.get('session_id') or str(uuid.uuid4())
+
+    event = {
+        'p_user_email': user_email,
+        'p_user_name': user_name,
+        'p_session_id': session_id,
+        'p_query_raw': query_raw,
+        'p_query_type': search_mode,
+        'p_detected_type': detected_type,
+        'p_community_filter': community_filter,
+        'p_community_detected': community_detected,
+        'p_homeowner_count': homeowner_count,
+        'p_document_count': document_count,
+        'p_has_ai_answer': has_ai_answer,
+        'p_ai_answer_text': (ai_answer_text or '')[:2000] if ai_answer_text else None,
+        'p_ai_answer_source': ai_answer_source,
+        'p_response_time_ms': response_time_ms
+    }
+    if not SUPABASE_SERVICE_KEY:
+        return
+    _ensure_analytics_worker()
+    try:
+        _analytics_queue.put_nowait(event)
+    except queue.Full:
+        _analytics_stats['dropped'] += 1
+
+
+def _ensure_analytics_worker():
+    global _analytics_worker
+    with _analytics_worker_lock:
+        if _analytics_worker is None or not _analytics_worker.is_alive():
+            _analytics_worker = threading.Thread(target=_analytics_loop, daemon=True)
+            _analytics_worker.start()
+
+
+def _analytics_loop():
+    """Drain the analytics queue into Supabase, one event at a time."""
+    while True:
+        event = _analytics_queue.get()
         supabase = get_supabase()
         if not supabase:
-            return
+            _analytics_stats['failed'] += 1
+            continue
         try:
-            # Get user from session
-            user = session.get('user', {}) if session else {}
-            user_email = user.get('preferred_username', user.get('email', None))
-            user_name = user.get('name', None)
-            session_id = session.get('session_id', str(uuid.uuid4())) if session else str(uuid.uuid4())
-
-            supabase.rpc('log_mw_search_event', {
-                'p_user_email': user_email,
-                'p_user_name': user_name,
-                'p_session_id': session_id,
-                'p_query_raw': query_raw,
-                'p_query_type': search_mode,
-                'p_detected_type': detected_type,
-                'p_community_filter': community_filter,
-                'p_community_detected': community_detected,
-                'p_homeowner_count': homeowner_count,
-                'p_document_count': document_count,
-                'p_has_ai_answer': has_ai_answer,
-                'p_ai_answer_text': (ai_answer_text or '')[:2000] if ai_answer_text else None,
-                'p_ai_answer_source': ai_answer_source,
-                'p_response_time_ms': response_time_ms
-            }).execute()
+            supabase.rpc('log_mw_search_event', event).execute()
+            _analytics_stats['sent'] += 1
         except Exception as e:
+            _analytics_stats['failed'] += 1
             logger.error(f"Analytics log failed: {e}")
 
-    # Fire and forget - don't block the response
-    threading.Thread(target=_log, daemon=True).start()
-
 # =============================================================================
 # ACTIVE COMMUNITIES (Whitelist - only show results from active clients)
 # =============================================================================
@@ -195,6 +288,14 @@ def log_search_analytics(
 ACTIVE_COMMUNITIES = []
 ACTIVE_COMMUNITY_NAMES = set()
 
+# Precomputed /api/communities payloads (rebuilt whenever the config loads)
+COMMUNITY_LIST_JSON = '{"communities": [], "count": 0}'
+COMMUNITY_LIST_ETAG = ''
+# Lowercased query substring -> autocomplete matches, already in priority order
+COMMUNITY_AUTOCOMPLETE_INDEX = {}
+AUTOCOMPLETE_INDEX_MAX_LEN = 40
+AUTOCOMPLETE_INDEX_MAX_RESULTS = 25
+
 def load_active_communities():
     """Load active communities from master config JSON."""
     global ACTIVE_COMMUNITIES, ACTIVE_COMMUNITY_NAMES
@@ -211,9 +312,61 @@ def load_active_communities():
                 if comm.get('short_name'):
                     ACTIVE_COMMUNITY_NAMES.add(comm['short_name'].lower())
             logger.info(f"Loaded {len(ACTIVE_COMMUNITIES)} active communities")
+        build_community_indexes()
     except Exception as e:
         logger.error(f"Failed to load active communities: {e}")
 
+
+def _autocomplete_priority(query_lower, short_lower, full_lower):
+    """4-tier autocomplete priority (1 = short name prefix ... 4 = full name substring), or 0."""
+    if short_lower.startswith(query_lower):
+        return 1
+    if full_lower.startswith(query_lower):
+        return 2
+    if query_lower in short_lower:
+        return 3
+    if query_lower in full_lower:
+        return 4
+    return 0
+
+
+def build_community_indexes():
+    """
+    Precompute the sorted community list (serialized once, with an ETag) and
+    a substring -> ranked matches index, so /api/communities never re-sorts
+    or scans every community per request.
+    """
+    global COMMUNITY_LIST_JSON, COMMUNITY_LIST_ETAG, COMMUNITY_AUTOCOMPLETE_INDEX
+
+    communities = [
+        {'name': comm['short_name'], 'full_name': comm.get('name', ''), 'code': comm.get('code', '')}
+        for comm in ACTIVE_COMMUNITIES if comm.get('short_name')
+    ]
+    communities.sort(key=lambda x: x['name'].lower())
+    list_json = json.dumps({'communities': communities, 'count': len(communities)})
+
+    index = {}
+    for comm in communities:
+        short_lower = comm['name'].lower()
+        full_lower = comm['full_name'].lower() if comm['full_name'] else ''
+        substrings = set()
+        for text in (short_lower, full_lower):
+            for start in range(len(text)):
+                for end in range(start + 2, min(len(text), start + AUTOCOMPLETE_INDEX_MAX_LEN) + 1):
+                    substrings.add(text[start:end])
+        for sub in substrings:
+            priority = _autocomplete_priority(sub, short_lower, full_lower)
+            if priority:
+                index.setdefault(sub, []).append(dict(comm, priority=priority))
+
+    for sub, matches in index.items():
+        matches.sort(key=lambda x: (x['priority'], x['name'].lower()))
+        del matches[AUTOCOMPLETE_INDEX_MAX_RESULTS:]
+
+    COMMUNITY_LIST_JSON = list_json
+    COMMUNITY_LIST_ETAG = hashlib.sha1(list_json.encode('utf-8')).hexdigest()
+    COMMUNITY_AUTOCOMPLETE_INDEX = index
+
 # Load on startup
 load_active_communities()
 
@@ -459,6 +612,12 @@ def get_autocomplete_matches(query, max_results=8):
         return []
 
     query_lower = query.lower().strip()
+
+    # Precomputed ranking covers every substring up to the index length cap
+    if len(query_lower) >= 2 and len(query_lower) <= AUTOCOMPLETE_INDEX_MAX_LEN \
+            and max_results <= AUTOCOMPLETE_INDEX_MAX_RESULTS:
+        return COMMUNITY_AUTOCOMPLETE_INDEX.get(query_lower, [])[:max_results]
+
     matches = []
 
     for comm in ACTIVE_COMMUNITIES:
@@ -508,6 +667,57 @@ COLUMNS = [
 # Token cache
 _token_cache = {'token': None, 'expires': 0}
 
+# =============================================================================
+# BACKEND CIRCUIT BREAKERS (fail fast while Dataverse / Azure Search are down)
+# =============================================================================
+# Each breaker watches a rolling window of call outcomes; once most recent
+# calls error out (or run slow) it opens and searches get an immediate
+# "unavailable" instead of every thread waiting out the full timeout.
+BREAKER_OPEN_SECONDS = float(os.environ.get('BREAKER_OPEN_SECONDS', 30))
+# Idempotent GETs that run past the backend's p95 get one backup request
+HEDGE_REQUESTS = os.environ.get('HEDGE_REQUESTS', 'true').lower() == 'true'
+
+_backend_breakers = {
+    'dataverse': CircuitBreaker('dataverse', open_seconds=BREAKER_OPEN_SECONDS),
+    'azure_search': CircuitBreaker('azure_search', open_seconds=BREAKER_OPEN_SECONDS),
+}
+# A hedged call runs its primary and its backup here, so the pool needs one
+# slot of each per concurrent request, so backups never queue behind the
+# primaries they are backing up.
+_hedge_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('HEDGE_WORKERS', 2 * WORKER_CONCURRENCY)),
+    thread_name_prefix='hedge'
+)
+
+
+def call_backend(name, send, hedge=False):
+    """
+    Run one backend HTTP request through its circuit breaker.
+    `send` performs the request and returns a requests.Response; 5xx/429
+    responses and exceptions count as failures. With hedge=True (idempotent
+    GETs only) a slow request gets a backup copy.
+    Raises CircuitOpenError while the breaker is open.
+    """
+    breaker = _backend_breakers[name]
+    if not breaker.allow():
+        raise CircuitOpenError(f"{name} unavailable (circuit open)")
+
+    start = time.monotonic()
+    try:
+        if hedge and HEDGE_REQUESTS:
+            resp = hedged_call(_hedge_executor, send, breaker, timeout=remaining())
+        else:
+            resp = send()
+    except Exception:
+        breaker.record(False, time.monotonic() - start)
+        raise
+    breaker.record(resp.status_code < 500 and resp.status_code != 429, time.monotonic() - start)
+    return resp
+
+
+def circuit_breaker_status():
+    return {name: breaker.snapshot() for name, breaker in _backend_breakers.items()}
+
 
 def get_dataverse_token():
     """Get access token for Dataverse API."""
@@ -540,6 +750,7 @@ def get_dataverse_token():
         return None
 
 
+@instrument_backend('dataverse', size=len, failed=lambda rows: rows is None)
 def query_dataverse(filter_expr, top=50):
     """Query Dataverse with OData filter."""
     import requests
@@ -562,12 +773,20 @@ def query_dataverse(filter_expr, top=50):
     }
 
     try:
-        resp = requests.get(url, headers=headers, params=params, timeout=15)
+        timeout = backend_timeout(15)
+        resp = call_backend(
+            'dataverse',
+            lambda: requests.get(url, headers=headers, params=params, timeout=timeout),
+            hedge=True
+        )
         if resp.status_code == 200:
             return resp.json().get('value', [])
         else:
             logger.error(f"Dataverse query failed: {resp.status_code} - {resp.text}")
             return None
+    except CircuitOpenError as e:
+        logger.warning(str(e))
+        return None
     except Exception as e:
         logger.error(f"Dataverse request failed: {e}")
         return None
@@ -578,6 +797,206 @@ def normalize_phone(phone):
     return re.sub(r'\D', '', phone)
 
 
+def query_dataverse_all(columns, filter_expr=None, page_size=5000):
+    """Page through every matching Dataverse row (follows @odata.nextLink)."""
+    import requests
+
+    token = get_dataverse_token()
+    if not token:
+        return None
+
+    url = f"{DATAVERSE_ENV_URL.rstrip('/')}/api/data/v9.2/{TABLE_NAME}"
+    params = {'$select': ','.join(columns)}
+    if filter_expr:
+        params['$filter'] = filter_expr
+    headers = {
+        'Authorization': f'Bearer {token}',
+        'Content-Type': 'application/json',
+        'OData-MaxVersion': '4.0',
+        'OData-Version': '4.0',
+        'Prefer': f'odata.maxpagesize={page_size}'
+    }
+
+    rows = []
+    try:
+        while url:
+            resp = requests.get(url, headers=headers, params=params, timeout=60)
+            if resp.status_code != 200:
+                logger.error(f"Dataverse paged query failed: {resp.status_code} - {resp.text[:200]}")
+                return None
+            data = run_cpu_bound(json.loads, resp.content)
+            rows.extend(data.get('value', []))
+            # nextLink already carries the query string
+            url = data.get('@odata.nextLink')
+            params = None
+        return rows
+    except Exception as e:
+        logger.error(f"Dataverse paged request failed: {e}")
+        return None
+
+
+# =============================================================================
+# HOMEOWNER SNAPSHOT (local address index)
+# =============================================================================
+# A slim copy of every homeowner row (account, owner, address, community),
+# persisted to GCS so new instances start warm. Address lookups resolve
+# through the canonical key index before any contains() filter or fuzzy scoring,
+# and /api/suggest is served from a typeahead index built from the same rows.
+
+HOMEOWNER_SNAPSHOT_FILE = 'wizard/homeowner-snapshot.json'
+HOMEOWNER_SNAPSHOT_TTL = int(os.environ.get('HOMEOWNER_SNAPSHOT_TTL', 6 * 3600))
+SNAPSHOT_COLUMNS = [
+    'cr258_accountnumber', 'cr258_owner_name',
+    'cr258_property_address', 'cr258_assoc_name'
+]
+
+_homeowner_snapshot = {'records': [], 'address_index': None, 'typeahead': None, 'built_at': 0}
+_snapshot_lock = threading.Lock()
+_snapshot_refreshing = False
+_snapshot_last_attempt = 0
+SNAPSHOT_RETRY_SECONDS = 300
+
+# Search analytics window used to rank typeahead suggestions by popularity
+TYPEAHEAD_POPULARITY_DAYS = 90
+TYPEAHEAD_POPULARITY_PAGE = 1000    # PostgREST returns at most 1000 rows per request
+
+
+def _load_snapshot_from_gcs():
+    """Load the persisted snapshot from GCS. Returns the parsed JSON or None."""
+    try:
+        client = gcs_storage.Client()
+        blob = client.bucket(GCS_BUCKET).blob(HOMEOWNER_SNAPSHOT_FILE)
+        if not blob.exists():
+            return None
+        return run_cpu_bound(json.loads, blob.download_as_text())
+    except Exception as e:
+        logger.error(f"Failed to load homeowner snapshot from GCS: {e}")
+        return None
+
+
+def _save_snapshot_to_gcs(data):
+    """Persist the snapshot so other instances can skip the Dataverse scan."""
+    try:
+        client = gcs_storage.Client()
+        blob = client.bucket(GCS_BUCKET).blob(HOMEOWNER_SNAPSHOT_FILE)
+        blob.upload_from_string(run_cpu_bound(json.dumps, data), content_type='application/json')
+    except Exception as e:
+        logger.error(f"Failed to save homeowner snapshot to GCS: {e}")
+
+
+def _load_search_popularity():
+    """Count recent searches per normalized query/community for typeahead ranking."""
+    from typeahead import normalize_key
+
+    supabase = get_supabase()
+    if not supabase:
+        return {}
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=TYPEAHEAD_POPULARITY_DAYS)).isoformat()
+    counts = {}
+    start = 0
+    while True:
+        try:
+            result = supabase.table('mw_search_events') \
+                .select('query_normalized, community_detected') \
+                .gte('searched_at', cutoff) \
+                .order('id') \
+                .range(start, start + TYPEAHEAD_POPULARITY_PAGE - 1) \
+                .execute()
+        except Exception as e:
+            logger.error(f"Failed to load search popularity: {e}")
+            return counts
+        page = result.data or []
+        for r in page:
+            for value in (r.get('query_normalized'), r.get('community_detected')):
+                key = normalize_key(value)
+                if key:
+                    counts[key] = counts.get(key, 0) + 1
+        if len(page) < TYPEAHEAD_POPULARITY_PAGE:
+            return counts
+        start += TYPEAHEAD_POPULARITY_PAGE
+
+
+def _install_snapshot(records, index):
+    """Swap in a new snapshot (single assignment so readers never see a mix)."""
+    global _homeowner_snapshot
+    from typeahead import TypeaheadIndex
+
+    popularity = _load_search_popularity()
+    typeahead = run_cpu_bound(TypeaheadIndex.build, records, popularity)
+    _homeowner_snapshot = {'records': records, 'address_index': index,
+                           'typeahead': typeahead, 'built_at': index.built_at}
+
+
+def refresh_homeowner_snapshot():
+    """Load the snapshot from GCS if fresh, otherwise rebuild it from Dataverse."""
+    global _snapshot_refreshing
+    from address_index import AddressIndex
+
+    try:
+        if not _homeowner_snapshot['records']:
+            data = _load_snapshot_from_gcs()
+            index = run_cpu_bound(AddressIndex.from_dict, (data or {}).get('address_index'))
+            if index and index.age_seconds() < HOMEOWNER_SNAPSHOT_TTL:
+                _install_snapshot(data.get('records', []), index)
+                logger.info(f"Loaded homeowner snapshot from GCS: {index.record_count} addresses")
+                return
+
+        started = time.time()
+        rows = query_dataverse_all(SNAPSHOT_COLUMNS)
+        if rows is None:
+            return
+        records = [
+            {col: r.get(col) for col in SNAPSHOT_COLUMNS}
+            for r in rows if not is_excluded_community(r.get('cr258_assoc_name'))
+        ]
+        index = run_cpu_bound(AddressIndex.build, records)
+        _install_snapshot(records, index)
+        logger.info(f"Built homeowner snapshot: {len(records)} records in {time.time() - started:.1f}s")
+        _save_snapshot_to_gcs({'records': records, 'address_index': index.to_dict()})
+    finally:
+        with _snapshot_lock:
+            _snapshot_refreshing = False
+
+
+def ensure_homeowner_snapshot():
+    """Kick off a background refresh when the snapshot is missing or stale (never blocks)."""
+    global _snapshot_refreshing, _snapshot_last_attempt
+    index = _homeowner_snapshot['address_index']
+    if index is not None and index.age_seconds() < HOMEOWNER_SNAPSHOT_TTL:
+        return
+    with _snapshot_lock:
+        # Back off after a failed build so every search doesn't retry the full scan
+        if _snapshot_refreshing or time.time() - _snapshot_last_attempt < SNAPSHOT_RETRY_SECONDS:
+            return
+        _snapshot_refreshing = True
+        _snapshot_last_attempt = time.time()
+    threading.Thread(target=refresh_homeowner_snapshot, daemon=True).start()
+
+
+def get_address_index():
+    """Return the canonical address index, or None while it is still loading."""
+    ensure_homeowner_snapshot()
+    return _homeowner_snapshot['address_index']
+
+
+def get_typeahead_index():
+    """Return the typeahead index, or None while the snapshot is still loading."""
+    ensure_homeowner_snapshot()
+    return _homeowner_snapshot['typeahead']
+
+
+def query_dataverse_by_accounts(accounts, community_filter=None):
+    """Fetch live homeowner rows for a list of account numbers in one query."""
+    if not accounts:
+        return []
+    safe_accounts = [a.replace("'", "''") for a in accounts]
+    filter_expr = '(' + ' or '.join(f"cr258_accountnumber eq '{a}'" for a in safe_accounts) + ')'
+    if community_filter:
+        safe_community = community_filter.replace("'", "''")
+        filter_expr = f"contains(cr258_assoc_name, '{safe_community}') and {filter_expr}"
+    return query_dataverse(filter_expr, top=len(accounts))
+
+
 # =============================================================================
 # POWER BI FUNCTIONS (for payment history)
 # =============================================================================
@@ -615,8 +1034,8 @@ def get_pbi_token():
         return None
 
 
-def query_pbi_dax(query):
-    """Execute DAX query against Power BI dataset."""
+def _post_pbi_queries(queries):
+    """POST one executeQueries request for a list of DAX queries."""
     import requests
 
     token = get_pbi_token()
@@ -629,25 +1048,98 @@ def query_pbi_dax(query):
         'Content-Type': 'application/json'
     }
     payload = {
-        'queries': [{'query': query}],
+        'queries': [{'query': q} for q in queries],
         'serializerSettings': {'includeNulls': True}
     }
 
     try:
-        resp = requests.post(url, headers=headers, json=payload, timeout=30)
-        if resp.status_code == 200:
-            return resp.json()['results'][0]['tables'][0]['rows']
-        else:
-            logger.error(f"Power BI query failed: {resp.status_code} - {resp.text[:200]}")
-            return None
+        return requests.post(url, headers=headers, json=payload, timeout=backend_timeout(30))
     except Exception as e:
         logger.error(f"Power BI request failed: {e}")
         return None
 
 
+# Concurrent DAX queries (history clicks, prefetches, owner lookups) issued
+# within PBI_DAX_BATCH_WINDOW_MS share one executeQueries call; 0 disables
+_dax_batcher = DaxBatcher(
+    _post_pbi_queries,
+    window_ms=float(os.environ.get('PBI_DAX_BATCH_WINDOW_MS', 10)),
+    max_batch=int(os.environ.get('PBI_DAX_BATCH_MAX', 10))
+)
+
+
+@instrument_backend('power_bi', size=len, failed=lambda rows: rows is None)
+def query_pbi_dax(query):
+    """Execute DAX query against Power BI dataset."""
+    if not get_pbi_token():
+        return None
+    return _dax_batcher.execute(query)
+
+
+# AccountNo -> OwnerID map, loaded in bulk so a history click skips a DAX round trip
+PBI_OWNER_MAP_TTL = int(os.environ.get('PBI_OWNER_MAP_TTL', 6 * 3600))
+_pbi_owner_map = {'map': {}, 'loaded_at': 0, 'next_attempt': 0}
+_pbi_owner_map_lock = threading.Lock()
+_pbi_owner_map_loading = False
+
+# Per-owner ledger cache: newest rows only, refreshed incrementally after the TTL
+PBI_LEDGER_TTL = int(os.environ.get('PBI_LEDGER_TTL', 300))
+PBI_LEDGER_FULL_REFRESH = int(os.environ.get('PBI_LEDGER_FULL_REFRESH', 24 * 3600))
+PBI_LEDGER_CACHE_MAX = 2000
+_ledger_cache = OrderedDict()  # owner_id -> {'rows', 'limit', 'fetched_at', 'full_at'}
+_ledger_stats = {'hits': 0, 'misses': 0, 'incremental': 0}
+_ledger_cache_lock = threading.Lock()
+
+
+def load_owner_id_map():
+    """Load every AccountNo -> OwnerID pair with one DAX query."""
+    global _pbi_owner_map_loading
+    try:
+        rows = query_pbi_dax("""
+    EVALUATE
+    SELECTCOLUMNS(
+        'pbi Homeowners',
+        "AccountNo", 'pbi Homeowners'[AccountNo],
+        "OwnerID", 'pbi Homeowners'[OwnerID]
+    )
+    """)
+        if rows:
+            owner_map = {
+                str(r.get('[AccountNo]')).upper(): r.get('[OwnerID]')
+                for r in rows if r.get('[AccountNo]') and r.get('[OwnerID]') is not None
+            }
+            _pbi_owner_map['map'] = owner_map
+            _pbi_owner_map['loaded_at'] = time.time()
+            logger.info(f"Loaded Power BI owner map: {len(owner_map)} accounts")
+    finally:
+        _pbi_owner_map_loading = False
+
+
+def ensure_owner_id_map():
+    """Refresh the owner map in the background when missing or stale (never blocks)."""
+    global _pbi_owner_map_loading
+    now = time.time()
+    if now - _pbi_owner_map['loaded_at'] < PBI_OWNER_MAP_TTL or now < _pbi_owner_map['next_attempt']:
+        return
+    with _pbi_owner_map_lock:
+        if _pbi_owner_map_loading:
+            return
+        _pbi_owner_map_loading = True
+        # Back off so a failing load isn't retried on every click (loaded_at stays the real load time)
+        _pbi_owner_map['next_attempt'] = now + SNAPSHOT_RETRY_SECONDS
+    threading.Thread(target=load_owner_id_map, daemon=True).start()
+
+
 def get_owner_id_by_account(account_number):
     """Get OwnerID from Power BI by account number."""
     safe_account = account_number.replace("'", "''").upper()
+
+    ensure_owner_id_map()
+    owner_id = _pbi_owner_map['map'].get(safe_account)
+    if owner_id is not None:
+        return owner_id
+
+    # Not in the bulk map yet (still loading, or a new account) - ask directly
     query = f"""
     EVALUATE
     SELECTCOLUMNS(
@@ -657,26 +1149,104 @@ def get_owner_id_by_account(account_number):
     """
     rows = query_pbi_dax(query)
     if rows and len(rows) > 0:
-        return rows[0].get('[OwnerID]')
+        owner_id = rows[0].get('[OwnerID]')
+        if owner_id is not None:
+            _pbi_owner_map['map'][safe_account] = owner_id
+        return owner_id
     return None
 
 
-def get_payment_history(owner_id, limit=15):
-    """Get recent payment/charge history for an owner."""
-    from datetime import datetime
+def _parse_ledger_date(date_str):
+    """Parse a DAX ledger date string, or None."""
+    try:
+        return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+
 
-    # Fetch more rows to ensure we get enough after sorting
+def fetch_ledger_rows(owner_id, limit, since=None):
+    """
+    Fetch the newest `limit` ledger rows for an owner, sorted and trimmed by
+    TOPN in DAX. With `since`, only rows dated on or after that day are returned.
+    """
+    date_filter = ''
+    if since:
+        date_filter = f" && vOwnerLedger2[LedgerDate] >= DATE({since.year}, {since.month}, {since.day})"
     query = f"""
     EVALUATE
-    SELECTCOLUMNS(
-        FILTER(vOwnerLedger2, vOwnerLedger2[OwnerID] = {owner_id}),
-        "Date", vOwnerLedger2[LedgerDate],
-        "Amount", vOwnerLedger2[Amount],
-        "Type", vOwnerLedger2[TypeDescr],
-        "Description", vOwnerLedger2[Descr]
+    TOPN(
+        {int(limit)},
+        SELECTCOLUMNS(
+            FILTER(vOwnerLedger2, vOwnerLedger2[OwnerID] = {owner_id}{date_filter}),
+            "Date", vOwnerLedger2[LedgerDate],
+            "Amount", vOwnerLedger2[Amount],
+            "Type", vOwnerLedger2[TypeDescr],
+            "Description", vOwnerLedger2[Descr]
+        ),
+        [Date], DESC
     )
+    ORDER BY [Date] DESC
     """
-    rows = query_pbi_dax(query)
+    return query_pbi_dax(query)
+
+
+def get_ledger_rows(owner_id, limit=15):
+    """
+    Return raw ledger rows for an owner from the cache when fresh. A stale
+    entry is topped up with rows since its newest cached day; a full fetch
+    runs on a miss, a larger limit, or after PBI_LEDGER_FULL_REFRESH
+    (catches back-dated corrections).
+    """
+    now = time.time()
+    with _ledger_cache_lock:
+        entry = _ledger_cache.get(owner_id)
+        if entry:
+            _ledger_cache.move_to_end(owner_id)
+
+    if entry and entry['limit'] >= limit and now - entry['fetched_at'] < PBI_LEDGER_TTL:
+        _ledger_stats['hits'] += 1
+        return entry['rows'][:limit]
+    _ledger_stats['misses'] += 1
+
+    rows = None
+    full_at = now
+    if entry and entry['limit'] >= limit and now - entry['full_at'] < PBI_LEDGER_FULL_REFRESH:
+        dates = [_parse_ledger_date(r.get('[Date]')) for r in entry['rows']]
+        newest = max((d for d in dates if d), default=None)
+        if newest:
+            recent = fetch_ledger_rows(owner_id, entry['limit'], since=newest)
+            if recent is not None:
+                # Replace the newest cached day (it may have gained rows) with the fresh rows
+                cutoff = newest.date()
+                older = [r for r, d in zip(entry['rows'], dates) if d and d.date() < cutoff]
+                # New rows push the oldest out: keep the entry at its limit like a full fetch
+                rows = (recent + older)[:entry['limit']]
+                full_at = entry['full_at']
+                _ledger_stats['incremental'] += 1
+
+    cache_limit = max(limit, entry['limit'] if entry else 0)
+    if rows is None:
+        rows = fetch_ledger_rows(owner_id, cache_limit)
+        if rows is None:
+            # Power BI unavailable - serve the stale copy rather than nothing
+            return entry['rows'][:limit] if entry else None
+
+    with _ledger_cache_lock:
+        _ledger_cache[owner_id] = {
+            'rows': rows,
+            'limit': cache_limit,
+            'fetched_at': now,
+            'full_at': full_at,
+        }
+        _ledger_cache.move_to_end(owner_id)
+        while len(_ledger_cache) > PBI_LEDGER_CACHE_MAX:
+            _ledger_cache.popitem(last=False)
+    return rows[:limit]
+
+
+def get_payment_history(owner_id, limit=15):
+    """Get recent payment/charge history for an owner."""
+    rows = get_ledger_rows(owner_id, limit=limit)
     if not rows:
         return []
 
@@ -720,6 +1290,94 @@ def get_payment_history(owner_id, limit=15):
     return history
 
 
+# =============================================================================
+# HISTORY PREFETCH (warm the ledger cache for the top homeowner hits)
+# =============================================================================
+# When a homeowner search returns a handful of accounts, the manager almost
+# always opens "history" next - fetch those ledgers in the background so the
+# click is served from the ledger cache.
+
+HISTORY_PREFETCH_MAX_RESULTS = 3
+HISTORY_PREFETCH_PER_USER = 2
+HISTORY_DEFAULT_LIMIT = 15
+
+_prefetch_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('HISTORY_PREFETCH_WORKERS', 4)),
+    thread_name_prefix='history-prefetch'
+)
+_prefetch_state = {}  # user key -> {'generation': int, 'in_flight': int}; dropped when idle
+_prefetch_lock = threading.Lock()
+
+
+def _prefetch_user_key():
+    """Identify the requesting user (email, else session id, else client IP)."""
+    user = session.get('user') or {}
+    return (user.get('email') or '').lower() or session.get('session_id') or request.remote_addr or 'anonymous'
+
+
+def _prefetch_is_current(user_key, generation):
+    with _prefetch_lock:
+        return _prefetch_state.get(user_key, {}).get('generation') == generation
+
+
+def _prefetch_one(user_key, generation, account):
+    """Resolve one account and warm its ledger, unless cancelled meanwhile."""
+    try:
+        if not _prefetch_is_current(user_key, generation):
+            return
+        owner_id = get_owner_id_by_account(account)
+        if owner_id is None or not _prefetch_is_current(user_key, generation):
+            return
+        get_ledger_rows(owner_id, limit=HISTORY_DEFAULT_LIMIT)
+    except Exception as e:
+        logger.warning(f"History prefetch failed for {account}: {e}")
+    finally:
+        with _prefetch_lock:
+            state = _prefetch_state[user_key]
+            state['in_flight'] -= 1
+            # Nothing queued for this user any more: forget them (a stale generation can't run)
+            if not state['in_flight']:
+                del _prefetch_state[user_key]
+
+
+def prefetch_history(homeowners):
+    """
+    Queue background ledger fetches for 1-3 formatted homeowner results.
+    A new search supersedes the user's queued prefetches, and at most
+    HISTORY_PREFETCH_PER_USER of the current search's run for one user at
+    a time (superseded ones still finishing don't count).
+    """
+    if not PBI_CLIENT_SECRET or not homeowners or len(homeowners) > HISTORY_PREFETCH_MAX_RESULTS:
+        return
+    accounts = []
+    for h in homeowners:
+        account = h.get('account_number')
+        if account and account != 'N/A' and account not in accounts:
+            accounts.append(account)
+
+    user_key = _prefetch_user_key()
+    with _prefetch_lock:
+        state = _prefetch_state.setdefault(user_key, {'generation': 0, 'in_flight': 0})
+        state['generation'] += 1
+        generation = state['generation']
+        # Superseded jobs still in flight return early and don't count against the cap
+        accounts = accounts[:HISTORY_PREFETCH_PER_USER]
+        state['in_flight'] += len(accounts)
+        if not state['in_flight']:
+            del _prefetch_state[user_key]
+
+    for account in accounts:
+        _prefetch_executor.submit(_prefetch_one, user_key, generation, account)
+
+
+def cancel_history_prefetch():
+    """Drop the current user's queued prefetches (requests already sent finish quietly)."""
+    user_key = _prefetch_user_key()
+    with _prefetch_lock:
+        if user_key in _prefetch_state:
+            _prefetch_state[user_key]['generation'] += 1
+
+
 def format_homeowner(rec):
     """Format a homeowner record for API response."""
     balance = rec.get('cr258_balance') or 0
@@ -924,6 +1582,18 @@ DOCUMENT_PATTERNS = {
     }
 }
 
+# Query-independent metadata (URL, community, date score) per file path; document_metadata.py
+_document_metadata = DocumentMetadataCache(normalize_community_name)
+
+# Local rerank stage over the Azure Search candidates (reranker.py): 'local' or 'none'
+# (Azure order). The reranker sees RERANK_CANDIDATES chunks and the top `top` are returned.
+SEARCH_RERANKER = os.environ.get('SEARCH_RERANKER', 'local')
+RERANK_CANDIDATES = int(os.environ.get('RERANK_CANDIDATES', 30))
+document_reranker = LocalReranker(DOCUMENT_PATTERNS, _document_metadata.community_key) \
+    if SEARCH_RERANKER == 'local' else None
+rerank_latency = metrics.Histogram('mw_rerank_seconds', 'Local rerank time per search',
+                                   buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05))
+
 # Question patterns that indicate document search
 QUESTION_PATTERNS = [
     r'\b(what|how|when|where|can i|am i allowed|is it okay|rules? for|policy on|guidelines? for)\b',
@@ -1054,6 +1724,34 @@ def extract_community_from_query(query):
     return None
 
 
+# Document category (index document_type) display mapping
+CATEGORY_DISPLAY = {
+    'governing_ccr': {'icon': 'gavel', 'color': '#dc2626', 'label': 'CC&Rs'},
+    'governing_bylaws': {'icon': 'book', 'color': '#ea580c', 'label': 'Bylaws'},
+    'governing_rules': {'icon': 'list-check', 'color': '#d97706', 'label': 'Rules'},
+    'governing_arc_guidelines': {'icon': 'palette', 'color': '#ca8a04', 'label': 'ARC Guidelines'},
+    'community_minutes': {'icon': 'clipboard-list', 'color': '#16a34a', 'label': 'Minutes'},
+    'community_newsletter': {'icon': 'newspaper', 'color': '#059669', 'label': 'Newsletter'},
+    'community_announcement': {'icon': 'bullhorn', 'color': '#0d9488', 'label': 'Announcement'},
+    'board_financial': {'icon': 'chart-pie', 'color': '#0284c7', 'label': 'Financial'},
+    'board_contracts': {'icon': 'file-contract', 'color': '#2563eb', 'label': 'Contract'},
+    'board_insurance': {'icon': 'shield-halved', 'color': '#4f46e5', 'label': 'Insurance'},
+    'board_legal': {'icon': 'scale-balanced', 'color': '#7c3aed', 'label': 'Legal'},
+    'board_delinquency': {'icon': 'dollar-sign', 'color': '#9333ea', 'label': 'Delinquency'},
+    'owner_statement': {'icon': 'file-invoice', 'color': '#c026d3', 'label': 'Statement'},
+    'owner_ledger': {'icon': 'receipt', 'color': '#db2777', 'label': 'Ledger'},
+    'owner_letter': {'icon': 'envelope', 'color': '#e11d48', 'label': 'Letter'},
+    'owner_arc_submission': {'icon': 'file-pen', 'color': '#f43f5e', 'label': 'ARC Submission'},
+    'staff_violations': {'icon': 'triangle-exclamation', 'color': '#f97316', 'label': 'Violations'},
+    'staff_bids': {'icon': 'file-signature', 'color': '#84cc16', 'label': 'Bids'},
+    'staff_work_orders': {'icon': 'screwdriver-wrench', 'color': '#22c55e', 'label': 'Work Order'},
+    'staff_vendor': {'icon': 'building', 'color': '#14b8a6', 'label': 'Vendor'},
+    'staff_correspondence': {'icon': 'comments', 'color': '#06b6d4', 'label': 'Correspondence'},
+    'community_directory': {'icon': 'address-book', 'color': '#6366f1', 'label': 'Directory'},
+}
+
+
+@instrument_backend('azure_search', size=lambda result: result['count'], failed=lambda result: 'error' in result)
 def search_azure_documents(query, community=None, top=10):
     """Search Azure AI Search index for SharePoint documents with semantic ranking."""
     import requests
@@ -1073,11 +1771,7 @@ def search_azure_documents(query, community=None, top=10):
         logger.info(f"Expanded pet query: {expanded_query}")
 
     # Detect date/recency intent in query (bank balance, financial, recent, 2025, 2026, etc.)
-    date_keywords = ['balance', 'bank', 'financial', 'budget', 'statement', 'report', 'recent',
-                     'latest', 'current', 'last month', 'this year', 'monthly', 'invoice',
-                     'expense', 'collection', 'delinquent', 'delinquency', 'revenue']
-    year_pattern = re.search(r'20[2-3]\d', query)
-    has_date_intent = any(kw in query.lower() for kw in date_keywords) or year_pattern is not None
+    date_intent = has_date_intent(query)
 
     # Use simple search (semantic quota exhausted)
     # searchMode: "any" allows natural language queries to work better
@@ -1085,7 +1779,7 @@ def search_azure_documents(query, community=None, top=10):
         "search": expanded_query,
         "queryType": "simple",
         "searchMode": "any",
-        "top": top,
+        "top": max(top, RERANK_CANDIDATES) if document_reranker else top,
         "count": True,
         "select": "file_name,file_path,web_url,chunk_text,community_name,document_type,last_modified",
         "highlight": "chunk_text",
@@ -1095,7 +1789,7 @@ def search_azure_documents(query, community=None, top=10):
 
     # Note: last_modified field is null in the index, so orderby won't work.
     # Instead, we boost recency by extracting dates from filenames in post-processing.
-    if has_date_intent:
+    if date_intent:
         logger.info(f"Date/financial intent detected - will prioritize recent docs in post-processing")
 
     # Build OData filters for community and archive exclusion
@@ -1142,37 +1836,15 @@ def search_azure_documents(query, community=None, top=10):
     try:
         filter_str = payload.get('filter', 'none')
         logger.info(f"Azure Search: query='{expanded_query}', community='{community}', filter='{filter_str}'")
-        resp = requests.post(url, json=payload, headers=headers, timeout=15)
+        timeout = backend_timeout(15)
+        resp = call_backend(
+            'azure_search',
+            lambda: requests.post(url, json=payload, headers=headers, timeout=timeout)
+        )
         if resp.status_code == 200:
             data = resp.json()
             results = []
 
-            # Document category display mapping
-            CATEGORY_DISPLAY = {
-                'governing_ccr': {'icon': 'gavel', 'color': '#dc2626', 'label': 'CC&Rs'},
-                'governing_bylaws': {'icon': 'book', 'color': '#ea580c', 'label': 'Bylaws'},
-                'governing_rules': {'icon': 'list-check', 'color': '#d97706', 'label': 'Rules'},
-                'governing_arc_guidelines': {'icon': 'palette', 'color': '#ca8a04', 'label': 'ARC Guidelines'},
-                'community_minutes': {'icon': 'clipboard-list', 'color': '#16a34a', 'label': 'Minutes'},
-                'community_newsletter': {'icon': 'newspaper', 'color': '#059669', 'label': 'Newsletter'},
-                'community_announcement': {'icon': 'bullhorn', 'color': '#0d9488', 'label': 'Announcement'},
-                'board_financial': {'icon': 'chart-pie', 'color': '#0284c7', 'label': 'Financial'},
-                'board_contracts': {'icon': 'file-contract', 'color': '#2563eb', 'label': 'Contract'},
-                'board_insurance': {'icon': 'shield-halved', 'color': '#4f46e5', 'label': 'Insurance'},
-                'board_legal': {'icon': 'scale-balanced', 'color': '#7c3aed', 'label': 'Legal'},
-                'board_delinquency': {'icon': 'dollar-sign', 'color': '#9333ea', 'label': 'Delinquency'},
-                'owner_statement': {'icon': 'file-invoice', 'color': '#c026d3', 'label': 'Statement'},
-                'owner_ledger': {'icon': 'receipt', 'color': '#db2777', 'label': 'Ledger'},
-                'owner_letter': {'icon': 'envelope', 'color': '#e11d48', 'label': 'Letter'},
-                'owner_arc_submission': {'icon': 'file-pen', 'color': '#f43f5e', 'label': 'ARC Submission'},
-                'staff_violations': {'icon': 'triangle-exclamation', 'color': '#f97316', 'label': 'Violations'},
-                'staff_bids': {'icon': 'file-signature', 'color': '#84cc16', 'label': 'Bids'},
-                'staff_work_orders': {'icon': 'screwdriver-wrench', 'color': '#22c55e', 'label': 'Work Order'},
-                'staff_vendor': {'icon': 'building', 'color': '#14b8a6', 'label': 'Vendor'},
-                'staff_correspondence': {'icon': 'comments', 'color': '#06b6d4', 'label': 'Correspondence'},
-                'community_directory': {'icon': 'address-book', 'color': '#6366f1', 'label': 'Directory'},
-            }
-
             # Process search results (v2 index with new field names)
             for doc in data.get('value', []):
                 # Use document_type from index or infer from path
@@ -1181,26 +1853,11 @@ def search_azure_documents(query, community=None, top=10):
 
                 # Get file path (v2 uses file_path instead of metadata_spo_item_path)
                 path = doc.get('file_path') or ''
+                title = doc.get('file_name') or doc.get('title') or path.split('/')[-1] if path else 'Unknown'
 
-                # Construct SharePoint URL from file_path since web_url is not populated by indexer
-                # Path format: /drives/b!.../root:/Community/folder/file.pdf
-                sharepoint_url = ''
-                if path:
-                    root_match = re.search(r'/root:/(.*)', path)
-                    if root_match:
-                        relative_path = root_match.group(1)
-                        # URL-encode path segments but keep slashes
-                        from urllib.parse import quote
-                        encoded_path = '/'.join(quote(segment, safe='') for segment in relative_path.split('/'))
-                        sharepoint_url = f"https://psprop.sharepoint.com/sites/AssociationDocs/Association%20Documents/{encoded_path}"
-
-                # Extract community from path or use community_name field
-                doc_community = doc.get('community_name')
-                if not doc_community and path:
-                    # Try to extract from path patterns
-                    community_match = re.search(r'/([^/]+)/(?:Association Documents|Public|Operations)/', path)
-                    if community_match:
-                        doc_community = community_match.group(1)
+                # SharePoint URL, community (community_name or the path's folder) and date score,
+                # computed once per file path
+                metadata = _document_metadata.get(path, title, doc.get('community_name'))
 
                 # Get semantic caption if available (highlighted excerpt)
                 captions = doc.get('@search.captions', [])
@@ -1217,10 +1874,10 @@ def search_azure_documents(query, community=None, top=10):
                 is_archived = '/Archive/' in path or '/Archive' in path
 
                 results.append({
-                    'title': doc.get('file_name') or doc.get('title') or path.split('/')[-1] if path else 'Unknown',
+                    'title': title,
                     'path': path,
-                    'url': doc.get('web_url') or sharepoint_url,
-                    'community': doc_community,
+                    'url': doc.get('web_url') or metadata.url,
+                    'community': metadata.community,
                     'doc_type': doc_category,
                     'doc_type_info': doc_type_info,
                     'access_level': 'public',  # v2 doesn't have access_level yet
@@ -1230,7 +1887,8 @@ def search_azure_documents(query, community=None, top=10):
                     'caption': caption_text,
                     'caption_highlighted': caption_highlights,
                     'is_archived': is_archived,
-                    'archive_warning': '⚠️ ARCHIVED - This document may be outdated' if is_archived else None
+                    'archive_warning': '⚠️ ARCHIVED - This document may be outdated' if is_archived else None,
+                    'date_score': metadata.date_score
                 })
 
             # Filter out documents ONLY if they have "(DO NOT USE)" or similar in the path
@@ -1245,28 +1903,12 @@ def search_azure_documents(query, community=None, top=10):
             if community:
                 normalized_query = normalize_community_name(community)
 
-                def community_match_score(doc):
-                    """Score how well doc's community matches the query. Higher = better match."""
-                    doc_community = doc.get('community') or ''
-                    normalized_doc = normalize_community_name(doc_community)
-
-                    # No community info = no match (prevents empty string matching everything)
-                    if not normalized_doc or not normalized_query:
-                        return 0
-                    # Exact match (after normalization) = 100
-                    if normalized_doc == normalized_query:
-                        return 100
-                    # Query is contained in doc community = 50
-                    if normalized_query in normalized_doc:
-                        return 50
-                    # Doc community is contained in query = 40 (but only if meaningful length)
-                    if len(normalized_doc) >= 3 and normalized_doc in normalized_query:
-                        return 40
-                    # No match = 0
-                    return 0
-
                 # Score and filter results
-                scored_results = [(doc, community_match_score(doc)) for doc in filtered_results]
+                scored_results = [
+                    (doc, community_match_score(normalized_query,
+                                                _document_metadata.community_key(doc.get('community') or '')))
+                    for doc in filtered_results
+                ]
 
                 # Keep only documents with some community match (score > 0)
                 # OR if no matches found, keep all (fallback to broad results)
@@ -1283,39 +1925,27 @@ def search_azure_documents(query, community=None, top=10):
 
             logger.info(f"Azure Search found {len(results)} results, {len(filtered_results)} after all filters")
 
-            # For date/financial queries, re-sort by extracted date from filename
+            # Local rerank: BM25, title/category/community match and (for date/financial
+            # queries) recency from the file name, on top of the Azure score
+            if document_reranker and len(filtered_results) > 1:
+                rerank_start = time.perf_counter()
+                filtered_results = document_reranker.rerank(query, filtered_results, community,
+                                                            recency=date_intent)
+                rerank_seconds = time.perf_counter() - rerank_start
+                rerank_latency.observe(rerank_seconds)
+                logger.info(f"Reranked {len(filtered_results)} results in {rerank_seconds * 1000:.1f}ms: "
+                            f"top='{filtered_results[0].get('title', '')}'")
+
+            # Without the reranker, date/financial queries re-sort by extracted date from filename
             # Since last_modified is null, we parse dates from titles like:
             # "DEC 2025 Report.pdf", "12-2022 Bank Statement.pdf", "12 DECEMBER BANK STATEMENT.pdf"
-            if has_date_intent and filtered_results:
-                MONTH_MAP = {'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
-                             'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
-                             'january': 1, 'february': 2, 'march': 3, 'april': 4,
-                             'june': 6, 'july': 7, 'august': 8, 'september': 9,
-                             'october': 10, 'november': 11, 'december': 12}
-
-                def extract_date_score(doc):
-                    """Extract a sortable date score from title/path. Higher = more recent."""
-                    title = (doc.get('title') or '').lower()
-                    # Pattern: "MON YYYY" (e.g., "DEC 2025", "March 2025")
-                    m = re.search(r'(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\w*\s+(20\d{2})', title)
-                    if m:
-                        return int(m.group(2)) * 100 + MONTH_MAP.get(m.group(1)[:3], 0)
-                    # Pattern: "MM-YYYY" or "MM YYYY" (e.g., "12-2025", "12 2025")
-                    m = re.search(r'(\d{1,2})[-\s](20\d{2})', title)
-                    if m and 1 <= int(m.group(1)) <= 12:
-                        return int(m.group(2)) * 100 + int(m.group(1))
-                    # Pattern: "YYYY" alone
-                    m = re.search(r'(20\d{2})', title)
-                    if m:
-                        return int(m.group(1)) * 100
-                    return 0  # No date found
-
+            elif date_intent and filtered_results:
                 # Sort: most recent first, then by search relevance score
-                filtered_results.sort(key=lambda d: (-extract_date_score(d), -d.get('score', 0)))
-                if filtered_results:
-                    top_title = filtered_results[0].get('title', '')
-                    top_score = extract_date_score(filtered_results[0])
-                    logger.info(f"Date-sorted results: top='{top_title}' (date_score={top_score})")
+                filtered_results.sort(key=lambda d: (-d['date_score'], -d.get('score', 0)))
+                logger.info(f"Date-sorted results: top='{filtered_results[0].get('title', '')}' "
+                            f"(date_score={filtered_results[0]['date_score']})")
+
+            filtered_results = filtered_results[:top]
 
             # Get semantic answers from Azure (extractive answers)
             semantic_answers = []
@@ -1340,20 +1970,66 @@ def search_azure_documents(query, community=None, top=10):
         return {'documents': [], 'answers': [], 'count': 0, 'error': str(e)}
 
 
-def extract_answer_with_claude(query, documents, community=None):
-    """Use Claude to create a helpful response based on found documents."""
-    import requests
+# Token budget for the document excerpts sent with each extraction (doubled for financial queries)
+CLAUDE_CONTEXT_TOKENS = int(os.environ.get('CLAUDE_CONTEXT_TOKENS', 1500))
 
-    if not ANTHROPIC_API_KEY or not documents:
-        return None
+# 'single': one prompt over the top documents; 'map_reduce': concurrent per-document
+# extraction plus a merge (src/optimized_extraction.py). ?extraction= overrides per request.
+EXTRACTION_MODES = ('single', 'map_reduce')
+EXTRACTION_MODE = os.environ.get('EXTRACTION_MODE', 'single')
+
+# Identical on every call, so it is sent as a cacheable system prefix
+EXTRACTION_SYSTEM_PROMPT = """You are a helpful assistant for PS Property Management. A manager is searching for specific information about community documents including rules, policies, financial reports, and monthly community reports.
+
+The user message gives the question, the community (if known), a category, and the most relevant excerpts of each matching document.
+
+IMPORTANT: Read the document excerpts and extract the ACTUAL ANSWER to the question.
+Do NOT just suggest opening documents - extract the specific information directly from the content.
+When the question involves dates, financial data, or recent information, ALWAYS prefer data from the MOST RECENT document (check file names for dates like "NOV 2025", "DEC 2025", etc.).
+Monthly Community Reports contain bank balances, financial summaries, violation reports, collections data, expenses, and other operational data.
+Documents marked [ARCHIVED - may be outdated] come from archive folders. If you use an archived document, mention this in your answer.
+
+Respond in this JSON format:
+{
+    "answer": "The SPECIFIC ANSWER extracted from the document content (e.g., '6 feet maximum height' for fence questions)",
+    "source": "Name of the document where you found this",
+    "quote": "The exact relevant quote from the document (if found)",
+    "summary": "A brief summary explaining the answer",
+    "documents_found": ["list of relevant document names"],
+    "category": "the category given in the user message",
+    "from_archive": true/false (whether the answer came from an archived document)
+}
+
+If the content contains the answer, extract it directly. If the content is empty or doesn't contain the answer, say so and suggest opening the document.
+Return ONLY valid JSON, no other text."""
+
+claude_tokens = metrics.Counter('mw_claude_tokens', 'Claude tokens by kind (input, output, cache read/write)', ('kind',))
+claude_first_token = metrics.Histogram('mw_claude_first_token_seconds', 'Time to the first streamed Claude token')
+answer_path = metrics.Counter('mw_answer_path',
+                              'Document answers by extraction type and path (facts, rules, claude, map_reduce)',
+                              ('extraction_type', 'path'))
+extraction_latency = metrics.Histogram('mw_extraction_seconds', 'Claude answer extraction latency by mode', ('mode',))
+claude_queue_wait = metrics.Histogram('mw_claude_queue_wait_seconds', 'Time Claude calls waited for the rate limiter',
+                                      ('priority',))
+claude_dispatcher.on_wait = lambda seconds, priority: claude_queue_wait.observe(seconds, priority)
 
-    # Determine extraction type FIRST (needed for content length decisions)
+
+def extraction_mode_arg():
+    """Extraction mode for this request: ?extraction=single|map_reduce, else EXTRACTION_MODE."""
+    mode = request.args.get('extraction', '').strip().lower()
+    return mode if mode in EXTRACTION_MODES else EXTRACTION_MODE
+
+
+def detect_extraction_type(query):
+    """Extraction category of a document question (fence, pool, parking, pet, architectural, financial, general)."""
     query_lower = query.lower()
     extraction_type = "general"
 
     if any(kw in query_lower for kw in ['fence', 'height', 'material']):
         extraction_type = "fence"
     elif any(kw in query_lower for kw in ['pool', 'swimming', 'hours']):
+        # A bare 'hours' question keeps Claude's pool prompt; the pool_hours rule itself
+        # only fires when the question names the pool (its subject pattern)
         extraction_type = "pool"
     elif any(kw in query_lower for kw in ['parking', 'vehicle', 'tow']):
         extraction_type = "parking"
@@ -1367,180 +2043,302 @@ def extract_answer_with_claude(query, documents, community=None):
                                            'monthly report']):
         extraction_type = "financial"
 
-    # Prepare document context WITH actual content for answer extraction
-    doc_context = "Found relevant documents with content:\n"
-    has_archived_docs = any(doc.get('is_archived') for doc in documents[:5])
-
-    for i, doc in enumerate(documents[:5]):  # Top 5 docs - Avalon Fencing.pdf was at position 4
-        doc_context += f"\n{'='*60}\n"
-        doc_context += f"DOCUMENT {i+1}: {doc['title']}"
-        if doc.get('is_archived'):
-            doc_context += f" [⚠️ ARCHIVED - may be outdated]"
-        if doc.get('community'):
-            doc_context += f" (Community: {doc['community']})"
-        doc_context += f"\nType: {doc.get('doc_type_info', {}).get('label', 'Document')}"
-        if doc.get('url'):
-            doc_context += f"\nURL: {doc['url']}"
-
-        # Include actual document content - this is critical for answer extraction
-        content = doc.get('content', '').strip()
-        if content:
-            # Financial/report queries need more content (bank balances can be deep in the doc)
-            max_chars = 4000 if extraction_type == 'financial' else 2000
-            if len(content) > max_chars:
-                content = content[:max_chars] + "..."
-            doc_context += f"\n\nCONTENT:\n{content}"
-        else:
-            doc_context += "\n\n(No content available - document may need to be opened)"
-        doc_context += "\n"
+    return extraction_type
 
-    # Build extraction prompt based on type (extraction_type already determined above)
-    extraction_prompts = {
-        "fence": """Extract fence regulations into this JSON format:
-{
-    "max_height_back": "X feet",
-    "max_height_front": "X feet",
-    "approved_materials": ["material1", "material2"],
-    "arc_required": true/false,
-    "key_restrictions": ["restriction1", "restriction2"],
-    "summary": "One sentence summary"
-}""",
-        "pool": """Extract pool rules into this JSON format:
-{
-    "hours": "X AM - X PM",
-    "guest_policy": "description",
-    "key_rules": ["rule1", "rule2", "rule3"],
-    "restrictions": ["restriction1", "restriction2"],
-    "summary": "One sentence summary"
-}""",
-        "parking": """Extract parking rules into this JSON format:
-{
-    "allowed_vehicles": ["type1", "type2"],
-    "prohibited_vehicles": ["type1", "type2"],
-    "guest_parking": "description",
-    "towing_policy": "description",
-    "key_rules": ["rule1", "rule2"],
-    "summary": "One sentence summary"
-}""",
-        "pet": """Extract pet policy into this JSON format:
-{
-    "allowed_pets": ["type1", "type2"],
-    "max_pets": "X",
-    "weight_limit": "X lbs",
-    "leash_required": true/false,
-    "key_rules": ["rule1", "rule2"],
-    "summary": "One sentence summary"
-}""",
-        "architectural": """Extract architectural guidelines into this JSON format:
-{
-    "submission_required": true/false,
-    "approval_timeline": "X days",
-    "common_projects": ["project1", "project2"],
-    "prohibited_modifications": ["mod1", "mod2"],
-    "key_requirements": ["req1", "req2"],
-    "summary": "One sentence summary"
-}""",
-        "financial": """Extract the financial information into this JSON format:
-{
-    "answer": "Direct answer with specific dollar amounts and dates",
-    "key_points": ["Bank balance: $X as of DATE", "Operating account: $X", "Reserve account: $X"],
-    "as_of_date": "The date this financial data is from",
-    "source_section": "Section name (e.g. Bank Reconciliation, Financial Summary)",
-    "summary": "One sentence summary with key figures"
-}
-IMPORTANT: If multiple documents contain financial data, use the MOST RECENT one (newest date).
-Look for bank reconciliation sections, ending balances, operating/reserve account balances.""",
-        "general": """Extract the relevant information into this JSON format:
-{
-    "answer": "Direct answer to the question",
-    "key_points": ["point1", "point2", "point3"],
-    "source_section": "Section name if found",
-    "summary": "One sentence summary"
-}"""
-    }
 
-    prompt = f"""You are a helpful assistant for PS Property Management. A manager is searching for specific information about community documents including rules, policies, financial reports, and monthly community reports.
+def rule_answer(query, documents, community=None):
+    """
+    Deterministic fast path: answer numeric policy questions (fence height,
+    pool hours, pet limits, parking time limits) straight from the chunk
+    text. Returns an ai_answer dict, or None when Claude is needed.
+
+    With a community, only that community's documents are used; when the
+    search fell back to other communities' documents the answer is returned
+    with low confidence.
+    """
+    extraction_type = detect_extraction_type(query)
+    foreign = False
+    if community:
+        community_key = normalize_community_name(community)
+        own = [d for d in documents
+               if community_match_score(community_key, _document_metadata.community_key(d.get('community') or ''))]
+        foreign = not own
+        documents = own or documents
+    ai_answer = extract_rule_answer(query, documents, extraction_type)
+    if ai_answer and foreign:
+        ai_answer['extracted']['confidence'] = 'low'
+        ai_answer['extracted']['community_mismatch'] = True
+    if ai_answer:
+        answer_path.inc(extraction_type, 'rules')
+        logger.info(f"Rule answer ({ai_answer['rule']}, {ai_answer['latency_ms']}ms): "
+                    f"{ai_answer['extracted']['answer']} [{ai_answer['extracted']['source']}]")
+    return ai_answer
+
+
+def record_claude_usage(usage, context_stats=None):
+    """Log and count token usage and latency of one Claude call."""
+    if not usage:
+        return
+    for field in ('input_tokens', 'output_tokens', 'cache_read_input_tokens', 'cache_creation_input_tokens'):
+        if usage.get(field):
+            claude_tokens.inc(field.replace('_input_tokens', '').replace('_tokens', ''), amount=usage[field])
+    if usage.get('first_token_ms') is not None:
+        claude_first_token.observe(usage['first_token_ms'] / 1000)
+    if usage.get('coalesced'):
+        logger.info(f"Claude call coalesced with an identical in-flight request ({usage.get('latency_ms')}ms)")
+        return
+    logger.info(
+        f"Claude usage: in={usage.get('input_tokens')} out={usage.get('output_tokens')} "
+        f"cache_read={usage.get('cache_read_input_tokens', 0)} cache_write={usage.get('cache_creation_input_tokens', 0)}"
+        + (f" first_token={usage['first_token_ms']}ms" if usage.get('first_token_ms') is not None else '')
+        + f" total={usage.get('latency_ms')}ms"
+        + (f" queued={usage['queue_wait_ms']}ms" if usage.get('queue_wait_ms') else '')
+        + (f" retries={usage['retries']}" if usage.get('retries') else '')
+        + (f" context={context_stats['est_tokens']}t/{context_stats['sentences']} sentences" if context_stats else '')
+    )
 
-Question: {query}
-{f'Community: {community}' if community else ''}
 
-{doc_context}
+# =============================================================================
+# POLICY FACT STORE
+# =============================================================================
+# Fence/pool/pet/parking facts per community, extracted offline by
+# scripts/build_policy_facts.py. Served before any live extraction.
 
-IMPORTANT: Read the document CONTENT provided above and extract the ACTUAL ANSWER to the question.
-Do NOT just suggest opening documents - extract the specific information directly from the content.
-When the question involves dates, financial data, or recent information, ALWAYS prefer data from the MOST RECENT document (check file names for dates like "NOV 2025", "DEC 2025", etc.).
-Monthly Community Reports contain bank balances, financial summaries, violation reports, collections data, expenses, and other operational data.
-{f"⚠️ NOTE: Some documents are from ARCHIVE folders and may be outdated. If using archived documents, mention this in your answer." if has_archived_docs else ""}
+POLICY_FACTS_FILE = 'wizard/policy-facts.json'  # in GCS_BUCKET
+POLICY_FACTS_PATH = os.environ.get('POLICY_FACTS_PATH', '')  # local file instead of GCS (dev)
+POLICY_FACTS_TTL = int(os.environ.get('POLICY_FACTS_TTL', 3600))
 
-Based on the document content, provide a response in this JSON format:
-{{
-    "answer": "The SPECIFIC ANSWER extracted from the document content (e.g., '6 feet maximum height' for fence questions)",
-    "source": "Name of the document where you found this",
-    "quote": "The exact relevant quote from the document (if found)",
-    "summary": "A brief summary explaining the answer",
-    "documents_found": ["list of relevant document names"],
-    "category": "{extraction_type}",
-    "from_archive": true/false (whether the answer came from an archived document)
-}}
+_policy_facts = {'store': FactStore(), 'loaded_at': 0}
+_policy_facts_lock = threading.Lock()
+_policy_facts_refreshing = False
 
-If the content contains the answer, extract it directly. If the content is empty or doesn't contain the answer, say so and suggest opening the document.
-Return ONLY valid JSON, no other text."""
 
+def _load_policy_facts():
+    """Read the built fact file. Returns the parsed JSON or None."""
     try:
-        resp = requests.post(
-            "https://api.anthropic.com/v1/messages",
-            headers={
-                "x-api-key": ANTHROPIC_API_KEY,
-                "anthropic-version": "2023-06-01",
-                "content-type": "application/json"
-            },
-            json={
-                "model": "claude-3-5-haiku-20241022",
-                "max_tokens": 1000,
-                "messages": [{"role": "user", "content": prompt}]
-            },
-            timeout=30
-        )
-
-        if resp.status_code == 200:
-            content = resp.json()['content'][0]['text']
-            # Try to parse JSON
-            try:
-                # Find JSON in response
-                json_match = re.search(r'\{[\s\S]*\}', content)
-                if json_match:
-                    extracted = json.loads(json_match.group())
-
-                    # Ensure answer field is never empty/null
-                    if not extracted.get('answer') or extracted.get('answer', '').strip() == '':
-                        # Use summary as fallback, or generate a not-found message
-                        if extracted.get('summary'):
-                            extracted['answer'] = extracted['summary']
-                        else:
-                            extracted['answer'] = f"No specific information found in the available documents for this query."
-
-                    return {
-                        'extracted': extracted,
-                        'extraction_type': extraction_type
-                    }
-            except json.JSONDecodeError:
-                pass
-            return None
-        else:
-            logger.error(f"Claude API failed: {resp.status_code}")
+        if POLICY_FACTS_PATH:
+            if not os.path.exists(POLICY_FACTS_PATH):
+                return None
+            with open(POLICY_FACTS_PATH) as f:
+                return json.load(f)
+        client = gcs_storage.Client()
+        blob = client.bucket(GCS_BUCKET).blob(POLICY_FACTS_FILE)
+        if not blob.exists():
             return None
+        return run_cpu_bound(json.loads, blob.download_as_text())
     except Exception as e:
-        logger.error(f"Claude extraction failed: {e}")
+        logger.error(f"Failed to load policy facts: {e}")
         return None
 
 
-# =============================================================================
-# AUTHENTICATION ROUTES
-# =============================================================================
+def _refresh_policy_facts():
+    global _policy_facts_refreshing
+    try:
+        data = _load_policy_facts()
+        if data is not None:
+            store = run_cpu_bound(FactStore, data, normalize=normalize_community_name)
+            _policy_facts['store'] = store
+            logger.info(f"Loaded policy facts for {len(store)} communities (built {store.built_at})")
+    finally:
+        _policy_facts['loaded_at'] = time.time()
+        _policy_facts_refreshing = False
+
+
+def refresh_policy_facts_async():
+    """Reload the fact store in a background thread unless a reload is running."""
+    global _policy_facts_refreshing
+    with _policy_facts_lock:
+        if _policy_facts_refreshing:
+            return
+        _policy_facts_refreshing = True
+    threading.Thread(target=_refresh_policy_facts, daemon=True).start()
 
-@app.route('/login')
-def login():
-    """Initiate Microsoft OAuth login flow."""
+
+def get_policy_facts():
+    """
+    The current fact store (empty until the startup load finishes - fact
+    questions fall through to live extraction meanwhile). A stale store
+    keeps serving while a background thread reloads it; requests never
+    wait on GCS.
+    """
+    if time.time() - _policy_facts['loaded_at'] > POLICY_FACTS_TTL and not _policy_facts_refreshing:
+        refresh_policy_facts_async()
+    return _policy_facts['store']
+
+
+# Load on startup so the first fact question doesn't wait on GCS
+refresh_policy_facts_async()
+
+
+def fact_answer(query, community):
+    """Precomputed answer for a community's fence/pool/pet/parking question, or None."""
+    if not community:
+        return None
+    extraction_type = detect_extraction_type(query)
+    if extraction_type not in FACT_CATEGORIES:
+        return None
+    ai_answer = get_policy_facts().lookup(community, extraction_type, query)
+    if ai_answer:
+        answer_path.inc(extraction_type, 'facts')
+        logger.info(f"Fact answer ({community}/{extraction_type}, version {ai_answer['document_version']}): "
+                    f"{ai_answer['extracted']['answer'][:100]}")
+    return ai_answer
+
+
+# =============================================================================
+# SEMANTIC ANSWER CACHE
+# =============================================================================
+# Paraphrased questions ("how tall can my fence be" / "fence height limit")
+# reuse the documents and Claude answer of an earlier query for the same
+# community. See semantic_cache.py.
+
+SEMANTIC_CACHE_THRESHOLD = float(os.environ.get('SEMANTIC_CACHE_THRESHOLD', 0.9))
+SEMANTIC_CACHE_TTL = int(os.environ.get('SEMANTIC_CACHE_TTL', 6 * 3600))
+SEMANTIC_CACHE_PER_COMMUNITY = int(os.environ.get('SEMANTIC_CACHE_PER_COMMUNITY', 256))
+
+_semantic_cache = SemanticCache(threshold=SEMANTIC_CACHE_THRESHOLD, ttl=SEMANTIC_CACHE_TTL,
+                                capacity=SEMANTIC_CACHE_PER_COMMUNITY)
+
+
+def _semantic_cache_key(query, community, extraction_mode):
+    community_key = normalize_community_name(community) or '_all'
+    return community_key, f"{detect_extraction_type(query)}:{extraction_mode or EXTRACTION_MODE}"
+
+
+def semantic_cache_lookup(query, community, extraction_mode=None):
+    """Cached {documents, semantic_answers, ai_answer, similarity, matched_query} for a paraphrase, or None."""
+    community_key, kind = _semantic_cache_key(query, community, extraction_mode)
+    cached = _semantic_cache.lookup(community_key, query, kind)
+    if cached:
+        logger.info(f"Semantic cache hit: '{query}' ~ '{cached['matched_query']}' ({cached['similarity']})")
+    return cached
+
+
+def semantic_cache_store(query, community, result, extraction_mode=None):
+    """Remember a Claude-extracted answer and the documents it came from."""
+    if not result.get('documents') or not result.get('ai_answer'):
+        return
+    community_key, kind = _semantic_cache_key(query, community, extraction_mode)
+    _semantic_cache.store(community_key, query, {
+        'documents': result['documents'],
+        'semantic_answers': result.get('semantic_answers', []),
+        'ai_answer': result['ai_answer'],
+    }, kind)
+
+
+@instrument_backend('claude', failed=lambda answer: answer is None)
+def extract_answer_with_claude(query, documents, community=None, on_field=None, mode=None):
+    """
+    Use Claude to create a helpful response based on found documents.
+    The reply is streamed and parsed incrementally; on_field(key, value) is
+    called as each top-level JSON field completes ("answer" comes first).
+    mode='map_reduce' extracts per document in parallel and merges instead.
+    """
+    if not ANTHROPIC_API_KEY or not documents:
+        return None
+
+    extraction_type = detect_extraction_type(query)
+    if (mode or EXTRACTION_MODE) == 'map_reduce':
+        return extract_answer_map_reduce_mode(query, documents, community, extraction_type, on_field)
+    answer_path.inc(extraction_type, 'claude')
+    start = time.perf_counter()
+
+    # Most relevant, de-duplicated sentences of the top documents within a token budget
+    # (financial/report queries get more room - bank balances can be deep in the doc)
+    token_budget = CLAUDE_CONTEXT_TOKENS * (2 if extraction_type == 'financial' else 1)
+    doc_context, context_stats = build_compact_context(query, documents, token_budget=token_budget)
+
+    prompt = (
+        f"Question: {query}\n"
+        + (f"Community: {community}\n" if community else '')
+        + f"Category: {extraction_type}\n\n"
+        + f"Document excerpts (most relevant passages of each document):\n\n{doc_context}"
+    )
+
+    payload = {
+        "model": "claude-3-5-haiku-20241022",
+        "max_tokens": 1000,
+        # Static instructions first, marked cacheable; only the question and excerpts vary
+        "system": [{"type": "text", "text": EXTRACTION_SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}],
+        "messages": [{"role": "user", "content": prompt}]
+    }
+    usage = {}
+    extracted = None
+    for kind, key, value in stream_claude_json(payload, ANTHROPIC_API_KEY, timeout=backend_timeout(30)):
+        if kind == 'field':
+            if on_field:
+                on_field(key, value)
+        elif kind == 'usage':
+            usage = value
+        else:
+            extracted = value
+    record_claude_usage(usage, context_stats)
+    extraction_latency.observe(time.perf_counter() - start, 'single')
+    if not isinstance(extracted, dict):
+        return None
+
+    # Ensure answer field is never empty/null
+    if not extracted.get('answer') or str(extracted.get('answer', '')).strip() == '':
+        # Use summary as fallback, or generate a not-found message
+        if extracted.get('summary'):
+            extracted['answer'] = extracted['summary']
+        else:
+            extracted['answer'] = f"No specific information found in the available documents for this query."
+
+    return {
+        'extracted': extracted,
+        'extraction_type': extraction_type,
+        'mode': 'single',
+        'usage': usage,
+        'context': context_stats
+    }
+
+
+def extract_answer_map_reduce_mode(query, documents, community, extraction_type, on_field=None):
+    """
+    Map-reduce extraction in the ai_answer shape of the single-prompt path,
+    plus conflicts_found/conflict_note and map/reduce timings.
+    """
+    answer_path.inc(extraction_type, 'map_reduce')
+    start = time.perf_counter()
+    result = extract_answer_map_reduce(query, documents, community, on_field=on_field,
+                                       timeout=backend_timeout(30))
+    extraction_latency.observe(time.perf_counter() - start, 'map_reduce')
+    if not result:
+        return None
+    record_claude_usage(result.get('usage'))
+
+    archived = {d.get('title') for d in documents if d.get('is_archived')}
+    found = result.get('found')
+    extracted = {
+        'answer': result['answer'] if found else "No specific information found in the available documents for this query.",
+        'source': result.get('source_document'),
+        'quote': result.get('quote'),
+        'summary': result.get('related_info') or result['answer'],
+        'documents_found': [s.get('document') for s in result.get('sources') or [] if s.get('document')],
+        'category': extraction_type,
+        'from_archive': result.get('source_document') in archived,
+        'confidence': result.get('confidence'),
+        'conflicts_found': bool(result.get('conflicts_found')),
+        'conflict_note': result.get('conflict_note'),
+        'follow_up_questions': result.get('follow_up_questions'),
+    }
+    return {
+        'extracted': extracted,
+        'extraction_type': extraction_type,
+        'mode': 'map_reduce',
+        'usage': result.get('usage'),
+        'timings': result.get('timings'),
+    }
+
+
+# =============================================================================
+# AUTHENTICATION ROUTES
+# =============================================================================
+
+@app.route('/login')
+def login():
+    """Initiate Microsoft OAuth login flow."""
     if not MS_CLIENT_SECRET:
         # If auth not configured, show error
         return render_template('login.html', error="Microsoft authentication not configured. Please contact administrator.")
@@ -1609,6 +2407,7 @@ def auth_callback():
                     logger.warning(f"Non-PSPM user attempted login: {email}")
                     return render_template('login.html', error="Access restricted to PS Property Management staff only.")
 
+                session['session_id'] = str(uuid.uuid4())
                 session['user'] = {
                     'name': user_data.get('displayName', 'Unknown'),
                     'email': email,
@@ -1652,31 +2451,195 @@ def logout():
 @login_required
 def index():
     """Render the main search interface."""
-    return render_template('index.html', user=session.get('user'))
+    from thumbnails import HAS_RENDERER
+    return render_template('index.html', user=session.get('user'), thumbnails_enabled=HAS_RENDERER)
+
+
+# =============================================================================
+# STATUS / HEALTH (cached backend probes, cache and capacity counters)
+# =============================================================================
+# Probes run in a background thread at most once per TTL, so /api/status can
+# be polled often (Cloud Run, the header status dot) without touching a backend
+HEALTH_PROBE_TTL = int(os.environ.get('HEALTH_PROBE_TTL', 30))
+DOCUMENT_COUNT_TTL = int(os.environ.get('DOCUMENT_COUNT_TTL', 600))
+
+
+def _probe_dataverse():
+    import requests
+
+    token = get_dataverse_token()
+    if not token:
+        raise RuntimeError('no Dataverse token')
+    resp = requests.get(
+        f"{DATAVERSE_ENV_URL.rstrip('/')}/api/data/v9.2/{TABLE_NAME}",
+        headers={'Authorization': f'Bearer {token}', 'OData-MaxVersion': '4.0', 'OData-Version': '4.0'},
+        params={'$select': 'cr258_accountnumber', '$top': '1'},
+        timeout=5
+    )
+    resp.raise_for_status()
+
+
+def _probe_azure_search():
+    import requests
+
+    if not AZURE_SEARCH_API_KEY:
+        raise RuntimeError('not configured')
+    resp = requests.get(
+        f"{AZURE_SEARCH_ENDPOINT}/indexes/{AZURE_SEARCH_INDEX}/docs/$count?api-version=2024-05-01-preview",
+        headers={'api-key': AZURE_SEARCH_API_KEY},
+        timeout=5
+    )
+    resp.raise_for_status()
+    return {'count': int(resp.text.strip().lstrip('\ufeff'))}
+
+
+def _probe_power_bi():
+    if not get_pbi_token():
+        raise RuntimeError('no Power BI token')
+
+
+_health_probes = ProbeRunner()
+_health_probes.add('dataverse', _probe_dataverse, HEALTH_PROBE_TTL)
+_health_probes.add('azure_search', _probe_azure_search, DOCUMENT_COUNT_TTL)
+_health_probes.add('power_bi', _probe_power_bi, HEALTH_PROBE_TTL)
+
+
+def _token_seconds_left(cache):
+    if not cache['token']:
+        return None
+    return max(int(cache['expires'] - time.time()), 0)
+
+
+def cache_status():
+    """Hit ratios and sizes of the in-process and on-disk caches."""
+    pdf = _pdf_cache.summary() if _pdf_cache is not None else None
+    if pdf is not None:
+        pdf['hit_ratio'] = hit_ratio(pdf.get('hits', 0), pdf.get('misses', 0))
+    return {
+        'ledger': dict(_ledger_stats, entries=len(_ledger_cache),
+                       hit_ratio=hit_ratio(_ledger_stats['hits'], _ledger_stats['misses'])),
+        'owner_map': {'entries': len(_pbi_owner_map['map']), 'loaded_at': _pbi_owner_map['loaded_at'] or None,
+                      'next_attempt': _pbi_owner_map['next_attempt'] or None},
+        'dax_batcher': dict(_dax_batcher.stats),
+        'pdf': pdf,
+        'homeowner_snapshot': {
+            'records': len(_homeowner_snapshot['records']),
+            'built_at': _homeowner_snapshot['built_at'] or None,
+        },
+        'document_metadata': dict(_document_metadata.summary(),
+                                  hit_ratio=hit_ratio(_document_metadata.stats['hits'],
+                                                      _document_metadata.stats['misses'])),
+        'semantic_answers': dict(_semantic_cache.summary(),
+                                 hit_ratio=hit_ratio(_semantic_cache.stats['hits'], _semantic_cache.stats['misses'])),
+        'policy_facts': {
+            'communities': len(_policy_facts['store']),
+            'built_at': _policy_facts['store'].built_at,
+            'loaded_at': _policy_facts['loaded_at'] or None,
+        },
+    }
 
 
 @app.route('/api/status')
 def api_status():
-    """Check Dataverse connection status."""
-    token = get_dataverse_token()
+    """Health and capacity: cached backend probes, record/document counts, caches, tokens, load."""
+    probes = _health_probes.results()
     azure_configured = bool(AZURE_SEARCH_API_KEY)
 
-    if token:
-        return jsonify({
-            'status': 'connected',
-            'dataverse_url': DATAVERSE_ENV_URL,
-            'table': TABLE_NAME,
-            'record_count': '23,752+',
-            'azure_search': 'configured' if azure_configured else 'not configured',
-            'documents_indexed': '482,000+' if azure_configured else 'N/A'
-        })
+    if 'dataverse' in probes:
+        connected = probes['dataverse']['ok']
     else:
-        return jsonify({
-            'status': 'disconnected',
-            'error': 'Could not connect to Dataverse',
-            'check_credentials': not bool(DATAVERSE_CLIENT_SECRET),
-            'azure_search': 'configured' if azure_configured else 'not configured'
-        }), 503
+        # First poll after startup - the probe is still running
+        connected = bool(get_dataverse_token())
+
+    snapshot_records = len(_homeowner_snapshot['records'])
+    body = {
+        'status': 'connected' if connected else 'disconnected',
+        'dataverse_url': DATAVERSE_ENV_URL,
+        'table': TABLE_NAME,
+        'record_count': snapshot_records or None,
+        'azure_search': 'configured' if azure_configured else 'not configured',
+        'documents_indexed': probes.get('azure_search', {}).get('count'),
+        'probes': probes,
+        'circuit_breakers': circuit_breaker_status(),
+        'claude_dispatcher': claude_dispatcher.snapshot(),
+        'caches': cache_status(),
+        'tokens': {
+            'dataverse_expires_in': _token_seconds_left(_token_cache),
+            'power_bi_expires_in': _token_seconds_left(_pbi_token_cache),
+            'graph_expires_in': _token_seconds_left(_graph_token_cache),
+        },
+        'analytics': dict(_analytics_stats, queue_depth=_analytics_queue.qsize(),
+                          queue_max=ANALYTICS_QUEUE_MAX),
+        'capacity': dict(_inflight.snapshot(), worker_class=os.environ.get('GUNICORN_WORKER_CLASS', 'gevent')),
+    }
+    if connected:
+        return jsonify(body)
+    body['error'] = probes.get('dataverse', {}).get('error') or 'Could not connect to Dataverse'
+    body['check_credentials'] = not bool(DATAVERSE_CLIENT_SECRET)
+    return jsonify(body), 503
+
+
+# =============================================================================
+# METRICS (Prometheus text format)
+# =============================================================================
+# Cache and queue counters already kept by the app are read at scrape time
+# (CallbackMetric), so they add nothing to the request path.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+_BREAKER_STATE_VALUES = {'closed': 0, 'half_open': 1, 'open': 2}
+
+
+def _cache_counter_samples():
+    yield ('ledger', 'hit'), _ledger_stats['hits']
+    yield ('ledger', 'miss'), _ledger_stats['misses']
+    if _pdf_cache is not None:
+        pdf = _pdf_cache.summary()
+        yield ('pdf', 'hit'), pdf.get('hits', 0)
+        yield ('pdf', 'miss'), pdf.get('misses', 0)
+    yield ('document_metadata', 'hit'), _document_metadata.stats['hits']
+    yield ('document_metadata', 'miss'), _document_metadata.stats['misses']
+    yield ('semantic_answer', 'hit'), _semantic_cache.stats['hits']
+    yield ('semantic_answer', 'miss'), _semantic_cache.stats['misses']
+
+
+metrics.CallbackMetric('mw_cache_lookups', 'Cache lookups by cache and result', 'counter',
+                       ('cache', 'result'), _cache_counter_samples)
+metrics.CallbackMetric('mw_cache_entries', 'Entries held per cache', 'gauge', ('cache',), lambda: [
+    (('ledger',), len(_ledger_cache)),
+    (('owner_map',), len(_pbi_owner_map['map'])),
+    (('homeowner_snapshot',), len(_homeowner_snapshot['records'])),
+    (('pdf',), _pdf_cache.summary()['entries'] if _pdf_cache is not None else None),
+    (('document_metadata',), len(_document_metadata)),
+    (('semantic_answer',), len(_semantic_cache)),
+])
+metrics.CallbackMetric('mw_claude_queue_depth', 'Claude calls waiting for the rate limiter', 'gauge', ('priority',),
+                       lambda: [((k,), v) for k, v in claude_dispatcher.queue_depth().items()])
+metrics.CallbackMetric('mw_claude_dispatcher', 'Claude dispatcher counters (calls, coalesced, throttled, retries, '
+                       'rejected, failed)', 'counter', ('counter',),
+                       lambda: [((k,), v) for k, v in claude_dispatcher.stats.items()])
+metrics.CallbackMetric('mw_semantic_cache_evictions', 'Semantic answer cache LRU evictions', 'counter', (),
+                       lambda: [((), _semantic_cache.stats['evictions'])])
+metrics.CallbackMetric('mw_dax_batcher', 'DAX batcher counters', 'counter', ('counter',),
+                       lambda: [((k,), v) for k, v in _dax_batcher.stats.items()])
+metrics.CallbackMetric('mw_http_in_flight', 'Requests in flight in this worker', 'gauge', (),
+                       lambda: [((), _inflight.current)])
+metrics.CallbackMetric('mw_http_saturation', 'In-flight requests / worker concurrency', 'gauge', (),
+                       lambda: [((), _inflight.current / _inflight.capacity)])
+metrics.CallbackMetric('mw_analytics_queue_depth', 'Search events waiting for Supabase', 'gauge', (),
+                       lambda: [((), _analytics_queue.qsize())])
+metrics.CallbackMetric('mw_analytics_events', 'Search analytics events by result', 'counter', ('result',),
+                       lambda: [((k,), v) for k, v in _analytics_stats.items()])
+metrics.CallbackMetric('mw_circuit_breaker_state', 'Breaker state (0 closed, 1 half-open, 2 open)', 'gauge',
+                       ('backend',), lambda: [((name,), _BREAKER_STATE_VALUES[b.state])
+                                              for name, b in _backend_breakers.items()])
+
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus scrape endpoint (bearer METRICS_TOKEN when set)."""
+    if METRICS_TOKEN and request.headers.get('Authorization') != f'Bearer {METRICS_TOKEN}':
+        return Response('unauthorized\n', status=401, mimetype='text/plain')
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
 
 
 @app.route('/api/communities')
@@ -1692,20 +2655,11 @@ def api_communities():
             'count': len(matches)
         })
     else:
-        # Return all communities (for initial load)
-        communities = []
-        for comm in ACTIVE_COMMUNITIES:
-            if comm.get('short_name'):
-                communities.append({
-                    'name': comm['short_name'],
-                    'full_name': comm.get('name', ''),
-                    'code': comm.get('code', '')
-                })
-        communities.sort(key=lambda x: x['name'].lower())
-        return jsonify({
-            'communities': communities,
-            'count': len(communities)
-        })
+        # Return all communities (for initial load) - precomputed, 304 when unchanged
+        response = Response(COMMUNITY_LIST_JSON, mimetype='application/json')
+        response.set_etag(COMMUNITY_LIST_ETAG)
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
 
 
 @app.route('/api/suggestions')
@@ -1723,7 +2677,25 @@ def api_suggestions():
     })
 
 
+# Fan-out pool for independent backend calls within one request
+# (greenlet-backed under the gevent worker)
+_search_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('SEARCH_FANOUT_WORKERS', 32)),
+    thread_name_prefix='search-fanout'
+)
+
+# End-to-end request budgets (seconds); backend timeouts are clipped to what is left
+UNIFIED_SEARCH_BUDGET = float(os.environ.get('UNIFIED_SEARCH_BUDGET', 20))
+DOCUMENT_SEARCH_BUDGET = float(os.environ.get('DOCUMENT_SEARCH_BUDGET', 20))
+HOMEOWNER_SEARCH_BUDGET = float(os.environ.get('HOMEOWNER_SEARCH_BUDGET', 10))
+HISTORY_BUDGET = float(os.environ.get('HISTORY_BUDGET', 10))
+SUGGEST_BUDGET = float(os.environ.get('SUGGEST_BUDGET', 3))
+# Minimum budget left to start a Claude extraction (otherwise reported as pending)
+CLAUDE_MIN_BUDGET = float(os.environ.get('CLAUDE_MIN_BUDGET', 5))
+
+
 @app.route('/api/unified-search')
+@with_deadline(UNIFIED_SEARCH_BUDGET)
 def unified_search():
     """
     Smart unified search - auto-detects whether to search homeowners or documents.
@@ -1732,10 +2704,86 @@ def unified_search():
     start_time = time.time()
     query = request.args.get('q', '').strip()
     mode = request.args.get('mode', 'auto')  # auto, homeowner(s), document(s), both
+    community_filter = request.args.get('community', '').strip() or None
 
     if not query:
         return jsonify({'error': 'Query required'}), 400
 
+    result = run_unified_search(query, mode, community_filter, extraction_mode=extraction_mode_arg())
+    log_unified_search(result, community_filter, start_time)
+
+    degraded = degraded_stages()
+    if degraded:
+        result['degraded'] = degraded
+
+    return jsonify(result)
+
+
+def _sse(event, data):
+    """One server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.route('/api/unified-search/stream')
+def unified_search_stream():
+    """
+    Server-sent-events variant of /api/unified-search. Sends a 'results'
+    event (homeowners, documents) as soon as the searches finish,
+    'answer_field' events as each field of Claude's JSON reply completes -
+    the answer first - and a final 'done' event with the whole ai_answer.
+    """
+    start_time = time.time()
+    query = request.args.get('q', '').strip()
+    mode = request.args.get('mode', 'auto')
+    community_filter = request.args.get('community', '').strip() or None
+    extraction_mode = extraction_mode_arg()
+
+    if not query:
+        return jsonify({'error': 'Query required'}), 400
+
+    def generate():
+        token = set_deadline(UNIFIED_SEARCH_BUDGET)
+        try:
+            result = run_unified_search(query, mode, community_filter, extract_answer=False,
+                                        extraction_mode=extraction_mode)
+            yield _sse('results', result)
+
+            if result.pop('ai_answer_pending', False):
+                fields = queue.Queue()
+                future = submit(
+                    _search_executor, extract_answer_with_claude,
+                    query, result['documents'], result['community_detected'],
+                    on_field=lambda key, value: fields.put((key, value)), mode=extraction_mode
+                )
+                future.add_done_callback(lambda f: fields.put(None))
+                while True:
+                    item = fields.get()
+                    if item is None:
+                        break
+                    yield _sse('answer_field', {'field': item[0], 'value': item[1]})
+                try:
+                    result['ai_answer'] = future.result()
+                except Exception as e:
+                    logger.error(f"Streaming extraction failed: {e}")
+                if result['ai_answer']:
+                    semantic_cache_store(query, result['community_detected'], result, extraction_mode)
+
+            log_unified_search(result, community_filter, start_time)
+            yield _sse('done', {'ai_answer': result['ai_answer'], 'degraded': degraded_stages()})
+        finally:
+            reset_deadline(token)
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+def run_unified_search(query, mode, community_filter=None, extract_answer=True, extraction_mode=None):
+    """
+    Homeowner + document search behind both unified-search routes. With
+    extract_answer=False the Claude step is left to the caller and
+    result['ai_answer_pending'] says whether to run it.
+    extraction_mode: 'single' or 'map_reduce' (default EXTRACTION_MODE).
+    """
     # Normalize mode - accept both singular and plural forms
     mode = mode.rstrip('s') if mode in ['homeowners', 'documents'] else mode
 
@@ -1746,7 +2794,6 @@ def unified_search():
         detected_type = mode
 
     # Extract community: prefer explicit parameter, fallback to query text extraction
-    community_filter = request.args.get('community', '').strip() or None
     community = community_filter or extract_community_from_query(query)
 
     result = {
@@ -1758,34 +2805,67 @@ def unified_search():
         'ai_answer': None
     }
 
-    # Search homeowners if needed
+    # Search homeowners if needed - Dataverse runs alongside the document search
+    homeowner_future = None
     if detected_type in ['homeowner', 'both']:
         # Reuse existing search logic
-        homeowner_result = search_homeowners_internal(query, community)
-        result['homeowners'] = homeowner_result.get('homeowners', [])
-        result['homeowner_count'] = len(result['homeowners'])
+        homeowner_future = submit(_search_executor, search_homeowners_internal, query, community)
+
+    # A paraphrase of a recently answered question reuses its documents and answer
+    cached = semantic_cache_lookup(query, community, extraction_mode) \
+        if detected_type in ['document', 'both'] else None
+    if cached:
+        result['documents'] = cached['documents']
+        result['document_count'] = len(result['documents'])
+        result['semantic_answers'] = cached['semantic_answers']
+        result['ai_answer'] = cached['ai_answer']
+        result['cache'] = {'semantic': True, 'similarity': cached['similarity'],
+                           'matched_query': cached['matched_query']}
 
     # Search documents if needed
-    if detected_type in ['document', 'both']:
+    elif detected_type in ['document', 'both']:
         doc_result = search_azure_documents(query, community)
         result['documents'] = doc_result.get('documents', [])
         result['document_count'] = len(result['documents'])
         result['semantic_answers'] = doc_result.get('answers', [])
-
-        # If we have documents, try to extract a structured answer
-        if result['documents'] and ANTHROPIC_API_KEY:
-            ai_result = extract_answer_with_claude(query, result['documents'], community)
-            if ai_result:
-                result['ai_answer'] = ai_result
+        queue_thumbnails(result['documents'])
+
+        # Structured answer: precomputed community facts, then rules over the documents, then Claude
+        result['ai_answer'] = fact_answer(query, community)
+        if not result['ai_answer'] and result['documents']:
+            result['ai_answer'] = rule_answer(query, result['documents'], community)
+        if result['documents'] and not result['ai_answer'] and ANTHROPIC_API_KEY:
+            if not has_budget(CLAUDE_MIN_BUDGET):
+                mark_degraded('ai_answer', status='pending')
+            elif extract_answer:
+                ai_result = extract_answer_with_claude(query, result['documents'], community,
+                                                       mode=extraction_mode)
+                if ai_result:
+                    result['ai_answer'] = ai_result
+                    semantic_cache_store(query, community, result, extraction_mode)
+            else:
+                result['ai_answer_pending'] = True
 
         # If no documents found and query looks like community name, suggest alternatives
-        if not result['documents'] and community:
+        if not result['documents'] and community and has_budget(0.5):
             suggestions = get_community_suggestions(community)
             if suggestions:
                 result['community_suggestions'] = suggestions
 
+    if homeowner_future is not None:
+        try:
+            homeowner_result = homeowner_future.result(timeout=remaining())
+        except FuturesTimeoutError:
+            homeowner_result = {}
+            mark_degraded('homeowners', status='timeout')
+        result['homeowners'] = homeowner_result.get('homeowners', [])
+        result['homeowner_count'] = len(result['homeowners'])
+        prefetch_history(result['homeowners'])
+
     # Also add suggestions if no results at all
-    if not result.get('homeowners') and not result.get('documents'):
+    if not result.get('homeowners') and not result.get('documents') and not has_budget(0.5):
+        mark_degraded('community_suggestions')
+    elif not result.get('homeowners') and not result.get('documents'):
         # Extract what looks like community name from query
         words = query.split()
         potential_community = ' '.join(words[-2:]) if len(words) >= 2 else query
@@ -1793,14 +2873,18 @@ def unified_search():
         if suggestions:
             result['community_suggestions'] = suggestions
 
-    # --- Analytics logging ---
+    return result
+
+
+def log_unified_search(result, community_filter, start_time):
+    """Analytics logging for a finished unified search."""
     elapsed_ms = int((time.time() - start_time) * 1000)
     ai_answer = result.get('ai_answer')
     log_search_analytics(
-        query_raw=query,
-        detected_type=detected_type,
+        query_raw=result['query'],
+        detected_type=result['detected_type'],
         community_filter=community_filter,
-        community_detected=community,
+        community_detected=result['community_detected'],
         homeowner_count=len(result.get('homeowners', [])),
         document_count=len(result.get('documents', [])),
         has_ai_answer=bool(ai_answer),
@@ -1810,8 +2894,6 @@ def unified_search():
         search_mode='unified'
     )
 
-    return jsonify(result)
-
 
 def search_homeowners_internal(query, community=None):
     """Internal homeowner search - returns dict instead of Response."""
@@ -1855,6 +2937,7 @@ def search_homeowners_internal(query, community=None):
 
 
 @app.route('/api/documents/search')
+@with_deadline(DOCUMENT_SEARCH_BUDGET)
 def search_documents():
     """Direct document search endpoint."""
     start_time = time.time()
@@ -1867,11 +2950,20 @@ def search_documents():
         return jsonify({'error': 'Query required'}), 400
 
     result = search_azure_documents(query, community, top)
+    queue_thumbnails(result.get('documents'))
 
-    if extract_answer and result.get('documents') and ANTHROPIC_API_KEY:
-        ai_result = extract_answer_with_claude(query, result['documents'], community)
+    if extract_answer and result.get('documents'):
+        ai_result = fact_answer(query, community) or rule_answer(query, result['documents'], community)
         if ai_result:
             result['ai_answer'] = ai_result
+    if extract_answer and result.get('documents') and not result.get('ai_answer') and ANTHROPIC_API_KEY:
+        if has_budget(CLAUDE_MIN_BUDGET):
+            ai_result = extract_answer_with_claude(query, result['documents'], community,
+                                                   mode=extraction_mode_arg())
+            if ai_result:
+                result['ai_answer'] = ai_result
+        else:
+            mark_degraded('ai_answer', status='pending')
 
     # --- Analytics logging ---
     elapsed_ms = int((time.time() - start_time) * 1000)
@@ -1890,10 +2982,15 @@ def search_documents():
         search_mode='document'
     )
 
+    degraded = degraded_stages()
+    if degraded:
+        result['degraded'] = degraded
+
     return jsonify(result)
 
 
 @app.route('/api/search')
+@with_deadline(HOMEOWNER_SEARCH_BUDGET)
 def search():
     """Universal homeowner search endpoint."""
     start_time = time.time()
@@ -1958,6 +3055,9 @@ def search():
         ho_count = len(resp_data.get('homeowners', [])) if resp_data else 0
     except Exception:
         ho_count = 0
+    if resp_data:
+        prefetch_history(resp_data.get('homeowners'))
+
     log_search_analytics(
         query_raw=query,
         detected_type='homeowner',
@@ -2006,17 +3106,65 @@ def search_by_phone(phone, community_filter=None):
     })
 
 
-def search_by_address(address, community_filter=None):
-    """Search by address - enhanced with normalization, parsing, and fuzzy matching."""
+def _score_address_candidates(query_parsed, results):
+    """Score Dataverse rows against a parsed query address, best match first."""
     from address_utils import (
-        AddressParser, address_similarity_score, extract_search_terms,
-        STREET_TYPE_MAPPINGS, MIN_ADDRESS_MATCH_SCORE, FUZZY_ADDRESS_MATCH_SCORE
+        cached_parse_address, address_similarity_score,
+        MIN_ADDRESS_MATCH_SCORE, FUZZY_ADDRESS_MATCH_SCORE
     )
 
-    parser = AddressParser()
-    query_parsed = parser.parse(address)
+    scored_results = []
+    for rec in results:
+        if is_excluded_community(rec.get('cr258_assoc_name')):
+            continue
+
+        candidate_address = rec.get('cr258_property_address', '')
+        candidate_parsed = cached_parse_address(candidate_address)
+        score = address_similarity_score(query_parsed, candidate_parsed)
+
+        if score >= FUZZY_ADDRESS_MATCH_SCORE:
+            homeowner = format_homeowner(rec)
+            homeowner['_match_score'] = round(score, 3)
+            homeowner['_is_fuzzy'] = score < MIN_ADDRESS_MATCH_SCORE
+            scored_results.append((score, homeowner))
+
+    # Sort by score descending
+    scored_results.sort(key=lambda x: x[0], reverse=True)
+    return [h for _, h in scored_results]
+
+
+def search_by_address(address, community_filter=None):
+    """Search by address - enhanced with normalization, parsing, and fuzzy matching."""
+    from address_utils import cached_parse_address
+
+    query_parsed = cached_parse_address(address)
     safe_address = address.replace("'", "''")
 
+    # Strategy 0: Canonical key index - "1234 Oak Drive" hits "1234 oak dr" directly
+    address_index = get_address_index()
+    if address_index is not None:
+        if query_parsed.street_number:
+            accounts = address_index.lookup(query_parsed)
+        else:
+            accounts = address_index.lookup_street_name(query_parsed)
+
+        if accounts:
+            results = query_dataverse_by_accounts(accounts, community_filter)
+            if results is None:
+                return jsonify({'error': 'Dataverse connection failed', 'homeowners': []}), 503
+
+            homeowners = _score_address_candidates(query_parsed, results)
+            if homeowners:
+                return jsonify({
+                    'search_type': 'address',
+                    'query': address,
+                    'community_filter': community_filter,
+                    'homeowners': homeowners,
+                    'count': len(homeowners),
+                    'parsed': query_parsed.to_dict(),
+                    'index_used': True
+                })
+
     # Strategy 1: If we have a street number, use precise matching
     if query_parsed.street_number:
         # Build filter starting with street number at the beginning
@@ -2052,24 +3200,7 @@ def search_by_address(address, community_filter=None):
 
         # Score and rank results using address similarity
         if results:
-            scored_results = []
-            for rec in results:
-                if is_excluded_community(rec.get('cr258_assoc_name')):
-                    continue
-
-                candidate_address = rec.get('cr258_property_address', '')
-                candidate_parsed = parser.parse(candidate_address)
-                score = address_similarity_score(query_parsed, candidate_parsed)
-
-                if score >= FUZZY_ADDRESS_MATCH_SCORE:
-                    homeowner = format_homeowner(rec)
-                    homeowner['_match_score'] = round(score, 3)
-                    homeowner['_is_fuzzy'] = score < MIN_ADDRESS_MATCH_SCORE
-                    scored_results.append((score, homeowner))
-
-            # Sort by score descending
-            scored_results.sort(key=lambda x: x[0], reverse=True)
-            homeowners = [h for _, h in scored_results]
+            homeowners = _score_address_candidates(query_parsed, results)
 
             return jsonify({
                 'search_type': 'address',
@@ -2077,7 +3208,7 @@ def search_by_address(address, community_filter=None):
                 'community_filter': community_filter,
                 'homeowners': homeowners,
                 'count': len(homeowners),
-                'parsed': query_parsed.to_dict() if hasattr(query_parsed, 'to_dict') else None
+                'parsed': query_parsed.to_dict()
             })
 
     # Strategy 2: Fallback for addresses without clear street number
@@ -2339,10 +3470,11 @@ def search_by_unit(unit_query, community_filter=None):
 
 
 @app.route('/api/history')
+@with_deadline(HISTORY_BUDGET)
 def get_history():
     """Get payment/charge history for an account - returns ledger-style data."""
     account = request.args.get('account', '').strip()
-    limit = int(request.args.get('limit', 15))
+    limit = int(request.args.get('limit', HISTORY_DEFAULT_LIMIT))
 
     if not account:
         return jsonify({'error': 'Account number required', 'history': []}), 400
@@ -2388,7 +3520,18 @@ def get_history():
     })
 
 
+@app.route('/api/history/prefetch/cancel', methods=['POST'])
+def cancel_history_prefetch_route():
+    """Cancel queued history prefetches (sent by the page on a new search or unload)."""
+    cancel_history_prefetch()
+    return jsonify({'cancelled': True})
+
+
+SUGGESTION_ICONS = {'person': 'user', 'address': 'map-marker-alt', 'community': 'building'}
+
+
 @app.route('/api/suggest')
+@with_deadline(SUGGEST_BUDGET)
 def suggest():
     """Predictive search - return quick suggestions as user types."""
     query = request.args.get('q', '').strip()
@@ -2396,6 +3539,30 @@ def suggest():
     if len(query) < 2:
         return jsonify({'suggestions': []})
 
+    # Served from the in-process typeahead index once the snapshot is loaded
+    typeahead = get_typeahead_index()
+    if typeahead is not None:
+        has_digits = any(c.isdigit() for c in query)
+        suggestions = [
+            {
+                'text': entry['text'],
+                'type': kind,
+                'icon': SUGGESTION_ICONS[kind],
+                'subtext': entry['subtext']
+            }
+            for kind, entry in typeahead.suggest(query, include_addresses=has_digits)
+        ]
+        return jsonify({
+            'query': query,
+            'suggestions': suggestions[:8],
+            'source': 'index'
+        })
+
+    return jsonify(suggest_from_dataverse(query))
+
+
+def suggest_from_dataverse(query):
+    """Fallback suggestions via Dataverse contains() filters (snapshot not loaded yet)."""
     safe_query = query.replace("'", "''")
     suggestions = []
     seen = set()
@@ -2458,10 +3625,11 @@ def suggest():
                     })
 
     # Limit to 8 total suggestions
-    return jsonify({
+    return {
         'query': query,
-        'suggestions': suggestions[:8]
-    })
+        'suggestions': suggestions[:8],
+        'source': 'dataverse'
+    }
 
 
 # =============================================================================
@@ -2661,10 +3829,143 @@ def get_graph_token():
         return None
 
 
+# PDF proxy disk cache (keyed by SharePoint path + Graph eTag). On Cloud Run
+# /tmp is an in-memory filesystem that counts against the instance's memory
+# limit, so the default budget is small; for a larger cache mount a volume
+# (e.g. a Cloud Storage FUSE or NFS volume) and point PDF_CACHE_DIR at it.
+PDF_CACHE_DIR = os.environ.get('PDF_CACHE_DIR', '/tmp/pdf_cache')
+PDF_CACHE_MAX_MB = int(os.environ.get('PDF_CACHE_MAX_MB', 192))
+PDF_REVALIDATE_SECONDS = int(os.environ.get('PDF_REVALIDATE_SECONDS', 600))
+PDF_CHUNK_SIZE = 64 * 1024
+GRAPH_DRIVE_ROOT = "https://graph.microsoft.com/v1.0/sites/psprop.sharepoint.com:/sites/AssociationDocs:/drive/root:"
+
+_pdf_cache = None
+_pdf_cache_lock = threading.Lock()
+_pdf_fills_in_flight = set()
+
+
+def get_pdf_cache():
+    """Get or create the PDF disk cache (lazy init)."""
+    global _pdf_cache
+    with _pdf_cache_lock:
+        if _pdf_cache is None:
+            from pdf_cache import PdfDiskCache
+            _pdf_cache = PdfDiskCache(PDF_CACHE_DIR, PDF_CACHE_MAX_MB * 1024 * 1024)
+    return _pdf_cache
+
+
+@instrument_backend('graph', failed=lambda result: result[0] != 200)
+def get_graph_item(relative_path, token):
+    """Fetch eTag, size and a pre-authenticated download URL for a SharePoint file."""
+    import requests as req
+
+    resp = req.get(
+        f"{GRAPH_DRIVE_ROOT}/{relative_path}",
+        headers={'Authorization': f'Bearer {token}'},
+        params={'$select': 'eTag,size,@microsoft.graph.downloadUrl'},
+        timeout=15
+    )
+    if resp.status_code != 200:
+        logger.error(f"Graph API item lookup failed: {resp.status_code} - {resp.text[:200]}")
+        return resp.status_code, None
+    return 200, resp.json()
+
+
+def sharepoint_relative_path(url):
+    """Drive-relative path for a SharePoint AssociationDocs URL, or None."""
+    from urllib.parse import unquote
+
+    # URL format: https://psprop.sharepoint.com/sites/AssociationDocs/Association%20Documents/Community/folder/file.pdf
+    match = re.search(r'/sites/AssociationDocs/(.+)', url or '')
+    if not match:
+        return None
+    # URL-decode the path for Graph API
+    return unquote(match.group(1))
+
+
+graph_download_bytes = metrics.Counter('mw_graph_download_bytes', 'PDF bytes downloaded from SharePoint')
+
+
+def _iter_upstream(resp):
+    """Yield a streamed response's body in chunks, closing it when done or abandoned."""
+    try:
+        for chunk in resp.iter_content(chunk_size=PDF_CHUNK_SIZE):
+            graph_download_bytes.inc(amount=len(chunk))
+            yield chunk
+    finally:
+        resp.close()
+
+
+def _upstream_total_size(resp, size=None):
+    """Whole-file size of a PDF: Graph's item size, else the Content-Range total or a 200's Content-Length."""
+    if size:
+        return int(size)
+    content_range = resp.headers.get('Content-Range') or ''
+    total = content_range.rpartition('/')[2]
+    if total.isdigit():
+        return int(total)
+    if resp.status_code == 200 and (resp.headers.get('Content-Length') or '').isdigit():
+        return int(resp.headers['Content-Length'])
+    return None
+
+
+def _fill_pdf_cache(relative_path, etag, download_url, size):
+    """
+    Download a whole PDF into the cache in the background (one fill per path).
+    Files the cache would refuse (over max_file_bytes) are never fetched.
+    """
+    import requests as req
+
+    if size and size > get_pdf_cache().max_file_bytes:
+        return
+    with _pdf_cache_lock:
+        if relative_path in _pdf_fills_in_flight:
+            return
+        _pdf_fills_in_flight.add(relative_path)
+
+    def _fill():
+        try:
+            resp = req.get(download_url, stream=True, timeout=15)
+            if resp.status_code == 200:
+                for _ in get_pdf_cache().stream_into_cache(relative_path, etag, _iter_upstream(resp), size):
+                    pass
+            else:
+                resp.close()
+        except Exception as e:
+            logger.error(f"PDF cache fill failed for {relative_path}: {e}")
+        finally:
+            with _pdf_cache_lock:
+                _pdf_fills_in_flight.discard(relative_path)
+
+    threading.Thread(target=_fill, daemon=True).start()
+
+
+def _pdf_headers(extra=None):
+    headers = {
+        'Cache-Control': 'public, max-age=3600',
+        'Access-Control-Allow-Origin': '*',
+        'Accept-Ranges': 'bytes'
+    }
+    headers.update(extra or {})
+    return headers
+
+
+def _send_cached_pdf(entry):
+    """Serve a cached PDF from disk (handles Range and If-None-Match)."""
+    from flask import send_file
+
+    etag = hashlib.sha1(entry['etag'].encode('utf-8')).hexdigest()
+    response = send_file(entry['file'], mimetype='application/pdf', conditional=True, etag=etag)
+    response.headers.update(_pdf_headers())
+    return response
+
+
 @app.route('/api/pdf-proxy')
 def pdf_proxy():
     """Proxy PDF files from SharePoint for PDF.js rendering.
-    Fetches via MS Graph API to handle auth, returns raw PDF bytes.
+    Fetches via MS Graph API to handle auth. Files are streamed through (never
+    buffered whole), cached on disk by path + eTag, and served with Range
+    support so PDF.js can load pages lazily.
     """
     import requests as req
 
@@ -2672,48 +3973,235 @@ def pdf_proxy():
     if not url:
         return jsonify({'error': 'No URL provided'}), 400
 
-    # Extract relative path from SharePoint URL
-    # URL format: https://psprop.sharepoint.com/sites/AssociationDocs/Association%20Documents/Community/folder/file.pdf
-    match = re.search(r'/sites/AssociationDocs/(.+)', url)
-    if not match:
+    relative_path = sharepoint_relative_path(url)
+    if not relative_path:
         return jsonify({'error': 'Invalid SharePoint URL'}), 400
 
-    relative_path = match.group(1)
-    # URL-decode the path for Graph API
-    from urllib.parse import unquote
-    relative_path = unquote(relative_path)
+    cache = get_pdf_cache()
+    entry = cache.get(relative_path)
+    if entry and time.time() - entry['validated_at'] < PDF_REVALIDATE_SECONDS:
+        return _send_cached_pdf(entry)
 
     token = get_graph_token()
     if not token:
+        if entry:
+            return _send_cached_pdf(entry)
         return jsonify({'error': 'Authentication failed'}), 503
 
-    # Use Graph API to get file content
-    # Site: psprop.sharepoint.com/sites/AssociationDocs
-    graph_url = f"https://graph.microsoft.com/v1.0/sites/psprop.sharepoint.com:/sites/AssociationDocs:/drive/root:/{relative_path}:/content"
-
     try:
-        resp = req.get(graph_url, headers={
-            'Authorization': f'Bearer {token}'
-        }, stream=True, timeout=15)
-
-        if resp.status_code == 200:
-            from flask import Response
-            return Response(
-                resp.content,
-                content_type='application/pdf',
-                headers={
-                    'Cache-Control': 'public, max-age=3600',
-                    'Access-Control-Allow-Origin': '*'
-                }
-            )
-        else:
+        # Revalidate (or look up) the file: eTag, size and download URL
+        # Site: psprop.sharepoint.com/sites/AssociationDocs
+        try:
+            status, item = get_graph_item(relative_path, token)
+        except Exception as e:
+            if not entry:
+                raise
+            logger.warning(f"Graph item lookup failed for {relative_path}: {e}")
+            status, item = None, None
+        if not item:
+            if entry:
+                logger.warning(f"Serving unvalidated cached PDF for {relative_path}")
+                return _send_cached_pdf(entry)
+            return jsonify({'error': f'File fetch failed: {status}'}), status
+
+        etag = item.get('eTag') or ''
+        if entry and entry['etag'] == etag:
+            cache.mark_validated(relative_path)
+            return _send_cached_pdf(entry)
+        if entry:
+            cache.invalidate(relative_path)
+
+        download_url = item.get('@microsoft.graph.downloadUrl')
+        size = item.get('size')
+        if not download_url:
+            return jsonify({'error': 'File fetch failed: no download URL'}), 502
+
+        range_header = request.headers.get('Range')
+        if range_header:
+            # Pass the byte range through and warm the cache for the next request
+            resp = req.get(download_url, headers={'Range': range_header}, stream=True, timeout=15)
+            if resp.status_code not in (200, 206):
+                resp.close()
+                return jsonify({'error': f'File fetch failed: {resp.status_code}'}), resp.status_code
+            _fill_pdf_cache(relative_path, etag, download_url, _upstream_total_size(resp, size))
+            passthrough = {h: resp.headers[h] for h in ('Content-Range', 'Content-Length') if h in resp.headers}
+            return Response(_iter_upstream(resp), status=resp.status_code,
+                            content_type='application/pdf', headers=_pdf_headers(passthrough))
+
+        resp = req.get(download_url, stream=True, timeout=15)
+        if resp.status_code != 200:
             logger.error(f"Graph API file fetch failed: {resp.status_code} - {resp.text[:200]}")
+            resp.close()
             return jsonify({'error': f'File fetch failed: {resp.status_code}'}), resp.status_code
+
+        extra = {'Content-Length': str(size)} if size else {}
+        body = cache.stream_into_cache(relative_path, etag, _iter_upstream(resp), size)
+        return Response(body, content_type='application/pdf', headers=_pdf_headers(extra))
     except Exception as e:
         logger.error(f"PDF proxy error: {e}")
         return jsonify({'error': str(e)}), 500
 
 
+def ensure_pdf_cached(relative_path, item):
+    """Download a PDF into the disk cache unless its eTag is already cached. Returns the entry or None."""
+    import requests as req
+
+    cache = get_pdf_cache()
+    entry = cache.get(relative_path)
+    if entry and entry['etag'] == item.get('eTag'):
+        return entry
+    download_url = item.get('@microsoft.graph.downloadUrl')
+    if not download_url or (item.get('size') or 0) > cache.max_file_bytes:
+        return None
+    resp = req.get(download_url, stream=True, timeout=30)
+    if resp.status_code != 200:
+        resp.close()
+        return None
+    for _ in cache.stream_into_cache(relative_path, item.get('eTag') or '', _iter_upstream(resp), item.get('size')):
+        pass
+    return cache.get(relative_path)
+
+
+# =============================================================================
+# PDF THUMBNAILS (server-rendered first page + text preview)
+# =============================================================================
+# Document cards load a small PNG and a text snippet instead of downloading the
+# whole PDF into PDF.js. Renders are filled in the background for documents
+# returned by search; the card falls back to PDF.js until one is ready.
+
+THUMBNAIL_DIR = os.environ.get('THUMBNAIL_DIR', '/tmp/pdf_thumbnails')
+THUMBNAIL_MAX_ENTRIES = int(os.environ.get('THUMBNAIL_MAX_ENTRIES', 5000))
+THUMBNAIL_REFRESH_SECONDS = 24 * 3600
+
+_thumbnail_store = None
+_thumbnail_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='thumbnails')
+_thumbnails_queued = set()
+_thumbnail_lock = threading.Lock()
+# PDFium is not thread-safe, so renders on the native threadpool go one at a time
+_thumbnail_render_lock = threading.Lock()
+
+
+def get_thumbnail_store():
+    """Get or create the thumbnail store (lazy init)."""
+    global _thumbnail_store
+    with _thumbnail_lock:
+        if _thumbnail_store is None:
+            from thumbnails import ThumbnailStore
+            _thumbnail_store = ThumbnailStore(THUMBNAIL_DIR, THUMBNAIL_MAX_ENTRIES)
+    return _thumbnail_store
+
+
+def _render_thumbnail(relative_path):
+    """Render (or re-render after an eTag change) one document's thumbnail."""
+    from thumbnails import render_first_page
+
+    try:
+        token = get_graph_token()
+        if not token:
+            return
+        status, item = get_graph_item(relative_path, token)
+        if not item:
+            return
+        store = get_thumbnail_store()
+        existing = store.get(relative_path)
+        if existing and existing['etag'] == item.get('eTag'):
+            store.touch(relative_path)
+            return
+        if (item.get('size') or 0) > get_pdf_cache().max_file_bytes:
+            # The PDF cache would refuse it: don't download it just to throw it away
+            store.put_skipped(relative_path, item.get('eTag') or '', 'too_large')
+            return
+        entry = ensure_pdf_cached(relative_path, item)
+        if not entry:
+            return
+        with _thumbnail_render_lock:
+            rendered = run_cpu_bound(render_first_page, entry['file'])
+        if rendered:
+            store.put(relative_path, entry['etag'], rendered)
+    except Exception as e:
+        logger.error(f"Thumbnail render failed for {relative_path}: {e}")
+    finally:
+        with _thumbnail_lock:
+            _thumbnails_queued.discard(relative_path)
+
+
+def queue_thumbnail(relative_path):
+    """Queue a background render unless one is queued or a recent render exists."""
+    from thumbnails import HAS_RENDERER
+
+    if not HAS_RENDERER:
+        return
+    existing = get_thumbnail_store().get(relative_path)
+    if existing and time.time() - existing.get('rendered_at', 0) < THUMBNAIL_REFRESH_SECONDS:
+        return
+    with _thumbnail_lock:
+        if relative_path in _thumbnails_queued:
+            return
+        _thumbnails_queued.add(relative_path)
+    _thumbnail_executor.submit(_render_thumbnail, relative_path)
+
+
+def queue_thumbnails(documents):
+    """Fill thumbnails in the background for PDF search results."""
+    for doc in documents or []:
+        url = doc.get('url') or ''
+        if '.pdf' not in url.lower():
+            continue
+        relative_path = sharepoint_relative_path(url)
+        if relative_path:
+            queue_thumbnail(relative_path)
+
+
+@app.route('/api/thumbnail')
+def pdf_thumbnail():
+    """First-page PNG for a SharePoint PDF (404 until rendered - callers fall back to PDF.js)."""
+    from flask import send_file
+
+    relative_path = sharepoint_relative_path(request.args.get('url', ''))
+    if not relative_path:
+        return jsonify({'error': 'Invalid SharePoint URL'}), 400
+
+    store = get_thumbnail_store()
+    meta = store.get(relative_path)
+    if not meta:
+        queue_thumbnail(relative_path)
+        return jsonify({'error': 'Thumbnail not ready', 'status': 'pending'}), 404
+    if meta.get('skipped'):
+        return jsonify({'error': 'No thumbnail for this document', 'status': meta['skipped']}), 404
+
+    etag = hashlib.sha1(meta['etag'].encode('utf-8')).hexdigest()
+    response = send_file(store.image_path(relative_path), mimetype='image/png', conditional=True, etag=etag)
+    response.headers['Cache-Control'] = 'public, max-age=3600'
+    return response
+
+
+@app.route('/api/preview')
+def pdf_preview():
+    """First-page text preview, page count and thumbnail URL for a SharePoint PDF."""
+    from urllib.parse import quote
+
+    url = request.args.get('url', '')
+    relative_path = sharepoint_relative_path(url)
+    if not relative_path:
+        return jsonify({'error': 'Invalid SharePoint URL'}), 400
+
+    meta = get_thumbnail_store().get(relative_path)
+    if not meta:
+        queue_thumbnail(relative_path)
+        return jsonify({'ready': False})
+    if meta.get('skipped'):
+        return jsonify({'ready': False, 'skipped': meta['skipped']})
+
+    return jsonify({
+        'ready': True,
+        'text': meta['text'],
+        'pages': meta['pages'],
+        'width': meta['width'],
+        'height': meta['height'],
+        'thumbnail_url': '/api/thumbnail?url=' + quote(url, safe='')
+    })
+
+
 # =============================================================================
 # SEARCH ANALYTICS API ENDPOINTS
 # =============================================================================
@@ -0,0 +1,190 @@
+"""
+Power BI DAX query batching for Manager Wizard.
+
+Provides:
+- Coalescing of concurrent DAX queries, issued within a short window, into
+  one executeQueries request whose results are split back to each caller
+- Fallback to one query per request when the dataset rejects multi-query
+  payloads (the executeQueries API may cap queries per call)
+
+The batcher has no worker thread: the first caller in a window waits out
+the window, sends the batch, and hands every other caller its rows. A
+caller with no other query in flight sends at once - with nobody else
+talking to Power BI, no follower is likely to arrive within the window.
+
+Every caller keeps its own request deadline: the batch is sent from a
+short-lived thread under the latest deadline among its members, and each
+caller (the leader included) waits for its rows only until its own deadline
+runs out, then gives up with None.
+
+A rejected batch is retried one query per request. Batching is turned off
+only when every query then succeeds alone (the payload shape was the
+problem); if one of them fails on its own too, the batch was rejected for
+that query and batching stays on.
+"""
+
+import time
+import logging
+import threading
+from typing import Callable, List, Optional
+
+from resilience import remaining, reset_deadline, set_deadline
+
+logger = logging.getLogger(__name__)
+
+# Statuses that mean "this payload shape is not accepted", not "the query failed"
+_REJECTED_STATUSES = (400, 413)
+
+
+class _PendingQuery:
+    """One caller's query waiting for its batch to be sent."""
+
+    __slots__ = ('query', 'rows', 'done', 'deadline')
+
+    def __init__(self, query: str):
+        self.query = query
+        self.rows = None
+        self.done = threading.Event()
+        left = remaining()
+        self.deadline = None if left is None else time.monotonic() + left
+
+
+class DaxBatcher:
+    """Coalesces DAX queries into multi-query executeQueries calls."""
+
+    def __init__(self, post: Callable, window_ms: float = 10, max_batch: int = 10):
+        """
+        post(queries) sends one executeQueries request for a list of DAX
+        strings and returns the requests.Response (or None on a network error).
+        """
+        self.post = post
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.multi_query_supported = max_batch > 1 and window_ms > 0
+        self._lock = threading.Lock()
+        self._open_batch: Optional[List[_PendingQuery]] = None
+        self._in_flight = 0
+        self.stats = {'requests': 0, 'queries': 0, 'batched_queries': 0, 'solo_queries': 0,
+                      'rejected_batches': 0, 'fallbacks': 0, 'timed_out': 0}
+
+    def execute(self, query: str) -> Optional[list]:
+        """Run one DAX query, sharing a request with concurrent callers. Returns rows or None."""
+        if not self.multi_query_supported:
+            return self._send_single(query)
+
+        item = _PendingQuery(query)
+        with self._lock:
+            solo = self._in_flight == 0
+            self._in_flight += 1
+            is_leader = False
+            if not solo:
+                batch = self._open_batch
+                is_leader = batch is None or len(batch) >= self.max_batch
+                if is_leader:
+                    batch = [item]
+                    self._open_batch = batch
+                else:
+                    batch.append(item)
+
+        try:
+            if solo:
+                self.stats['solo_queries'] += 1
+                return self._send_single(query)
+            if is_leader:
+                time.sleep(self.window)
+                with self._lock:
+                    if self._open_batch is batch:
+                        self._open_batch = None
+                threading.Thread(target=self._send_batch_under_deadline, args=(batch,),
+                                 name='dax-batch', daemon=True).start()
+            if not item.done.wait(timeout=remaining()):
+                self.stats['timed_out'] += 1
+                logger.warning("DAX query ran past its request deadline waiting for its batch")
+                return None
+            return item.rows
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _send_single(self, query: str) -> Optional[list]:
+        results = self._post([query])
+        return results[0] if results else None
+
+    def _send_batch_under_deadline(self, batch: List[_PendingQuery]) -> None:
+        """Send a batch with enough budget for its most patient member (none if any has no deadline)."""
+        deadlines = [item.deadline for item in batch]
+        if any(d is None for d in deadlines):
+            self._send_batch(batch)
+            return
+        token = set_deadline(max(deadlines) - time.monotonic())
+        try:
+            self._send_batch(batch)
+        finally:
+            reset_deadline(token)
+
+    def _send_batch(self, batch: List[_PendingQuery]) -> None:
+        """Send a batch and release every waiter (retrying one by one if rejected)."""
+        try:
+            if len(batch) == 1:
+                batch[0].rows = self._send_single(batch[0].query)
+                return
+            results = self._post([item.query for item in batch], allow_reject=True)
+            if results is None:
+                self._retry_rejected(batch)
+                return
+            self.stats['batched_queries'] += len(batch)
+            for item, rows in zip(batch, results):
+                item.rows = rows
+        finally:
+            for item in batch:
+                item.done.set()
+
+    def _retry_rejected(self, batch: List[_PendingQuery]) -> None:
+        """Run a rejected batch one query per request; stop batching if each query succeeds alone."""
+        self.stats['rejected_batches'] += 1
+        for item in batch:
+            item.rows = self._send_single(item.query)
+        if all(item.rows is not None for item in batch):
+            logger.warning(f"Power BI rejected a {len(batch)}-query batch whose queries succeed alone; "
+                           "falling back to one query per request")
+            self.multi_query_supported = False
+            self.stats['fallbacks'] += 1
+
+    def _post(self, queries: List[str], allow_reject: bool = False) -> Optional[List[Optional[list]]]:
+        """
+        POST queries and split the response into rows per query (None for a
+        query that errored). Returns None only when a multi-query payload was
+        rejected; other failures yield None rows.
+        """
+        self.stats['requests'] += 1
+        self.stats['queries'] += len(queries)
+        resp = self.post(queries)
+        if resp is None:
+            return [None] * len(queries)
+
+        if resp.status_code != 200:
+            if allow_reject and resp.status_code in _REJECTED_STATUSES:
+                logger.warning(f"Power BI rejected a {len(queries)}-query batch ({resp.status_code}); "
+                               "retrying one query per request")
+                return None
+            logger.error(f"Power BI query failed: {resp.status_code} - {resp.text[:200]}")
+            return [None] * len(queries)
+
+        try:
+            results = resp.json().get('results', [])
+        except ValueError:
+            logger.error("Power BI returned a non-JSON response")
+            return [None] * len(queries)
+
+        rows_per_query = []
+        for i in range(len(queries)):
+            result = results[i] if i < len(results) else {}
+            if result.get('error'):
+                logger.error(f"Power BI query error: {str(result['error'])[:200]}")
+                rows_per_query.append(None)
+                continue
+            try:
+                rows_per_query.append(result['tables'][0]['rows'])
+            except (KeyError, IndexError, TypeError):
+                rows_per_query.append(None)
+        return rows_per_query
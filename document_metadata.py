@@ -0,0 +1,139 @@
+"""
+Per-document metadata for Manager Wizard document search post-processing.
+
+Everything search_azure_documents derives from a hit's file path, file name
+and community - the SharePoint URL, the community folder, the normalized
+community used by the community post-filter and the reranker, and the date
+parsed from the file name for recency sorting - depends only on the
+document, not on the query. It is computed once per file path with
+precompiled patterns and reused by every later search that returns the same
+file (chunks of one file share it too), so post-processing is a dict lookup
+per hit.
+
+Provides:
+- title_date_score(): YYYYMM parsed from a file name ("DEC 2025 Report.pdf"
+  -> 202512), 0 if none
+- has_date_intent(): whether a query asks for recent/financial documents
+- DocumentMetadataCache(normalize): get(path, title, community_name) ->
+  DocumentMetadata(url, community, community_key, date_score), an LRU keyed
+  by file path; community_key(name) is the memoized normalize function
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, NamedTuple
+from urllib.parse import quote
+
+DEFAULT_CAPACITY = 20000
+
+SHAREPOINT_LIBRARY_URL = "https://psprop.sharepoint.com/sites/AssociationDocs/Association%20Documents/"
+
+# Dates in file names: "DEC 2025 Report.pdf", "12-2022 Bank Statement.pdf", "2024 Budget.pdf"
+MONTH_MAP = {'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+             'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12}
+MONTH_YEAR = re.compile(r'(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\w*\s+(20\d{2})')
+NUMERIC_MONTH_YEAR = re.compile(r'(\d{1,2})[-\s](20\d{2})')
+YEAR = re.compile(r'(20\d{2})')
+QUERY_YEAR = re.compile(r'20[2-3]\d')
+
+# Path format: /drives/b!.../root:/Community/folder/file.pdf
+SHAREPOINT_ROOT = re.compile(r'/root:/(.*)')
+PATH_COMMUNITY = re.compile(r'/([^/]+)/(?:Association Documents|Public|Operations)/')
+
+# Query words that ask for the most recent documents (bank balance, financial, recent, ...)
+DATE_INTENT_KEYWORDS = ('balance', 'bank', 'financial', 'budget', 'statement', 'report', 'recent',
+                        'latest', 'current', 'last month', 'this year', 'monthly', 'invoice',
+                        'expense', 'collection', 'delinquent', 'delinquency', 'revenue')
+
+
+def title_date_score(title: str) -> int:
+    """Sortable date from a file name. Higher = more recent, 0 = no date."""
+    title = (title or '').lower()
+    m = MONTH_YEAR.search(title)
+    if m:
+        return int(m.group(2)) * 100 + MONTH_MAP[m.group(1)[:3]]
+    m = NUMERIC_MONTH_YEAR.search(title)
+    if m and 1 <= int(m.group(1)) <= 12:
+        return int(m.group(2)) * 100 + int(m.group(1))
+    m = YEAR.search(title)
+    if m:
+        return int(m.group(1)) * 100
+    return 0
+
+
+def has_date_intent(query: str) -> bool:
+    """Date/recency intent: financial or recency wording, or a year (2020-2039)."""
+    query_lower = query.lower()
+    return any(kw in query_lower for kw in DATE_INTENT_KEYWORDS) or QUERY_YEAR.search(query) is not None
+
+
+def sharepoint_url(path: str) -> str:
+    """SharePoint URL built from an index file_path (web_url is not populated by the indexer)."""
+    match = SHAREPOINT_ROOT.search(path or '')
+    if not match:
+        return ''
+    # URL-encode path segments but keep slashes
+    return SHAREPOINT_LIBRARY_URL + '/'.join(quote(segment, safe='') for segment in match.group(1).split('/'))
+
+
+class DocumentMetadata(NamedTuple):
+    url: str             # SharePoint URL from the path ('' if none)
+    community: str       # community_name, else the community folder in the path
+    community_key: str   # community normalized for matching
+    date_score: int      # title_date_score() of the file name
+
+
+class DocumentMetadataCache:
+    """Query-independent metadata per file path (LRU); see the module docstring."""
+
+    def __init__(self, normalize: Callable[[str], str], capacity: int = DEFAULT_CAPACITY):
+        self.normalize = normalize
+        self.capacity = capacity
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._community_keys = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def community_key(self, name: str) -> str:
+        """normalize(name), memoized (there are only a few hundred distinct communities)."""
+        key = self._community_keys.get(name)
+        if key is None:
+            if len(self._community_keys) >= self.capacity:
+                self._community_keys.clear()
+            key = self._community_keys[name] = self.normalize(name or '')
+        return key
+
+    def get(self, path: str, title: str, community_name: str = None) -> DocumentMetadata:
+        cache_key = path or title or ''
+        with self._lock:
+            cached = self._entries.get(cache_key)
+            if cached is not None and cached[0] == title and cached[1] == community_name:
+                self._entries.move_to_end(cache_key)
+                self.stats['hits'] += 1
+                return cached[2]
+            self.stats['misses'] += 1
+
+        community = community_name
+        if not community and path:
+            match = PATH_COMMUNITY.search(path)
+            if match:
+                community = match.group(1)
+        metadata = DocumentMetadata(
+            url=sharepoint_url(path),
+            community=community,
+            community_key=self.community_key(community or ''),
+            date_score=title_date_score(title),
+        )
+        with self._lock:
+            self._entries[cache_key] = (title, community_name, metadata)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+        return metadata
+
+    def summary(self) -> dict:
+        return dict(self.stats, entries=len(self), communities=len(self._community_keys))
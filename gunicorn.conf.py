@@ -0,0 +1,31 @@
+"""
+Gunicorn configuration for Manager Wizard.
+
+The search endpoints spend nearly all their time waiting on Dataverse,
+Azure Search, Power BI and Claude. The default gevent worker runs each
+request in a greenlet with cooperative (monkey-patched) sockets, so one
+instance keeps hundreds of backend calls in flight instead of queueing
+behind a fixed thread pool. Set GUNICORN_WORKER_CLASS=gthread to return
+to the previous threaded worker.
+
+A greenlet that computes without doing I/O stalls every other request on
+the worker, so the CPU-heavy jobs (snapshot/index/typeahead builds, large
+JSON documents, PDF thumbnail renders) go through resilience.run_cpu_bound,
+which runs them on gevent's native threadpool.
+"""
+
+import os
+
+bind = f":{os.environ.get('PORT', '8080')}"
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gevent')
+workers = int(os.environ.get('GUNICORN_WORKERS', 1))
+
+# gevent: concurrent requests per worker; gthread: threads per worker
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 500))
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+# Cloud Run enforces the request timeout; don't kill long Claude calls here
+timeout = 0
+graceful_timeout = 30
+keepalive = 5
@@ -0,0 +1,105 @@
+"""
+Health and capacity reporting for Manager Wizard's /api/status.
+
+Provides:
+- ProbeRunner: named backend probes, each re-run at most once per its own
+  TTL in a background thread; readers get the last results immediately, so
+  a frequently polled status endpoint never waits on a backend
+- InflightTracker: in-flight request count, peak, and saturation against
+  the worker's concurrency limit
+- hit_ratio(): hits / (hits + misses) for cache counters
+"""
+
+import time
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def hit_ratio(hits: int, misses: int) -> Optional[float]:
+    """Fraction of lookups served from cache, or None before the first lookup."""
+    total = hits + misses
+    return round(hits / total, 3) if total else None
+
+
+class ProbeRunner:
+    """
+    Background-refreshed backend probes. A probe is a callable returning a
+    dict of extra fields (e.g. {'count': 23752}) or raising on failure; its
+    result is stored with ok, latency_ms, checked_at and error.
+    """
+
+    def __init__(self):
+        self._probes: Dict[str, tuple] = {}  # name -> (fn, ttl)
+        self._results: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def add(self, name: str, fn: Callable[[], Optional[dict]], ttl: float) -> None:
+        self._probes[name] = (fn, ttl)
+
+    def _due(self, now: float) -> list:
+        return [name for name, (_, ttl) in self._probes.items()
+                if now - self._results.get(name, {}).get('checked_at', 0) >= ttl]
+
+    def _run(self, names: list) -> None:
+        try:
+            for name in names:
+                fn, _ = self._probes[name]
+                start = time.monotonic()
+                try:
+                    result = {'ok': True, 'error': None, **(fn() or {})}
+                except Exception as e:
+                    result = {'ok': False, 'error': str(e)[:200]}
+                result['latency_ms'] = round((time.monotonic() - start) * 1000)
+                result['checked_at'] = time.time()
+                with self._lock:
+                    # Keep the last good extras (counts) when a probe fails
+                    previous = self._results.get(name, {})
+                    self._results[name] = {**previous, **result}
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def results(self) -> Dict[str, dict]:
+        """Last probe results; starts a background refresh for probes past their TTL."""
+        now = time.time()
+        with self._lock:
+            due = self._due(now)
+            if due and not self._refreshing:
+                self._refreshing = True
+                threading.Thread(target=self._run, args=(due,), daemon=True).start()
+            return {name: dict(self._results[name]) for name in self._probes if name in self._results}
+
+
+class InflightTracker:
+    """Counts requests currently being served by this worker process."""
+
+    def __init__(self, capacity: int):
+        self.capacity = max(capacity, 1)
+        self.current = 0
+        self.peak = 0
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            self.current += 1
+            self.total += 1
+            self.peak = max(self.peak, self.current)
+
+    def finish(self) -> None:
+        with self._lock:
+            self.current = max(self.current - 1, 0)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'in_flight': self.current,
+                'peak_in_flight': self.peak,
+                'capacity': self.capacity,
+                'saturation': round(self.current / self.capacity, 3),
+                'requests_served': self.total,
+            }
@@ -0,0 +1,183 @@
+"""
+Size-bounded on-disk LRU cache for SharePoint PDFs served by /api/pdf-proxy.
+
+Provides:
+- Entries keyed by SharePoint path and Graph eTag (a changed eTag replaces the file)
+- Write-through streaming: chunks are written to a temp file while they are
+  forwarded to the client, and the file is published only once complete
+- Least-recently-used eviction once the cache exceeds its byte budget
+- Revalidation bookkeeping (when an entry was last confirmed against Graph)
+
+Cached files are served with flask.send_file(conditional=True), which gives
+Range / If-None-Match handling so PDF.js can fetch pages lazily.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PdfDiskCache:
+    """LRU cache of PDF files on local disk, bounded by total bytes."""
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        # Single files above this share of the budget are streamed but not kept
+        self.max_file_bytes = max_bytes // 4
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, dict]' = OrderedDict()  # key -> metadata, LRU order
+        self._total_bytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'evictions': 0}
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_existing()
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return hashlib.sha256(path.encode('utf-8')).hexdigest()
+
+    def _data_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f'{key}.pdf')
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f'{key}.json')
+
+    def _load_existing(self) -> None:
+        """
+        Pick up entries left by a previous process (oldest access first) and
+        delete the partial downloads it was writing when it died.
+        """
+        found = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.part') or name.endswith('.tmp'):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+                continue
+            if not name.endswith('.json'):
+                continue
+            key = name[:-5]
+            try:
+                with open(self._meta_path(key)) as f:
+                    meta = json.load(f)
+                meta['size'] = os.path.getsize(self._data_path(key))
+                found.append((os.path.getatime(self._data_path(key)), key, meta))
+            except (OSError, ValueError):
+                self._remove_files(key)
+        for _, key, meta in sorted(found):
+            self._entries[key] = meta
+            self._total_bytes += meta['size']
+
+    def _remove_files(self, key: str) -> None:
+        for path in (self._data_path(key), self._meta_path(key)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def get(self, path: str) -> Optional[dict]:
+        """
+        Return {'file', 'etag', 'size', 'validated_at', 'path'} for a cached
+        path (marking it most recently used), or None.
+        """
+        key = self._key(path)
+        with self._lock:
+            meta = self._entries.get(key)
+            if meta is None or not os.path.exists(self._data_path(key)):
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return dict(meta, file=self._data_path(key))
+
+    def mark_validated(self, path: str) -> None:
+        """Record that Graph confirmed the cached eTag is still current."""
+        key = self._key(path)
+        with self._lock:
+            meta = self._entries.get(key)
+            if meta is None:
+                return
+            meta['validated_at'] = time.time()
+            self.stats['revalidated'] += 1
+            self._write_meta(key, meta)
+
+    def invalidate(self, path: str) -> None:
+        """Drop a cached path (e.g. its eTag changed)."""
+        key = self._key(path)
+        with self._lock:
+            meta = self._entries.pop(key, None)
+            if meta:
+                self._total_bytes -= meta['size']
+            self._remove_files(key)
+
+    def _write_meta(self, key: str, meta: dict) -> None:
+        tmp = self._meta_path(key) + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._meta_path(key))
+
+    def stream_into_cache(self, path: str, etag: str, chunks: Iterable[bytes],
+                          expected_size: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Yield `chunks` unchanged while writing them to the cache. The entry is
+        published only if the stream completes (and matches expected_size);
+        an aborted download leaves nothing behind.
+        """
+        key = self._key(path)
+        if expected_size and expected_size > self.max_file_bytes:
+            yield from chunks
+            return
+
+        tmp_path = f'{self._data_path(key)}.{threading.get_ident()}.part'
+        written = 0
+        complete = False
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in chunks:
+                    if chunk:
+                        f.write(chunk)
+                        written += len(chunk)
+                    yield chunk
+            complete = expected_size is None or written == expected_size
+        finally:
+            if complete and written <= self.max_file_bytes:
+                self._publish(key, path, etag, tmp_path, written)
+            else:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+    def _publish(self, key: str, path: str, etag: str, tmp_path: str, size: int) -> None:
+        meta = {'path': path, 'etag': etag, 'size': size, 'validated_at': time.time()}
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self._total_bytes -= old['size']
+            os.replace(tmp_path, self._data_path(key))
+            self._write_meta(key, meta)
+            self._entries[key] = meta
+            self._total_bytes += size
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until under budget (lock held)."""
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, meta = self._entries.popitem(last=False)
+            self._total_bytes -= meta['size']
+            self._remove_files(key)
+            self.stats['evictions'] += 1
+
+    def summary(self) -> dict:
+        """Entry count, bytes used and hit/miss counters."""
+        with self._lock:
+            return dict(self.stats, entries=len(self._entries), bytes=self._total_bytes,
+                        max_bytes=self.max_bytes)
@@ -0,0 +1,213 @@
+"""
+Precomputed per-community policy facts for Manager Wizard.
+
+Fence heights, pet limits, pool hours and parking rules change only when a
+governing document is amended, yet every query re-extracted them with
+Claude. scripts/build_policy_facts.py extracts them once per
+community x category and stores structured JSON with source citations and
+the document version; this module serves them.
+
+Provides:
+- FACT_CATEGORIES / FACT_SCHEMAS: the categories and the JSON fields
+  extracted for each (same fields as the live extraction prompts)
+- clean_facts(): drop empty and placeholder values ("X feet", "not
+  specified") so only real facts are stored
+- FactStore: lookup(community, category, query) -> an ai_answer dict when
+  the question asks for a stored field, else None (live extraction handles
+  it). Communities are keyed with the caller's normalize function, so
+  "Avalon" finds facts built for "Avalon HOA".
+
+Store layout (JSON):
+    {"built_at": ..., "communities": {"Avalon HOA": {"fence": {
+        "facts": {...}, "source": ..., "quote": ..., "documents": [...],
+        "document_version": ..., "fingerprint": ..., "extracted_at": ...}}}}
+"""
+
+import re
+import hashlib
+from typing import Callable, Dict, Optional
+
+FACT_CATEGORIES = ('fence', 'pool', 'pet', 'parking')
+
+FACT_SCHEMAS = {
+    'fence': {
+        'max_height_back': 'X feet',
+        'max_height_front': 'X feet',
+        'approved_materials': ['material1', 'material2'],
+        'arc_required': 'true/false',
+        'key_restrictions': ['restriction1', 'restriction2'],
+        'summary': 'One sentence summary',
+    },
+    'pool': {
+        'hours': 'X AM - X PM',
+        'guest_policy': 'description',
+        'key_rules': ['rule1', 'rule2', 'rule3'],
+        'restrictions': ['restriction1', 'restriction2'],
+        'summary': 'One sentence summary',
+    },
+    'pet': {
+        'allowed_pets': ['type1', 'type2'],
+        'max_pets': 'X',
+        'weight_limit': 'X lbs',
+        'leash_required': 'true/false',
+        'key_rules': ['rule1', 'rule2'],
+        'summary': 'One sentence summary',
+    },
+    'parking': {
+        'allowed_vehicles': ['type1', 'type2'],
+        'prohibited_vehicles': ['type1', 'type2'],
+        'guest_parking': 'description',
+        'towing_policy': 'description',
+        'key_rules': ['rule1', 'rule2'],
+        'summary': 'One sentence summary',
+    },
+}
+
+# Question patterns -> the stored fields that answer them (first match wins)
+FACT_QUESTIONS = {
+    'fence': [
+        (r'\b(height|tall|high|feet|ft)\b', ('max_height_back', 'max_height_front')),
+        (r'\b(material|wood|vinyl|iron|metal|chain|masonry)\w*', ('approved_materials',)),
+        (r'\b(arc|approval|approve|permit|permission)\w*', ('arc_required',)),
+        (r'\b(rules?|polic\w+|restrictions?|regulations?|guidelines?)\b', ('summary', 'key_restrictions')),
+    ],
+    'pool': [
+        (r'\b(hours?|open\w*|clos\w*|times?)\b', ('hours',)),
+        (r'\b(guests?|visitors?)\b', ('guest_policy',)),
+        (r'\b(rules?|polic\w+|restrictions?|regulations?)\b', ('summary', 'key_rules')),
+    ],
+    'pet': [
+        (r'\b(weigh\w*|lbs?|pounds?|size|big|large)\b', ('weight_limit',)),
+        (r'\b(how many|number|max\w*|limit)\b', ('max_pets',)),
+        (r'\b(leash\w*)\b', ('leash_required',)),
+        (r'\b(breeds?|types?|kinds?|allowed|permitted)\b', ('allowed_pets',)),
+        (r'\b(rules?|polic\w+|restrictions?|regulations?)\b', ('summary', 'key_rules')),
+    ],
+    'parking': [
+        (r'\b(guests?|visitors?)\b', ('guest_parking',)),
+        (r'\b(tow\w*)\b', ('towing_policy',)),
+        (r'\b(rv|boat|trailer|commercial|truck|motorcycle|prohibited|camper)s?\b', ('prohibited_vehicles',)),
+        (r'\b(rules?|polic\w+|restrictions?|regulations?)\b', ('summary', 'key_rules')),
+    ],
+}
+_FACT_QUESTIONS = {c: [(re.compile(p, re.I), f) for p, f in rules] for c, rules in FACT_QUESTIONS.items()}
+
+FIELD_LABELS = {
+    'max_height_back': 'Rear/side yard fences',
+    'max_height_front': 'Front yard fences',
+    'arc_required': 'ARC approval required',
+    'hours': 'Pool hours',
+    'max_pets': 'Maximum pets',
+}
+
+PLACEHOLDER = re.compile(r'^(x\b|x\s|n/?a$|none$|unknown|not (specified|found|mentioned|stated|available)|'
+                         r'no (information|mention)|description$|type\d|rule\d|material\d|restriction\d)', re.I)
+
+
+def _is_placeholder(value) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return not value.strip() or bool(PLACEHOLDER.match(value.strip()))
+    if isinstance(value, list):
+        return not [v for v in value if not _is_placeholder(v)]
+    return False
+
+
+def clean_facts(category: str, facts: dict) -> dict:
+    """Keep only the schema fields with real values."""
+    cleaned = {}
+    for field in FACT_SCHEMAS.get(category, {}):
+        value = facts.get(field)
+        if isinstance(value, list):
+            value = [v for v in value if not _is_placeholder(v)]
+        if isinstance(value, str) and value.strip().lower() in ('true', 'false'):
+            value = value.strip().lower() == 'true'
+        if not _is_placeholder(value):
+            cleaned[field] = value
+    return cleaned
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1((text or '').encode()).hexdigest()[:16]
+
+
+def document_fingerprint(chunks: list) -> str:
+    """
+    Stable hash of the passages (path + text) the facts were extracted from.
+    The index leaves last_modified empty, so the text is the version: an
+    amended document changes its chunks, and the fingerprint with them.
+    """
+    keys = sorted(f"{c.get('path', '')}|{content_hash(c.get('content'))}" for c in chunks)
+    return hashlib.sha1('\n'.join(keys).encode()).hexdigest()[:16]
+
+
+def _format_value(value) -> str:
+    if isinstance(value, bool):
+        return 'Yes' if value else 'No'
+    if isinstance(value, list):
+        return ', '.join(str(v) for v in value)
+    return str(value)
+
+
+class FactStore:
+    """Read-only view over a built fact file, keyed by normalized community name."""
+
+    def __init__(self, data: Optional[dict] = None, normalize: Callable[[str], str] = str.lower):
+        data = data or {}
+        self.normalize = normalize
+        self.built_at = data.get('built_at')
+        self.communities: Dict[str, dict] = {}
+        for name, categories in (data.get('communities') or {}).items():
+            key = normalize(name)
+            if key:
+                self.communities.setdefault(key, {}).update(categories)
+
+    def __len__(self) -> int:
+        return len(self.communities)
+
+    def get(self, community: str, category: str) -> Optional[dict]:
+        if not community:
+            return None
+        return self.communities.get(self.normalize(community), {}).get(category)
+
+    def lookup(self, community: str, category: str, query: str) -> Optional[dict]:
+        """
+        Stored answer for `query`, or None when the community/category has no
+        facts or the question asks for something not stored.
+        """
+        entry = self.get(community, category)
+        if not entry:
+            return None
+        facts = entry.get('facts') or {}
+        fields = next((f for pattern, f in _FACT_QUESTIONS.get(category, ()) if pattern.search(query)), None)
+        if not fields:
+            return None
+        present = [f for f in fields if f in facts]
+        if not present:
+            return None
+
+        if 'summary' in present:
+            answer = facts['summary']
+        else:
+            answer = '; '.join(f"{FIELD_LABELS.get(f, f.replace('_', ' ').capitalize())}: "
+                               f"{_format_value(facts[f])}" for f in present)
+
+        documents = entry.get('documents') or []
+        return {
+            'extracted': dict(
+                facts,
+                answer=answer,
+                source=entry.get('source') or (documents[0]['title'] if documents else None),
+                quote=entry.get('quote'),
+                summary=facts.get('summary') or answer,
+                documents_found=[d['title'] for d in documents if d.get('title')],
+                category=category,
+                from_archive=False,
+                confidence='high',
+            ),
+            'extraction_type': category,
+            'method': 'facts',
+            'document_version': entry.get('document_version'),
+            'extracted_at': entry.get('extracted_at'),
+        }
@@ -0,0 +1,199 @@
+"""
+Local reranker for Manager Wizard document search.
+
+The Azure semantic ranker quota is exhausted, so search_azure_documents runs
+`queryType: simple` and gets plain lexical scores over the whole index. This
+module rescores the top-N chunks locally with a small linear model over
+features Azure cannot see together:
+
+- bm25: BM25 of the question's terms over the chunk text, with IDF taken
+  from the candidate set
+- title: share of the question's terms found in the file name
+- category: the question's DOCUMENT_PATTERNS categories found in the file
+  name/path
+- doc_type: the index's document_type fits the question (governing
+  documents for rule questions, board financials for financial ones)
+- community: match of the document's community against the requested one
+  (exact 1.0, contained 0.5, contains 0.4)
+- recency: month parsed from the file name ('date_score' from
+  document_metadata.py), decayed from the newest candidate (only weighted
+  for date/financial questions)
+- search: the Azure score, scaled to the best candidate
+
+Provides:
+- LocalReranker(categories, normalize): rerank(query, documents, community,
+  recency) -> documents sorted by local score, with 'reranker_score' set
+- community_match_score(): the 0/40/50/100 community match used by the
+  search post-filter
+
+Term counts use str.count per stem (no tokenizing) and scoring is one
+NumPy matrix-vector product: 50 candidates rerank in about a millisecond.
+scripts/eval_reranker.py measures it against the recorded doc test suites.
+"""
+
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from document_metadata import title_date_score
+
+try:
+    from src.passage_ranker import BM25_B, BM25_K1, query_terms
+except ImportError:
+    from passage_ranker import BM25_B, BM25_K1, query_terms
+
+FEATURES = ('bm25', 'title', 'category', 'doc_type', 'community', 'recency', 'search')
+
+# Fitted on scripts/eval_reranker.py. Azure's own score stays the strongest
+# signal (it already is BM25 over the whole index); the local features mostly
+# reorder near-ties and push other communities' documents down.
+DEFAULT_WEIGHTS = {
+    'bm25': 0.25,
+    'title': 0.25,
+    'category': 0.5,
+    'doc_type': 0.25,
+    'community': 1.5,
+    'recency': 0.0,
+    'search': 2.0,
+}
+RECENCY_WEIGHT = 2.0        # recency weight for date/financial questions
+RECENCY_HALF_LIFE = 6       # months behind the newest candidate for half the recency score
+
+# document_type values that answer each DOCUMENT_PATTERNS category (prefix match)
+CATEGORY_DOC_TYPES = {
+    'ccr': ('governing_ccr',),
+    'bylaws': ('governing_bylaws',),
+    'rules': ('governing_',),
+    'architectural': ('governing_arc_guidelines', 'governing_ccr', 'owner_arc_submission'),
+    'fence': ('governing_',),
+    'pool': ('governing_rules', 'governing_ccr'),
+    'parking': ('governing_',),
+    'pet': ('governing_',),
+    'financial': ('board_financial', 'board_delinquency', 'owner_statement', 'owner_ledger'),
+}
+
+def community_match_score(normalized_query: str, normalized_doc: str) -> int:
+    """How well a document's (normalized) community matches the requested one. Higher = better."""
+    # No community info = no match (prevents empty string matching everything)
+    if not normalized_doc or not normalized_query:
+        return 0
+    if normalized_doc == normalized_query:
+        return 100
+    if normalized_query in normalized_doc:
+        return 50
+    # Doc community contained in the query only counts with a meaningful length
+    if len(normalized_doc) >= 3 and normalized_doc in normalized_query:
+        return 40
+    return 0
+
+
+def _count_word_starts(text: str, term: str) -> int:
+    """Occurrences of words starting with `term` (a stem); str.count keeps this in C."""
+    return text.count(' ' + term) + text.count('\n' + term) + text.startswith(term)
+
+
+def _scale(values: np.ndarray) -> np.ndarray:
+    top = values.max() if len(values) else 0
+    return values / top if top > 0 else values
+
+
+class LocalReranker:
+    """Feature-based rescoring of a search result page; see the module docstring."""
+
+    def __init__(self, categories: Dict[str, dict], normalize: Callable[[str], str] = str.lower,
+                 weights: Optional[Dict[str, float]] = None):
+        self.normalize = normalize
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.category_keywords = {name: [kw.lower() for kw in info['keywords']]
+                                  for name, info in categories.items()}
+
+    def query_categories(self, query: str) -> List[str]:
+        query = query.lower()
+        return [name for name, keywords in self.category_keywords.items()
+                if any(kw in query for kw in keywords)]
+
+    def features(self, query: str, documents: List[dict], community: Optional[str] = None) -> np.ndarray:
+        """(len(documents), len(FEATURES)) matrix of raw feature values."""
+        n = len(documents)
+        matrix = np.zeros((n, len(FEATURES)), dtype=np.float64)
+        if not n:
+            return matrix
+        normalized_query = self.normalize(community) if community else ''
+        # The community's own name is matched by the community feature, not as question terms
+        community_terms = set(query_terms(normalized_query))
+        terms = [t for t in query_terms(query) if t not in community_terms]
+        categories = self.query_categories(query)
+        category_keywords = [kw for name in categories for kw in self.category_keywords[name]]
+        doc_types = tuple(t for name in categories for t in CATEGORY_DOC_TYPES.get(name, ()))
+
+        tf = np.zeros((n, max(len(terms), 1)), dtype=np.float64)
+        lengths = np.zeros(n, dtype=np.float64)
+        title_hits = np.zeros(n, dtype=np.float64)
+        category = np.zeros(n, dtype=np.float64)
+        doc_type = np.zeros(n, dtype=np.float64)
+        community_scores = np.zeros(n, dtype=np.float64)
+        dates = np.zeros(n, dtype=np.int64)
+        search = np.zeros(n, dtype=np.float64)
+        community_cache = {}
+
+        for i, doc in enumerate(documents):
+            title = (doc.get('title') or '').lower()
+            content = (doc.get('content') or '').lower()
+            lengths[i] = len(content) or 1
+            for j, term in enumerate(terms):
+                tf[i, j] = _count_word_starts(content, term)
+                title_hits[i] += term in title
+            if category_keywords:
+                located = title + ' ' + (doc.get('path') or '').lower()
+                category[i] = any(kw in located for kw in category_keywords)
+            if doc_types:
+                doc_type[i] = (doc.get('doc_type') or '').startswith(doc_types)
+            if normalized_query:
+                doc_community = doc.get('community') or ''
+                if doc_community not in community_cache:
+                    community_cache[doc_community] = community_match_score(normalized_query,
+                                                                           self.normalize(doc_community))
+                community_scores[i] = community_cache[doc_community]
+            date_score = doc.get('date_score')
+            dates[i] = title_date_score(title) if date_score is None else date_score
+            search[i] = doc.get('score') or 0
+
+        if terms:
+            df = (tf > 0).sum(axis=0)
+            idf = np.log1p((n - df + 0.5) / (df + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / lengths.mean())
+            matrix[:, 0] = _scale((tf * (BM25_K1 + 1) / (tf + norm[:, None]) * idf).sum(axis=1))
+            matrix[:, 1] = title_hits / len(terms)
+        matrix[:, 2] = category
+        matrix[:, 3] = doc_type
+        matrix[:, 4] = community_scores / 100
+        dated = dates > 0
+        if dated.any():
+            months = (dates // 100) * 12 + dates % 100
+            age = months[dated].max() - months
+            matrix[:, 5] = np.where(dated, 0.5 ** (age / RECENCY_HALF_LIFE), 0)
+        matrix[:, 6] = _scale(search)
+        return matrix
+
+    def score(self, features: np.ndarray, recency: bool = False) -> np.ndarray:
+        weights = np.array([self.weights[f] for f in FEATURES])
+        if recency:
+            weights[FEATURES.index('recency')] = RECENCY_WEIGHT
+        return features @ weights
+
+    def rerank(self, query: str, documents: List[dict], community: Optional[str] = None,
+               recency: bool = False) -> List[dict]:
+        """
+        Documents sorted by local score (stable for ties), each with
+        'reranker_score' set. `recency` marks date/financial questions.
+        """
+        if len(documents) < 2:
+            return list(documents)
+        scores = self.score(self.features(query, documents, community), recency)
+        order = np.argsort(-scores, kind='stable')
+        ranked = []
+        for i in order:
+            doc = documents[i]
+            doc['reranker_score'] = round(float(scores[i]), 4)
+            ranked.append(doc)
+        return ranked
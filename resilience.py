@@ -0,0 +1,322 @@
+"""
+Request deadlines and budget-aware degradation for Manager Wizard.
+
+Provides:
+- A per-request deadline held in a context variable, set once at the route
+  (with_deadline decorator) and read by every backend call
+- backend_timeout(): a backend's normal timeout clipped to the time left
+- has_budget() / mark_degraded(): let a route skip lower-value stages
+  (Claude answer, suggestions) and report what was skipped or cut short
+- submit(): run work on an executor with the caller's deadline attached
+- run_cpu_bound(): run a CPU-heavy call (index builds, large JSON, PDF
+  rendering) on a real OS thread under the gevent worker, so the event loop
+  keeps serving other requests while it runs
+- CircuitBreaker: per-backend rolling error rate / slow-call rate that fails
+  fast while a backend is down, with latency percentiles for hedging
+- hedged_call(): fire a backup idempotent request once the first one has
+  run past the backend's p95 and take whichever finishes first
+
+Code running outside a deadline (background refreshes, prefetches) sees no
+budget limits and keeps each backend's default timeout.
+"""
+
+import time
+import logging
+import threading
+import contextvars
+from collections import deque
+from functools import wraps
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Smallest timeout handed to a backend call, even when the budget is nearly gone
+MIN_BACKEND_TIMEOUT = 1.0
+
+_deadline: contextvars.ContextVar = contextvars.ContextVar('request_deadline', default=None)
+_degraded: contextvars.ContextVar = contextvars.ContextVar('degraded_stages', default=None)
+
+
+def set_deadline(seconds: float):
+    """Start a request budget of `seconds`. Returns a token for reset_deadline()."""
+    return (_deadline.set(time.monotonic() + seconds), _degraded.set([]))
+
+
+def reset_deadline(token) -> None:
+    """Restore the context from before set_deadline()."""
+    deadline_token, degraded_token = token
+    _deadline.reset(deadline_token)
+    _degraded.reset(degraded_token)
+
+
+def with_deadline(seconds: float):
+    """Route decorator: run the view under a request deadline of `seconds`."""
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            token = set_deadline(seconds)
+            try:
+                return f(*args, **kwargs)
+            finally:
+                reset_deadline(token)
+        return wrapper
+    return decorator
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current request budget, or None without a deadline."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(deadline - time.monotonic(), 0.0)
+
+
+def has_budget(seconds: float) -> bool:
+    """True if at least `seconds` remain (always True without a deadline)."""
+    left = remaining()
+    return left is None or left >= seconds
+
+
+def backend_timeout(default: float) -> float:
+    """A backend's usual timeout, clipped to the remaining request budget."""
+    left = remaining()
+    if left is None:
+        return default
+    return max(min(default, left), MIN_BACKEND_TIMEOUT)
+
+
+def mark_degraded(stage: str, status: str = 'skipped', reason: str = 'deadline') -> None:
+    """Record that a stage was skipped, returned pending, or cut short."""
+    stages = _degraded.get()
+    if stages is not None and not any(s['stage'] == stage for s in stages):
+        stages.append({'stage': stage, 'status': status, 'reason': reason})
+
+
+def degraded_stages() -> List[dict]:
+    """Stages degraded so far in this request."""
+    return list(_degraded.get() or [])
+
+
+def submit(executor, fn, *args, **kwargs):
+    """executor.submit() that carries the caller's deadline into the worker."""
+    ctx = contextvars.copy_context()
+    return executor.submit(ctx.run, fn, *args, **kwargs)
+
+
+# =============================================================================
+# CPU-BOUND WORK
+# =============================================================================
+
+def _gevent_threadpool():
+    """The gevent hub's pool of native threads when threading is monkey-patched, else None."""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return None
+    if not monkey.is_module_patched('threading'):
+        return None
+    import gevent
+    return gevent.get_hub().threadpool
+
+
+def run_cpu_bound(fn, *args, **kwargs):
+    """
+    Call fn(*args, **kwargs) and return its result. Under the gevent worker
+    every "thread" is a greenlet, so CPU-bound work would stall the whole
+    event loop until it finished; it runs on the hub's native threadpool
+    instead while the calling greenlet yields. `fn` must not do gevent I/O.
+    Elsewhere (gthread worker, scripts) it runs inline.
+    """
+    pool = _gevent_threadpool()
+    if pool is None:
+        return fn(*args, **kwargs)
+    return pool.apply(fn, args, kwargs)
+
+
+# =============================================================================
+# CIRCUIT BREAKERS
+# =============================================================================
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """A backend call was refused because its breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Rolling-window breaker for one backend. Opens when, over the last
+    `window_seconds`, at least `min_calls` calls were made and the error
+    rate or slow-call rate passes its threshold. After `open_seconds` one
+    trial call is let through (half-open); its outcome closes or re-opens it.
+    """
+
+    def __init__(self, name: str, window_seconds: float = 60, min_calls: int = 10,
+                 error_threshold: float = 0.5, slow_call_seconds: float = 8.0,
+                 slow_threshold: float = 0.8, open_seconds: float = 30, max_samples: int = 500,
+                 max_hedge_ratio: float = 0.1):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_threshold = error_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_threshold = slow_threshold
+        self.open_seconds = open_seconds
+        self._calls = deque(maxlen=max_samples)  # (timestamp, ok, latency)
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.max_hedge_ratio = max_hedge_ratio
+        self.rejected = 0
+        self.times_opened = 0
+        self.total_calls = 0
+        self.hedges = 0
+
+    def _prune(self, now: float) -> None:
+        while self._calls and now - self._calls[0][0] > self.window_seconds:
+            self._calls.popleft()
+
+    def allow(self) -> bool:
+        """True if a call may proceed now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                self.state = HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record(self, ok: bool, latency: float) -> None:
+        """Record a finished call (ok=False for errors and timeouts)."""
+        now = time.monotonic()
+        with self._lock:
+            self._calls.append((now, ok, latency))
+            self.total_calls += 1
+            self._prune(now)
+            if self.state == HALF_OPEN:
+                if ok and latency < self.slow_call_seconds:
+                    self.state = CLOSED
+                    logger.info(f"Circuit breaker '{self.name}' closed")
+                else:
+                    self._open(now)
+                return
+            if self.state == CLOSED and len(self._calls) >= self.min_calls:
+                errors = sum(1 for _, c_ok, _ in self._calls if not c_ok)
+                slow = sum(1 for _, _, c_lat in self._calls if c_lat >= self.slow_call_seconds)
+                if errors / len(self._calls) >= self.error_threshold or \
+                        slow / len(self._calls) >= self.slow_threshold:
+                    self._open(now)
+
+    def _open(self, now: float) -> None:
+        self.state = OPEN
+        self._opened_at = now
+        self._trial_in_flight = False
+        self.times_opened += 1
+        logger.warning(f"Circuit breaker '{self.name}' opened")
+
+    def latency_percentile(self, pct: float) -> Optional[float]:
+        """Latency percentile (seconds) of successful calls in the window, or None if too few."""
+        with self._lock:
+            latencies = sorted(lat for _, ok, lat in self._calls if ok)
+        if len(latencies) < self.min_calls:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * pct))]
+
+    def hedge_delay(self) -> Optional[float]:
+        """
+        Seconds to wait before hedging the next call: the p95 of recent
+        successes, or None when there is no baseline yet, the breaker is not
+        closed, or hedges already make up max_hedge_ratio of calls.
+        """
+        if self.state != CLOSED or self.hedges >= self.max_hedge_ratio * max(self.total_calls, 1):
+            return None
+        return self.latency_percentile(0.95)
+
+    def record_hedge(self) -> None:
+        with self._lock:
+            self.hedges += 1
+
+    def snapshot(self) -> dict:
+        """State and rolling stats for /api/status."""
+        with self._lock:
+            self._prune(time.monotonic())
+            calls = list(self._calls)
+            state = self.state
+        errors = sum(1 for _, ok, _ in calls if not ok)
+        p95 = self.latency_percentile(0.95)
+        return {
+            'state': state,
+            'calls_in_window': len(calls),
+            'error_rate': round(errors / len(calls), 3) if calls else 0.0,
+            'p95_ms': round(p95 * 1000) if p95 is not None else None,
+            'rejected': self.rejected,
+            'times_opened': self.times_opened,
+            'hedged': self.hedges,
+        }
+
+
+def _close_result(future) -> None:
+    """Done-callback for a hedge loser: close its response so the pooled connection is released."""
+    if future.cancelled() or future.exception() is not None:
+        return
+    close = getattr(future.result(), 'close', None)
+    if close is not None:
+        try:
+            close()
+        except Exception:
+            pass
+
+
+def hedged_call(executor, fn: Callable, breaker: CircuitBreaker, timeout: Optional[float] = None):
+    """
+    Run fn() (an idempotent request) and, if it has not finished within the
+    breaker's hedge_delay(), start a second copy; return the first result
+    that arrives. Exceptions propagate only if every attempt fails. The
+    losing attempt's response is closed once it completes.
+    Without a hedge delay fn() simply runs in the calling thread.
+
+    When hedging, both attempts run on `executor`, so it must have room for
+    one primary plus one backup per concurrent caller; a smaller pool makes
+    the backup queue behind the primaries it is meant to back up.
+    """
+    hedge_after = breaker.hedge_delay()
+    if hedge_after is None:
+        return fn()
+    first = submit(executor, fn)
+    done, _ = wait([first], timeout=hedge_after)
+    if done:
+        return first.result()
+
+    breaker.record_hedge()
+    attempts = [first, submit(executor, fn)]
+    pending = set(attempts)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    error = None
+    winner = None
+    while pending and winner is None:
+        left = None if deadline is None else max(deadline - time.monotonic(), 0)
+        done, pending = wait(pending, timeout=left, return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            if future.exception() is None:
+                winner = future
+                break
+            error = future.exception()
+    for future in attempts:
+        if future is not winner:
+            future.add_done_callback(_close_result)
+    if winner is not None:
+        return winner.result()
+    if error is not None:
+        raise error
+    raise TimeoutError('hedged call timed out')
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Per-request session overhead benchmark.
+
+Builds a minimal Flask app per session backend (configured exactly as
+app.py does via session_backend.configure_session), logs a user in, then
+times authenticated requests that read the identity claims. An empty app
+with no session access gives the baseline, so the reported overhead is
+what the session layer adds to each request.
+
+Run:
+    python scripts/bench_session_overhead.py
+    python scripts/bench_session_overhead.py --requests 5000 --backends filesystem cookie
+"""
+
+import os
+import sys
+import time
+import uuid
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, session, jsonify  # noqa: E402
+from session_backend import configure_session  # noqa: E402
+
+# Same shape as the claims stored at login in app.py auth_callback()
+USER_CLAIMS = {
+    'name': 'Pat Example',
+    'email': 'pat.example@psprop.net',
+    'first_name': 'Pat',
+    'last_name': 'Example',
+    'job_title': 'Community Manager',
+    'id': str(uuid.uuid4()),
+}
+
+
+def build_app(backend, session_dir):
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'bench-secret'
+    app.config['SESSION_PERMANENT'] = False
+    app.config['SESSION_FILE_DIR'] = session_dir
+    if backend != 'none':
+        configure_session(app, backend)
+
+    @app.route('/login')
+    def login():
+        session['session_id'] = str(uuid.uuid4())
+        session['user'] = USER_CLAIMS
+        return 'ok'
+
+    @app.route('/api/whoami')
+    def whoami():
+        if backend == 'none':
+            return jsonify({'email': USER_CLAIMS['email']})
+        user = session.get('user') or {}
+        return jsonify({'email': user.get('email')})
+
+    return app
+
+
+def measure(backend, n_requests):
+    """Return (mean microseconds per request, cookie bytes sent)."""
+    session_dir = tempfile.mkdtemp(prefix='bench_session_')
+    try:
+        app = build_app(backend, session_dir)
+        client = app.test_client()
+        client.get('/login')
+        cookie = client.get_cookie('session')
+        cookie_bytes = len(cookie.value) if cookie else 0
+
+        for _ in range(50):  # warm up
+            client.get('/api/whoami')
+        start = time.perf_counter()
+        for _ in range(n_requests):
+            resp = client.get('/api/whoami')
+            assert resp.status_code == 200 and resp.json['email'] == USER_CLAIMS['email']
+        elapsed = time.perf_counter() - start
+        return elapsed / n_requests * 1e6, cookie_bytes
+    finally:
+        shutil.rmtree(session_dir, ignore_errors=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--requests', type=int, default=2000, help='Requests per backend')
+    ap.add_argument('--backends', nargs='+', default=['filesystem', 'cookie'],
+                    help='Backends to compare (filesystem, cookie, redis)')
+    args = ap.parse_args()
+
+    baseline_us, _ = measure('none', args.requests)
+
+    print("=" * 70)
+    print("SESSION OVERHEAD BENCHMARK")
+    print("=" * 70)
+    print(f"  Requests:        {args.requests} per backend")
+    print(f"  No session:      {baseline_us:8.1f} us/request (baseline)")
+    for backend in args.backends:
+        us, cookie_bytes = measure(backend, args.requests)
+        print(f"  {backend:<15}  {us:8.1f} us/request   overhead {us - baseline_us:7.1f} us   "
+              f"cookie {cookie_bytes} bytes")
+    print("=" * 70)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
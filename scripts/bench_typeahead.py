@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Typeahead index latency benchmark.
+
+Builds a TypeaheadIndex over a synthetic homeowner table (or a saved
+homeowner snapshot JSON) and times /api/suggest-style lookups for every
+prefix of a set of queries, as a user would type them.
+
+Run:
+    python scripts/bench_typeahead.py
+    python scripts/bench_typeahead.py --records 60000
+    python scripts/bench_typeahead.py --snapshot homeowner-snapshot.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typeahead import TypeaheadIndex  # noqa: E402
+
+TARGET_P99_MS = 10.0
+
+FIRST_NAMES = ['John', 'Mary', 'Robert', 'Linda', 'Michael', 'Patricia', 'David', 'Jennifer',
+               'James', 'Maria', 'William', 'Susan', 'Richard', 'Karen', 'Jose', 'Nancy']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis',
+              'Rodriguez', 'Martinez', 'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson']
+STREETS = ['Falcon Pointe', 'Old Settlers', 'Cisco Valley', 'Monarch Oaks', 'Tiburon', 'Glenway',
+           'American', 'Mohican', 'Autumn Oaks', 'Cottondale', 'Ranchers Club', 'Westerly']
+STREET_TYPES = ['Dr', 'Blvd', 'Ln', 'Way', 'Trl', 'Cv', 'St', 'Ct']
+COMMUNITIES = ['Falcon Pointe HOA', 'Avalon POA', 'Heritage Oaks', 'Vista Vera', 'Chandler Creek',
+               'Lakeway Hills', 'Travisso', 'Santa Rita Ranch', 'Sun City', 'Teravista']
+
+QUERIES = ['john smith', 'garcia', 'falcon pointe', '1481 old settlers', 'avalon', 'sun city',
+           'martinez maria', '207 tiburon', 'heritage oaks', 'zzz no match']
+
+
+def synthetic_records(count, seed=7):
+    """Random homeowner rows with realistic name/address/community shapes."""
+    rng = random.Random(seed)
+    return [{
+        'cr258_owner_name': f"{rng.choice(LAST_NAMES)}, {rng.choice(FIRST_NAMES)}",
+        'cr258_property_address': f"{rng.randint(100, 19999)} {rng.choice(STREETS)} {rng.choice(STREET_TYPES)}",
+        'cr258_assoc_name': rng.choice(COMMUNITIES),
+    } for _ in range(count)]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--records', type=int, default=40000, help='Synthetic homeowner rows')
+    ap.add_argument('--snapshot', help='Homeowner snapshot JSON (as saved to GCS) instead of synthetic rows')
+    args = ap.parse_args()
+
+    if args.snapshot:
+        with open(args.snapshot) as f:
+            records = json.load(f).get('records', [])
+    else:
+        records = synthetic_records(args.records)
+
+    started = time.perf_counter()
+    index = TypeaheadIndex.build(records, {'falcon pointe hoa': 40, 'garcia, maria': 12})
+    build_s = time.perf_counter() - started
+
+    timings = []
+    for query in QUERIES:
+        for end in range(2, len(query) + 1):
+            prefix = query[:end]
+            t0 = time.perf_counter()
+            index.suggest(prefix, include_addresses=any(c.isdigit() for c in prefix))
+            timings.append((time.perf_counter() - t0) * 1000)
+
+    timings.sort()
+    p50 = timings[len(timings) // 2]
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+
+    print("=" * 70)
+    print("TYPEAHEAD BENCHMARK")
+    print("=" * 70)
+    print(f"  Records:         {len(records):,} ({index.size():,} distinct values)")
+    print(f"  Build time:      {build_s:.2f}s")
+    print(f"  Lookups:         {len(timings)} keystrokes")
+    print(f"  Latency p50:     {p50:.3f} ms")
+    print(f"  Latency p99:     {p99:.3f} ms (target < {TARGET_P99_MS:.0f} ms)")
+    print(f"  Latency max:     {timings[-1]:.3f} ms")
+    print("=" * 70)
+    print(f"  Sample 'fal':    {[e['text'] for _, e in index.suggest('fal')]}")
+    print("=" * 70)
+
+    return 0 if p99 < TARGET_P99_MS else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
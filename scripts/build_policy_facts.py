@@ -0,0 +1,323 @@
+"""
+Policy Fact Builder for Manager Wizard
+Extracts fence, pool, pet and parking facts once per community from the
+governing documents in Azure AI Search, so unified search can answer them
+without a live Claude call.
+
+For each community x category:
+- Search the community's governing documents (CC&Rs, bylaws, rules, ARC
+  guidelines; archive folders excluded) for the category's keywords
+- Send the most relevant passages to Claude with the category's JSON schema
+- Store the cleaned facts with the source document, quote, the documents
+  used (with a hash of each one's passages) and their version: the newest
+  last_modified when the index has one, else the fingerprint of the
+  passage text
+
+Runs are incremental: a community x category whose passages are unchanged
+(same fingerprint) is skipped unless --force is given.
+
+Usage:
+    python build_policy_facts.py                       # Build/refresh all communities
+    python build_policy_facts.py --community "Avalon"  # One community
+    python build_policy_facts.py --category fence      # One category
+    python build_policy_facts.py --force               # Re-extract even if unchanged
+    python build_policy_facts.py --dry-run             # Extract and print, don't save
+    python build_policy_facts.py --output facts.json   # Write a local file instead of GCS
+    python build_policy_facts.py --stats               # Show coverage of the stored facts
+"""
+
+import os
+import sys
+import json
+import argparse
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from policy_facts import FACT_CATEGORIES, FACT_SCHEMAS, clean_facts, content_hash, document_fingerprint  # noqa: E402
+from src.claude_stream import stream_claude_json  # noqa: E402
+from src.context_builder import build_compact_context  # noqa: E402
+
+# Azure AI Search configuration
+SEARCH_ENDPOINT = os.getenv('AZURE_SEARCH_ENDPOINT', 'https://psmai.search.windows.net')
+SEARCH_API_KEY = os.getenv('AZURE_SEARCH_API_KEY')  # Required - set in environment
+INDEX_NAME = os.getenv('AZURE_SEARCH_INDEX', 'sharepoint-docs-v2')
+API_VERSION = '2024-05-01-preview'
+
+ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY')  # Required - set in environment
+MODEL = 'claude-3-5-haiku-20241022'
+
+# Where app.py loads the facts from
+GCS_BUCKET = 'pspm-community-images'
+GCS_FACTS_FILE = 'wizard/policy-facts.json'
+
+GOVERNING_TYPES = ('governing_ccr', 'governing_bylaws', 'governing_rules', 'governing_arc_guidelines')
+
+# Search text per category (what the live query expansion would send)
+CATEGORY_QUERIES = {
+    'fence': 'fence fences fencing height wall materials',
+    'pool': 'pool swimming hours guests amenity',
+    'pet': 'pet pets dog dogs cat animal animals leash',
+    'parking': 'parking vehicle vehicles tow towing guest RV boat trailer',
+}
+
+CHUNKS_PER_CATEGORY = 8
+CONTEXT_TOKENS = 2000
+
+EXTRACTION_SYSTEM = """You are extracting HOA policy facts from governing documents (CC&Rs, bylaws, rules, architectural guidelines).
+Use ONLY the document excerpts given. If a field is not stated in the excerpts, use null - never guess.
+When excerpts conflict, prefer the most recent amendment or rules document over the original declaration.
+Return ONLY valid JSON, no other text."""
+
+
+# =============================================================================
+# AZURE SEARCH
+# =============================================================================
+
+def _search(body: Dict) -> Dict:
+    url = f"{SEARCH_ENDPOINT}/indexes/{INDEX_NAME}/docs/search?api-version={API_VERSION}"
+    response = requests.post(url, json=body, headers={
+        "Content-Type": "application/json",
+        "api-key": SEARCH_API_KEY
+    }, timeout=30)
+    if response.status_code != 200:
+        print(f"Error searching: {response.status_code} - {response.text[:200]}")
+        return {}
+    return response.json()
+
+
+def _governing_filter(community: Optional[str] = None) -> str:
+    filters = ['(' + ' or '.join(f"document_type eq '{t}'" for t in GOVERNING_TYPES) + ')',
+               "not search.ismatch('Archive', 'file_path')"]
+    if community:
+        filters.append(f"community_name eq '{community.replace(chr(39), chr(39) * 2)}'")
+    return ' and '.join(filters)
+
+
+def list_communities() -> List[str]:
+    """Communities that have governing documents in the index."""
+    data = _search({
+        "search": "*",
+        "top": 0,
+        "filter": _governing_filter(),
+        "facets": ["community_name,count:2000"]
+    })
+    facets = data.get('@search.facets', {}).get('community_name', [])
+    return sorted(f['value'] for f in facets if f.get('value') and not f['value'].startswith('_'))
+
+
+def fetch_chunks(community: str, category: str) -> List[Dict]:
+    """Top governing-document chunks of a community for a category."""
+    data = _search({
+        "search": CATEGORY_QUERIES[category],
+        "queryType": "simple",
+        "searchMode": "any",
+        "top": CHUNKS_PER_CATEGORY,
+        "filter": _governing_filter(community),
+        "select": "file_name,file_path,web_url,chunk_text,community_name,document_type,last_modified"
+    })
+    return [{
+        'title': doc.get('file_name') or (doc.get('file_path') or '').split('/')[-1] or 'Unknown',
+        'path': doc.get('file_path'),
+        'url': doc.get('web_url'),
+        'community': doc.get('community_name'),
+        'last_modified': doc.get('last_modified'),
+        'content': doc.get('chunk_text') or '',
+    } for doc in data.get('value', [])]
+
+
+# =============================================================================
+# EXTRACTION
+# =============================================================================
+
+def extract_facts(community: str, category: str, chunks: List[Dict]) -> Optional[Dict]:
+    """Run one Claude extraction; returns the raw JSON dict or None."""
+    context, _ = build_compact_context(CATEGORY_QUERIES[category], chunks, token_budget=CONTEXT_TOKENS,
+                                       max_documents=CHUNKS_PER_CATEGORY)
+    schema = dict(FACT_SCHEMAS[category], source='Name of the document the facts come from',
+                  quote='The exact sentence stating the main rule')
+    prompt = (
+        f"Community: {community}\n"
+        f"Category: {category}\n\n"
+        f"Extract the {category} policy into this JSON format:\n{json.dumps(schema, indent=2)}\n\n"
+        f"Document excerpts:\n\n{context}"
+    )
+    payload = {
+        "model": MODEL,
+        "max_tokens": 800,
+        "system": [{"type": "text", "text": EXTRACTION_SYSTEM, "cache_control": {"type": "ephemeral"}}],
+        "messages": [{"role": "user", "content": prompt}]
+    }
+    result = None
+    for kind, _, value in stream_claude_json(payload, ANTHROPIC_API_KEY, timeout=300, priority='batch'):
+        if kind == 'done':
+            result = value
+    return result if isinstance(result, dict) else None
+
+
+def build_entry(community: str, category: str, previous: Optional[Dict], force: bool) -> Optional[Dict]:
+    """
+    New store entry for one community x category, the previous entry if its
+    documents are unchanged, or None when nothing was found.
+    """
+    chunks = fetch_chunks(community, category)
+    if not chunks:
+        return None
+    documents = []
+    for chunk in chunks:
+        if not any(d['path'] == chunk['path'] for d in documents):
+            documents.append({k: chunk[k] for k in ('title', 'path', 'url', 'last_modified')})
+    for doc in documents:
+        doc['content_hash'] = content_hash('\n'.join(c['content'] for c in chunks if c['path'] == doc['path']))
+    fingerprint = document_fingerprint(chunks)
+    if previous and previous.get('fingerprint') == fingerprint and not force:
+        return previous
+
+    raw = extract_facts(community, category, chunks)
+    if not raw:
+        return None
+    facts = clean_facts(category, raw)
+    if not facts:
+        return None
+
+    versions = [d['last_modified'] for d in documents if d.get('last_modified')]
+    return {
+        'facts': facts,
+        'source': raw.get('source'),
+        'quote': raw.get('quote'),
+        'documents': documents,
+        'document_version': max(versions) if versions else fingerprint,
+        'fingerprint': fingerprint,
+        'extracted_at': datetime.utcnow().isoformat() + 'Z',
+    }
+
+
+# =============================================================================
+# STORAGE
+# =============================================================================
+
+def load_store(output: Optional[str]) -> Dict:
+    """Existing fact store (local file or GCS), or an empty one."""
+    try:
+        if output:
+            if os.path.exists(output):
+                with open(output) as f:
+                    return json.load(f)
+        else:
+            from google.cloud import storage as gcs_storage
+            blob = gcs_storage.Client().bucket(GCS_BUCKET).blob(GCS_FACTS_FILE)
+            if blob.exists():
+                return json.loads(blob.download_as_text())
+    except Exception as e:
+        print(f"Could not load existing facts ({e}) - starting fresh")
+    return {'communities': {}}
+
+
+def save_store(store: Dict, output: Optional[str]) -> None:
+    text = json.dumps(store, indent=2, sort_keys=True)
+    if output:
+        with open(output, 'w') as f:
+            f.write(text)
+        print(f"Saved {output}")
+    else:
+        from google.cloud import storage as gcs_storage
+        blob = gcs_storage.Client().bucket(GCS_BUCKET).blob(GCS_FACTS_FILE)
+        blob.upload_from_string(text, content_type='application/json')
+        print(f"Saved gs://{GCS_BUCKET}/{GCS_FACTS_FILE}")
+
+
+def run_build(communities: List[str], categories: List[str], force: bool = False, dry_run: bool = False,
+              output: Optional[str] = None, workers: int = 4):
+    """Build facts for every community x category and save the store."""
+    print("=" * 60)
+    print("Policy Fact Build")
+    print("=" * 60)
+    print(f"Mode: {'DRY RUN' if dry_run else 'LIVE UPDATE'}")
+    print(f"Communities: {len(communities)}  Categories: {', '.join(categories)}")
+    print()
+
+    store = load_store(output)
+    existing = store.setdefault('communities', {})
+    stats = {'extracted': 0, 'unchanged': 0, 'not_found': 0, 'failed': 0}
+
+    def work(pair):
+        community, category = pair
+        previous = existing.get(community, {}).get(category)
+        try:
+            return community, category, previous, build_entry(community, category, previous, force)
+        except Exception as e:
+            print(f"  [error] {community} / {category}: {e}")
+            return community, category, previous, e
+
+    pairs = [(c, cat) for c in communities for cat in categories]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for i, (community, category, previous, entry) in enumerate(pool.map(work, pairs), 1):
+            if isinstance(entry, Exception):
+                stats['failed'] += 1
+                continue
+            if entry is None:
+                stats['not_found'] += 1
+            elif entry is previous:
+                stats['unchanged'] += 1
+            else:
+                stats['extracted'] += 1
+                existing.setdefault(community, {})[category] = entry
+                if stats['extracted'] <= 10 or dry_run:
+                    print(f"  [{category}] {community}: {json.dumps(entry['facts'])[:100]}")
+            if i % 50 == 0:
+                print(f"  Progress: {i}/{len(pairs)} ({100 * i // len(pairs)}%)")
+
+    store['built_at'] = datetime.utcnow().isoformat() + 'Z'
+
+    print()
+    print("=" * 60)
+    print("Build Results")
+    print("=" * 60)
+    for key, count in stats.items():
+        print(f"  {key}: {count}")
+    if not dry_run and stats['extracted']:
+        save_store(store, output)
+
+
+def show_stats(output: Optional[str]):
+    """Show coverage of the stored facts."""
+    store = load_store(output)
+    communities = store.get('communities', {})
+    print("=" * 60)
+    print("Policy Fact Coverage")
+    print("=" * 60)
+    print(f"Built at: {store.get('built_at') or '(never)'}")
+    print(f"Communities with facts: {len(communities)}")
+    for category in FACT_CATEGORIES:
+        covered = sum(1 for c in communities.values() if category in c)
+        print(f"  {category}: {covered}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute per-community policy facts")
+    parser.add_argument("--community", help="Only this community (index community_name)")
+    parser.add_argument("--category", choices=FACT_CATEGORIES, help="Only this category")
+    parser.add_argument("--force", action="store_true", help="Re-extract even if source documents are unchanged")
+    parser.add_argument("--dry-run", action="store_true", help="Extract and print without saving")
+    parser.add_argument("--output", help="Local JSON file instead of GCS")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent extractions")
+    parser.add_argument("--stats", action="store_true", help="Show coverage of the stored facts")
+
+    args = parser.parse_args()
+
+    if args.stats:
+        show_stats(args.output)
+    else:
+        if not SEARCH_API_KEY or not ANTHROPIC_API_KEY:
+            sys.exit("AZURE_SEARCH_API_KEY and ANTHROPIC_API_KEY must be set")
+        run_build(
+            communities=[args.community] if args.community else list_communities(),
+            categories=[args.category] if args.category else list(FACT_CATEGORIES),
+            force=args.force,
+            dry_run=args.dry_run,
+            output=args.output,
+            workers=args.workers
+        )
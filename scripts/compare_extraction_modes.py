@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Single-prompt vs map-reduce answer extraction, side by side.
+
+Sends each question to /api/documents/search twice, once with
+?extraction=single and once with ?extraction=map_reduce, and prints both
+answers with their latency, token usage and (for map-reduce) the map/reduce
+split and any conflicts found between documents. Questions answered from
+the fact store or the rule extractors never reach Claude; they are reported
+as such and left out of the latency comparison.
+
+Run against a local or deployed instance:
+    EXTRACTION_MAP_WORKERS=5 gunicorn --config gunicorn.conf.py app:app
+    python scripts/compare_extraction_modes.py --base-url http://localhost:8080 --cookie "session=..."
+    python scripts/compare_extraction_modes.py --queries "Avalon pet policy" "Falcon Pointe pool rules"
+"""
+
+import sys
+import time
+import argparse
+import statistics
+
+import requests
+
+MODES = ('single', 'map_reduce')
+
+QUERIES = [
+    'Falcon Pointe pool rules',
+    'Avalon pet policy',
+    'Chandler Creek parking rules',
+    'Highpointe architectural guidelines',
+    'Vista Vera trash can rules',
+    'Brushy Creek rental restrictions',
+    'Heritage Park assessment due date',
+    'Avalon bank balance',
+]
+
+
+def run_query(session, base_url, query, mode, timeout):
+    """One extraction. Returns (seconds, ai_answer or None, error or None)."""
+    start = time.perf_counter()
+    try:
+        resp = session.get(f"{base_url}/api/documents/search",
+                           params={'q': query, 'extract': 'true', 'extraction': mode}, timeout=timeout)
+        elapsed = time.perf_counter() - start
+        if resp.status_code != 200:
+            return elapsed, None, f"HTTP {resp.status_code}"
+        return elapsed, resp.json().get('ai_answer'), None
+    except requests.RequestException as e:
+        return time.perf_counter() - start, None, str(e)
+
+
+def describe(ai_answer):
+    if not ai_answer:
+        return '(no answer)'
+    extracted = ai_answer.get('extracted') or {}
+    text = (extracted.get('answer') or '').replace('\n', ' ')
+    return text[:90] + ('...' if len(text) > 90 else '')
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--base-url', default='http://localhost:8080')
+    ap.add_argument('--cookie', default='', help='Session cookie, e.g. "session=abc" (routes need login)')
+    ap.add_argument('--queries', nargs='+', default=QUERIES)
+    ap.add_argument('--timeout', type=float, default=60.0, help='Per-request timeout (seconds)')
+    args = ap.parse_args()
+
+    session = requests.Session()
+    if '=' in args.cookie:
+        name, value = args.cookie.split('=', 1)
+        session.cookies.set(name.strip(), value.strip())
+    base_url = args.base_url.rstrip('/')
+
+    latencies = {mode: [] for mode in MODES}
+    tokens = {mode: [] for mode in MODES}
+    conflicts = 0
+
+    print("=" * 78)
+    print("EXTRACTION MODES: single prompt vs map-reduce")
+    print("=" * 78)
+    for query in args.queries:
+        print(f"\n{query}")
+        for mode in MODES:
+            elapsed, ai_answer, error = run_query(session, base_url, query, mode, args.timeout)
+            if error:
+                print(f"  {mode:<11} ERROR {error}")
+                continue
+            method = (ai_answer or {}).get('method') or (ai_answer or {}).get('mode') or '-'
+            usage = (ai_answer or {}).get('usage') or {}
+            line = f"  {mode:<11} {elapsed * 1000:6.0f}ms  [{method}]  {describe(ai_answer)}"
+            if method in MODES:
+                latencies[mode].append(elapsed)
+                tokens[mode].append(usage.get('input_tokens', 0) + usage.get('output_tokens', 0))
+            timings = (ai_answer or {}).get('timings')
+            if timings:
+                line += f"\n{'':14}map {timings['map_ms']}ms + reduce {timings['reduce_ms']}ms, " \
+                        f"{timings.get('answering', 0)}/{timings.get('documents', 0)} documents answered"
+            extracted = (ai_answer or {}).get('extracted') or {}
+            if extracted.get('conflicts_found'):
+                conflicts += 1
+                line += f"\n{'':14}CONFLICT: {extracted.get('conflict_note')}"
+            print(line)
+
+    print("\n" + "-" * 78)
+    for mode in MODES:
+        if latencies[mode]:
+            print(f"  {mode:<11} n={len(latencies[mode])}  median {statistics.median(latencies[mode]) * 1000:.0f}ms  "
+                  f"max {max(latencies[mode]) * 1000:.0f}ms  mean tokens {statistics.mean(tokens[mode]):.0f}")
+        else:
+            print(f"  {mode:<11} no Claude extractions")
+    print(f"  Conflicts flagged by map-reduce: {conflicts}")
+    print("=" * 78)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Passage selection evaluation: first-N-characters truncation vs BM25 ranking.
+
+For each case (question, retrieved chunks, a phrase the answer must come
+from) both context builders are run and compared on:
+- answer coverage: does the context still contain the answer phrase?
+- context size (characters / estimated input tokens sent to Claude)
+- build time
+
+The built-in cases mirror real failure modes: balances deep in a monthly
+report, the rule buried after a long preamble, the same boilerplate repeated
+across chunks. Pass --cases with a JSON list of {query, documents, answer}
+(documents as returned by search_azure_documents) to evaluate real chunks.
+
+Run:
+    python scripts/eval_passage_selection.py
+    python scripts/eval_passage_selection.py --cases saved_cases.json --budget 1500
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.context_builder import build_compact_context, estimate_tokens  # noqa: E402
+
+PREAMBLE = ("This Declaration is made by the Declarant for the purpose of establishing a general plan for the "
+            "improvement and development of the Property. The Declarant desires to provide for the preservation "
+            "of values and amenities in the community and for the maintenance of common areas. ") * 6
+BOILERPLATE = ("The Association may adopt rules from time to time. Any capitalized term not defined herein shall "
+               "have the meaning given in the Declaration. ") * 8
+
+BUILTIN_CASES = [
+    {
+        'query': 'What is the fence height limit at Falcon Pointe?',
+        'answer': 'six (6) feet',
+        'documents': [
+            {'title': 'Falcon Pointe CC&Rs.pdf', 'community': 'Falcon Pointe',
+             'content': PREAMBLE + BOILERPLATE + "Section 7.3 Fences. No fence or wall shall exceed six (6) feet "
+                        "in height measured from natural grade. Front yard fences are prohibited."},
+            {'title': 'Falcon Pointe Rules.pdf', 'content': BOILERPLATE + "Trash cans must be stored out of view."},
+        ],
+    },
+    {
+        'query': 'What was the operating account bank balance in November?',
+        'answer': '$184,220.17',
+        'documents': [
+            {'title': 'Avalon Monthly Community Report NOV 2025.pdf', 'community': 'Avalon',
+             'content': "Manager's Summary. " + PREAMBLE + "Violations Report. 14 violations were issued. " * 20
+                        + "Bank Reconciliation. Operating account ending balance as of November 30, 2025: "
+                        "$184,220.17. Reserve account ending balance: $402,118.90."},
+            {'title': 'Avalon Monthly Community Report OCT 2025.pdf', 'community': 'Avalon',
+             'content': "Manager's Summary. " + PREAMBLE + "Collections. 12 accounts are delinquent. " * 20},
+        ],
+    },
+    {
+        'query': 'pool hours',
+        'answer': '8:00 a.m. to 10:00 p.m.',
+        'documents': [
+            {'title': 'Amenity Rules.pdf', 'content': BOILERPLATE + PREAMBLE + "Pool. The pool is open daily from "
+                                                      "8:00 a.m. to 10:00 p.m. Children under 14 must be accompanied."},
+            {'title': 'Amenity Rules (copy).pdf', 'content': BOILERPLATE + PREAMBLE},
+        ],
+    },
+    {
+        'query': 'How many pets are allowed per household?',
+        'answer': 'two (2) household pets',
+        'documents': [
+            {'title': 'Heritage Oaks Rules.pdf',
+             'content': PREAMBLE + "Animals. No more than two (2) household pets may be kept on any Lot. "
+                                   "Dogs must be leashed in common areas."},
+        ],
+    },
+]
+
+
+def truncation_context(query, documents, extraction_type='general'):
+    """The previous builder: each chunk's first 2000 characters (4000 for financial)."""
+    max_chars = 4000 if extraction_type == 'financial' else 2000
+    parts = []
+    for i, doc in enumerate(documents[:5]):
+        content = doc.get('content', '').strip()
+        parts.append(f"\n{'=' * 60}\nDOCUMENT {i + 1}: {doc['title']}\n\nCONTENT:\n{content[:max_chars]}\n")
+    return ''.join(parts)
+
+
+def evaluate(cases, budget):
+    rows = []
+    for case in cases:
+        financial = any(w in case['query'].lower() for w in ('balance', 'bank', 'financial'))
+        start = time.perf_counter()
+        old = truncation_context(case['query'], case['documents'], 'financial' if financial else 'general')
+        old_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        new, _ = build_compact_context(case['query'], case['documents'], token_budget=budget * (2 if financial else 1))
+        new_ms = (time.perf_counter() - start) * 1000
+        rows.append({
+            'query': case['query'],
+            'old_hit': case['answer'] in old, 'old_tokens': estimate_tokens(old), 'old_ms': old_ms,
+            'new_hit': case['answer'] in new, 'new_tokens': estimate_tokens(new), 'new_ms': new_ms,
+        })
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--cases', help='JSON file of {query, documents, answer} cases')
+    ap.add_argument('--budget', type=int, default=1500, help='Token budget for the ranked context')
+    args = ap.parse_args()
+
+    cases = BUILTIN_CASES
+    if args.cases:
+        with open(args.cases) as f:
+            cases = json.load(f)
+
+    rows = evaluate(cases, args.budget)
+
+    print("=" * 78)
+    print("PASSAGE SELECTION: truncation vs BM25")
+    print("=" * 78)
+    print(f"  {'query':<44} {'trunc':>12} {'bm25':>12}")
+    for r in rows:
+        print(f"  {r['query'][:44]:<44} {('hit ' if r['old_hit'] else 'MISS') + str(r['old_tokens']).rjust(6) + 't':>12} "
+              f"{('hit ' if r['new_hit'] else 'MISS') + str(r['new_tokens']).rjust(6) + 't':>12}")
+    n = len(rows)
+    print("-" * 78)
+    print(f"  Answer coverage:   truncation {sum(r['old_hit'] for r in rows)}/{n}   "
+          f"bm25 {sum(r['new_hit'] for r in rows)}/{n}")
+    print(f"  Mean input tokens: truncation {sum(r['old_tokens'] for r in rows) / n:.0f}   "
+          f"bm25 {sum(r['new_tokens'] for r in rows) / n:.0f}")
+    print(f"  Mean build time:   truncation {sum(r['old_ms'] for r in rows) / n:.2f} ms   "
+          f"bm25 {sum(r['new_ms'] for r in rows) / n:.2f} ms")
+    print("=" * 78)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
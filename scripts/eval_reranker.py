@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Offline evaluation of the local reranker (reranker.py).
+
+Replays the recorded doc test suites (run_100_doc_tests.py,
+run_100_expanded_tests.py -> *_test_results_*.json): each result holds the
+query, its community and the candidate documents exactly as search returned
+them. The label is the document Claude cited as the answer's source. For
+every query the recorded order (Azure simple search + post-processing) and
+the reranked order are scored by:
+
+- hit@1 / hit@3: cited document ranked first / in the top three
+- MRR: mean reciprocal rank of the cited document
+- foreign@3: top-three documents belonging to another community (per query)
+
+plus the rerank latency for 50 candidates, and (--ablate) the metrics with
+each feature switched off.
+
+Claude only saw the first five recorded documents, so the cited document is
+always among them: the labels favour the recorded order, and a reranker
+that merely matches it is doing well. foreign@3 has no such bias.
+
+Usage:
+    python scripts/eval_reranker.py                      # all result files in scripts/
+    python scripts/eval_reranker.py --files scripts/doc_test_results_20260130_011738.json
+    python scripts/eval_reranker.py --ablate             # per-feature contribution
+    python scripts/eval_reranker.py --weights '{"community": 2.0, "search": 0}'
+    python scripts/eval_reranker.py --verbose            # show queries the reranker changed
+"""
+
+import os
+import sys
+import json
+import glob
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import DOCUMENT_PATTERNS, normalize_community_name  # noqa: E402
+from document_metadata import has_date_intent  # noqa: E402
+from reranker import FEATURES, LocalReranker, community_match_score  # noqa: E402
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCH_CANDIDATES = 50
+BENCH_ROUNDS = 200
+
+
+def load_cases(files):
+    """(query, community, documents, cited title) for every recorded result with a cited source."""
+    cases = []
+    for path in files:
+        with open(path) as f:
+            data = json.load(f)
+        for result in data.get('results', []):
+            response = result.get('response') or {}
+            documents = response.get('documents') or []
+            extracted = ((response.get('ai_answer') or {}).get('extracted') or {})
+            source = extracted.get('source')
+            if len(documents) < 2 or not source or source == 'None':
+                continue
+            if not any(is_cited(doc, source) for doc in documents):
+                continue
+            cases.append((result['query'], result.get('community'), documents, source))
+    return cases
+
+
+def is_cited(doc, source):
+    title = doc.get('title') or ''
+    return bool(title) and (title == source or source in title or title in source)
+
+
+def evaluate(cases, rank):
+    hits1 = hits3 = foreign = 0
+    reciprocal = []
+    for query, community, documents, source in cases:
+        ranked = rank(query, community, documents)
+        position = next(i for i, doc in enumerate(ranked) if is_cited(doc, source))
+        hits1 += position == 0
+        hits3 += position < 3
+        reciprocal.append(1 / (position + 1))
+        if community:
+            normalized = normalize_community_name(community)
+            foreign += sum(1 for doc in ranked[:3]
+                           if not community_match_score(normalized, normalize_community_name(doc.get('community') or '')))
+    n = len(cases)
+    return {'hit@1': hits1 / n, 'hit@3': hits3 / n, 'mrr': statistics.mean(reciprocal), 'foreign@3': foreign / n}
+
+
+def print_row(label, metrics):
+    print(f"  {label:<22} hit@1 {metrics['hit@1']:6.1%}   hit@3 {metrics['hit@3']:6.1%}   "
+          f"MRR {metrics['mrr']:.3f}   foreign@3 {metrics['foreign@3']:.2f}")
+
+
+def benchmark(reranker, cases):
+    """Median milliseconds to rerank BENCH_CANDIDATES candidates."""
+    pool = [doc for _, _, documents, _ in cases for doc in documents]
+    query, community = cases[0][0], cases[0][1]
+    candidates = [dict(doc) for doc in (pool * (BENCH_CANDIDATES // max(len(pool), 1) + 1))[:BENCH_CANDIDATES]]
+    timings = []
+    for _ in range(BENCH_ROUNDS):
+        start = time.perf_counter()
+        reranker.rerank(query, candidates, community, recency=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), max(timings)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--files', nargs='+', default=sorted(glob.glob(os.path.join(SCRIPTS_DIR, '*_test_results_*.json'))))
+    ap.add_argument('--weights', default='{}', help='JSON feature weights overriding the defaults')
+    ap.add_argument('--ablate', action='store_true', help='MRR with each feature switched off')
+    ap.add_argument('--verbose', action='store_true', help='Show queries whose top document changed')
+    args = ap.parse_args()
+
+    cases = load_cases(args.files)
+    if not cases:
+        print("No recorded results with a cited source found.")
+        return 1
+    weights = json.loads(args.weights)
+    reranker = LocalReranker(DOCUMENT_PATTERNS, normalize_community_name, weights)
+
+    def reranked(query, community, documents, model=reranker):
+        return model.rerank(query, [dict(d) for d in documents], community, has_date_intent(query))
+
+    print("=" * 78)
+    print(f"LOCAL RERANKER: {len(cases)} queries with a cited source from {len(args.files)} result files")
+    print("=" * 78)
+    print_row('recorded order', evaluate(cases, lambda q, c, docs: docs))
+    print_row('reranked', evaluate(cases, reranked))
+
+    if args.ablate:
+        print("\n  Ablation (feature weight set to 0):")
+        for feature in FEATURES:
+            model = LocalReranker(DOCUMENT_PATTERNS, normalize_community_name, dict(weights, **{feature: 0}))
+            print_row(f"  - {feature}", evaluate(cases, lambda q, c, docs: reranked(q, c, docs, model)))
+
+    if args.verbose:
+        print("\n  Changed top documents:")
+        for query, community, documents, source in cases:
+            before = documents[0].get('title')
+            after = reranked(query, community, documents)[0].get('title')
+            if before != after:
+                mark = '+' if is_cited({'title': after}, source) else ('-' if is_cited({'title': before}, source) else ' ')
+                print(f"  {mark} {query}\n      {before}  ->  {after}")
+
+    median_ms, max_ms = benchmark(reranker, cases)
+    print(f"\n  Rerank {BENCH_CANDIDATES} candidates: median {median_ms:.2f}ms, max {max_ms:.2f}ms")
+    print("=" * 78)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Concurrency load test for the Manager Wizard search endpoints.
+
+Steps through increasing numbers of concurrent clients, each looping over a
+weighted mix of /api/unified-search, /api/suggest, /api/documents/search
+and /api/history requests, and reports throughput and latency per step.
+The "saturation" step is the first one where throughput stops growing
+(< 10% gain) or p95 latency more than doubles - compare it between worker
+configurations to measure the concurrency limit before and after.
+
+Run against a local or deployed instance:
+    GUNICORN_WORKER_CLASS=gthread gunicorn --config gunicorn.conf.py app:app   # before
+    gunicorn --config gunicorn.conf.py app:app                                 # after (gevent)
+    python scripts/load_test.py --base-url http://localhost:8080 --cookie "session=..."
+
+Options:
+    --levels 1 8 32 64 128 256   concurrent clients per step
+    --duration 20                seconds per step
+"""
+
+import sys
+import time
+import random
+import argparse
+import threading
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+# (weight, path template) - typeahead dominates real traffic
+REQUEST_MIX = [
+    (5, '/api/suggest?q={prefix}'),
+    (3, '/api/unified-search?q={query}&mode=auto'),
+    (1, '/api/documents/search?q={doc_query}&extract=false'),
+    (1, '/api/history?account={account}&limit=15'),
+]
+
+QUERIES = ['falcon pointe', 'smith', '1481 old settlers', 'avalon', 'garcia', 'vista vera']
+DOC_QUERIES = ['pool hours', 'fence height', 'pet policy', 'parking rules', 'assessment due date']
+ACCOUNTS = ['FAL51515', 'AVA10023', 'VIS20411']
+
+
+def build_url(base_url):
+    weights = [w for w, _ in REQUEST_MIX]
+    template = random.choices([t for _, t in REQUEST_MIX], weights=weights)[0]
+    query = random.choice(QUERIES)
+    return base_url + template.format(
+        prefix=quote(query[:random.randint(2, len(query))]),
+        query=quote(query),
+        doc_query=quote(random.choice(DOC_QUERIES)),
+        account=random.choice(ACCOUNTS),
+    )
+
+
+def run_level(base_url, cookies, concurrency, duration, timeout):
+    """Run `concurrency` client loops for `duration` seconds. Returns stats dict."""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.time() + duration
+
+    def client():
+        session = requests.Session()
+        session.cookies.update(cookies)
+        while time.time() < stop_at:
+            url = build_url(base_url)
+            start = time.perf_counter()
+            try:
+                ok = session.get(url, timeout=timeout).status_code < 500
+            except requests.RequestException:
+                ok = False
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors[0] += 1
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(client)
+    wall = time.time() - started
+
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] if latencies else 0
+
+    return {
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': errors[0],
+        'rps': len(latencies) / wall if wall else 0,
+        'p50': pct(0.50),
+        'p95': pct(0.95),
+        'p99': pct(0.99),
+        'max': latencies[-1] if latencies else 0,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--base-url', default='http://localhost:8080')
+    ap.add_argument('--cookie', default='', help='Session cookie, e.g. "session=abc" (routes need login)')
+    ap.add_argument('--levels', type=int, nargs='+', default=[1, 8, 32, 64, 128, 256])
+    ap.add_argument('--duration', type=float, default=20.0, help='Seconds per concurrency step')
+    ap.add_argument('--timeout', type=float, default=60.0, help='Per-request timeout (seconds)')
+    args = ap.parse_args()
+
+    cookies = {}
+    if '=' in args.cookie:
+        name, value = args.cookie.split('=', 1)
+        cookies[name.strip()] = value.strip()
+
+    print("=" * 70)
+    print(f"LOAD TEST  {args.base_url}  ({args.duration:.0f}s per step)")
+    print("=" * 70)
+    print(f"  {'clients':>7} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+
+    results = []
+    saturation = None
+    for level in args.levels:
+        stats = run_level(args.base_url.rstrip('/'), cookies, level, args.duration, args.timeout)
+        results.append(stats)
+        print(f"  {stats['concurrency']:>7} {stats['requests']:>9} {stats['errors']:>7} {stats['rps']:>8.1f} "
+              f"{stats['p50']:>8.0f} {stats['p95']:>8.0f} {stats['p99']:>8.0f} {stats['max']:>8.0f}")
+        if saturation is None and len(results) > 1:
+            prev = results[-2]
+            if stats['rps'] < prev['rps'] * 1.10 or (prev['p95'] and stats['p95'] > prev['p95'] * 2):
+                saturation = prev['concurrency']
+
+    print("=" * 70)
+    if saturation is not None:
+        print(f"  Saturation at ~{saturation} concurrent clients")
+    else:
+        print(f"  No saturation up to {args.levels[-1]} concurrent clients")
+    print("=" * 70)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
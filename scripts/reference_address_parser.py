@@ -0,0 +1,227 @@
+"""
+Reference AddressParser for scripts/bench_address_parser.py.
+
+The parser as it was before the pattern precompilation and pre-checks in
+address_utils.py (a fresh regex per known city per call, patterns compiled
+per instance), kept unchanged so the benchmark times the old and new
+parsers side by side in one run on the same machine.
+"""
+
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from address_utils import DIRECTIONAL_MAPPINGS, ParsedAddress  # noqa: E402
+
+
+class ReferenceAddressParser:
+    """Parse addresses into structured components (pre-optimization version)."""
+
+    # Regex patterns
+    STREET_NUMBER_PATTERN = r'^(\d+)([A-Za-z])?'
+    UNIT_PATTERN = r'(?:unit|apt|apartment|suite|ste|#|room|rm)\s*([A-Za-z0-9]+)'
+    ZIP_PATTERN = r'\b(\d{5})(?:-\d{4})?\b'
+    STATE_PATTERN = r'\b(TX|Texas)\b'
+
+    # Known Texas cities (common in the data)
+    KNOWN_CITIES = {
+        'austin', 'round rock', 'pflugerville', 'cedar park', 'leander',
+        'georgetown', 'hutto', 'taylor', 'lago vista', 'the hills',
+        'dripping springs', 'driftwood', 'bee cave', 'lakeway', 'manor',
+        'bastrop', 'kyle', 'buda', 'san marcos', 'new braunfels',
+        'san antonio', 'seguin', 'lockhart', 'del valle', 'elgin',
+        'jarrell', 'liberty hill', 'marble falls', 'spicewood', 'wimberley'
+    }
+
+    def __init__(self):
+        """Initialize parser with compiled regex patterns."""
+        self._street_number_re = re.compile(self.STREET_NUMBER_PATTERN)
+        self._unit_re = re.compile(self.UNIT_PATTERN, re.IGNORECASE)
+        self._zip_re = re.compile(self.ZIP_PATTERN)
+        self._state_re = re.compile(self.STATE_PATTERN, re.IGNORECASE)
+
+    def parse(self, address: str) -> ParsedAddress:
+        """Parse an address string into components."""
+        if not address:
+            return self._empty_address('')
+
+        original = address
+        working = address.strip()
+
+        # Extract and remove zip code
+        # Zip codes appear after city/state, not at the start
+        # Pattern: comma or state abbreviation followed by whitespace and 5 digits
+        zip_code = ''
+        # Look for zip at end or after TX/state
+        zip_pattern = r'(?:,\s*|\bTX\s*|\bTexas\s*)(\d{5})(?:-\d{4})?\b'
+        zip_match = re.search(zip_pattern, working, re.IGNORECASE)
+        if zip_match:
+            zip_code = zip_match.group(1)
+            # Remove zip code patterns (may appear multiple times in duplicated addresses)
+            working = re.sub(r'(?:,\s*)?\d{5}(?:-\d{4})?\s*(?:,|$)', '', working)
+            working = re.sub(r'\bTX\s+\d{5}(?:-\d{4})?\b', 'TX', working, flags=re.IGNORECASE)
+
+        # Extract and remove state
+        state = ''
+        state_match = self._state_re.search(working)
+        if state_match:
+            state = 'TX'
+            working = re.sub(r',?\s*(TX|Texas)\b', '', working, flags=re.IGNORECASE)
+
+        # Extract and remove city
+        # Only remove city when it appears after a comma or at the end
+        # (to avoid removing "The Hills Dr" street name when city is also "The Hills")
+        city = ''
+        working_lower = working.lower()
+        for known_city in sorted(self.KNOWN_CITIES, key=len, reverse=True):
+            # Look for city after comma, or city + state/zip at end
+            city_pattern = rf',\s*{re.escape(known_city)}\b'
+            if re.search(city_pattern, working_lower):
+                city = known_city.title()
+                # Only remove city when it appears after a comma
+                working = re.sub(city_pattern, '', working, flags=re.IGNORECASE)
+                break
+
+        # Extract and remove unit
+        unit_type = ''
+        unit_number = ''
+        unit_match = self._unit_re.search(working)
+        if unit_match:
+            unit_number = unit_match.group(1)
+            # Determine unit type
+            full_match = unit_match.group(0).lower()
+            if 'apt' in full_match or 'apartment' in full_match:
+                unit_type = 'apt'
+            elif 'suite' in full_match or 'ste' in full_match:
+                unit_type = 'suite'
+            elif '#' in full_match:
+                unit_type = '#'
+            else:
+                unit_type = 'unit'
+            working = working[:unit_match.start()] + working[unit_match.end():]
+
+        # Clean up remaining address
+        working = re.sub(r'\s+', ' ', working).strip()
+        working = re.sub(r'^,\s*|,\s*$', '', working)
+        working = re.sub(r',+', ',', working)
+        working = working.strip(' ,')
+
+        # Parse street components
+        parts = working.split()
+
+        street_number = ''
+        street_number_suffix = ''
+        pre_directional = ''
+        street_name_parts = []
+        street_type = ''
+        post_directional = ''
+
+        i = 0
+
+        # Street number (required for most addresses)
+        if parts and re.match(r'^\d+', parts[0]):
+            num_match = self._street_number_re.match(parts[0])
+            if num_match:
+                street_number = num_match.group(1)
+                street_number_suffix = num_match.group(2) or ''
+            i += 1
+
+        # Pre-directional (optional)
+        if i < len(parts) and parts[i].lower().rstrip('.') in DIRECTIONAL_MAPPINGS:
+            pre_directional = parts[i].rstrip('.')
+            i += 1
+
+        # Primary street types that should END the street name
+        # (these are unambiguous and shouldn't appear mid-name)
+        PRIMARY_STREET_TYPES = {
+            'st', 'street', 'ave', 'avenue', 'blvd', 'boulevard',
+            'dr', 'drive', 'ln', 'lane', 'rd', 'road', 'ct', 'court',
+            'cir', 'circle', 'way', 'pl', 'place', 'trl', 'trail',
+            'pkwy', 'parkway', 'ter', 'terrace', 'hwy', 'highway',
+            'xing', 'crossing', 'loop', 'run', 'path', 'bend', 'pass'
+        }
+
+        # Secondary types that could be part of street names
+        # (e.g., "Falcon Pointe Blvd" - Pointe is part of name, Blvd is type)
+        SECONDARY_STREET_WORDS = {
+            'pointe', 'point', 'pt', 'creek', 'crk', 'ridge', 'rdg',
+            'oaks', 'hills', 'hls', 'heights', 'hts', 'vista', 'vis',
+            'valley', 'vly', 'view', 'vw', 'estates', 'ests', 'ranch',
+            'rnch', 'springs', 'spgs', 'meadow', 'mdw', 'meadows', 'mdws',
+            'cove', 'cv'
+        }
+
+        # Street name and type - scan forward looking for end of street
+        while i < len(parts):
+            word = parts[i]
+            word_lower = word.lower().rstrip('.,')
+
+            # Is this a primary street type? (definite end of street name)
+            if word_lower in PRIMARY_STREET_TYPES:
+                street_type = word.rstrip('.,')
+                i += 1
+                # Check for post-directional after street type
+                if i < len(parts) and parts[i].lower().rstrip('.') in DIRECTIONAL_MAPPINGS:
+                    post_directional = parts[i].rstrip('.')
+                    i += 1
+                break
+
+            # Is this a secondary street word?
+            # Only treat as street type if it's the LAST word (no more parts after)
+            elif word_lower in SECONDARY_STREET_WORDS:
+                if i == len(parts) - 1:
+                    # Last word and it's a secondary type - treat as type
+                    street_type = word.rstrip('.,')
+                    i += 1
+                    break
+                else:
+                    # Not last word - include in street name (e.g., "Falcon Pointe" in "Falcon Pointe Blvd")
+                    street_name_parts.append(word.rstrip(','))
+                    i += 1
+
+            # Check if this is a post-directional without explicit street type
+            elif word_lower.rstrip('.') in DIRECTIONAL_MAPPINGS and i == len(parts) - 1:
+                post_directional = word.rstrip('.')
+                break
+
+            else:
+                street_name_parts.append(word.rstrip(','))
+                i += 1
+
+        street_name = ' '.join(street_name_parts)
+
+        return ParsedAddress(
+            original=original,
+            street_number=street_number,
+            street_number_suffix=street_number_suffix,
+            pre_directional=pre_directional,
+            street_name=street_name,
+            street_type=street_type,
+            post_directional=post_directional,
+            unit_type=unit_type,
+            unit_number=unit_number,
+            city=city,
+            state=state,
+            zip_code=zip_code
+        )
+
+    def _empty_address(self, original: str) -> ParsedAddress:
+        """Return an empty ParsedAddress."""
+        return ParsedAddress(
+            original=original,
+            street_number='',
+            street_number_suffix='',
+            pre_directional='',
+            street_name='',
+            street_type='',
+            post_directional='',
+            unit_type='',
+            unit_number='',
+            city='',
+            state='',
+            zip_code=''
+        )
+
+
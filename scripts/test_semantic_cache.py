@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Semantic answer cache test suite for Manager Wizard.
+Checks which question pairs the cache treats as the same question (offline,
+no API calls): paraphrases must hit, questions with a different answer must
+miss - a false hit returns the other question's answer with high confidence.
+
+Run: python scripts/test_semantic_cache.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from semantic_cache import SemanticCache, embed  # noqa: E402
+
+# (cached question, new question, extraction type)
+SAME_ANSWER = [
+    ("fence height limit", "how tall can my fence be", "fence"),
+    ("maximum fence height", "how high can a fence be", "fence"),
+    ("pool hours", "what time is the pool", "pool"),
+    ("pet policy", "animal policy", "pet"),
+]
+
+DIFFERENT_ANSWER = [
+    ("when does the pool open", "when does the pool close", "pool"),
+    ("are trucks allowed in driveway", "are cars allowed in driveway", "parking"),
+    ("how many dogs", "how many cats", "pet"),
+    ("2024 budget", "2025 budget", "financial"),
+]
+
+
+def run_case(cached_query, query, kind):
+    cache = SemanticCache()
+    cache.store('avalon', cached_query, {'answer': cached_query}, kind=kind)
+    hit = cache.lookup('avalon', query, kind=kind)
+    similarity = float(embed(cached_query) @ embed(query))
+    return hit is not None, similarity
+
+
+def main():
+    failures = 0
+    print("=" * 70)
+    print(f"SEMANTIC CACHE (threshold {SemanticCache().threshold})")
+    print("=" * 70)
+    for expected_hit, cases in ((True, SAME_ANSWER), (False, DIFFERENT_ANSWER)):
+        print(f"\n{'Paraphrases (must hit)' if expected_hit else 'Different questions (must miss)'}:")
+        for cached_query, query, kind in cases:
+            hit, similarity = run_case(cached_query, query, kind)
+            ok = hit == expected_hit
+            failures += not ok
+            print(f"  {'PASS' if ok else 'FAIL'}  {similarity:.3f}  '{cached_query}' vs '{query}'")
+    print("\n" + "=" * 70)
+    print("All passed" if not failures else f"{failures} failed")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+Semantic answer cache for Manager Wizard document questions.
+
+An exact-match cache misses paraphrases ("how tall can my fence be" vs
+"fence height limit"). Queries are embedded with a hashed-feature
+vectorizer - stemmed content words, HOA synonyms folded together, generic
+words down-weighted - and compared by cosine similarity against the
+queries already answered for the same community.
+
+Provides:
+- embed(): L2-normalized float32 vector of DIMENSIONS hashed features
+- SemanticCache: per-community NumPy matrix of query vectors with a
+  similarity threshold, per-community LRU eviction, a community cap, a TTL
+  and hit/miss/eviction counters. A hit also requires the same
+  extraction type and the same numbers in the query ("2024 budget" never
+  matches "2025 budget").
+
+No model download: hashing keeps the vectorizer stateless, so every worker
+embeds identically and a lookup is one matrix-vector product.
+"""
+
+import re
+import time
+import zlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+try:
+    from src.passage_ranker import STOP_WORDS, stem
+except ImportError:
+    from passage_ranker import STOP_WORDS, stem
+
+DIMENSIONS = 1024
+DEFAULT_THRESHOLD = 0.9
+DEFAULT_CAPACITY = 256          # cached queries per community
+DEFAULT_MAX_COMMUNITIES = 200
+DEFAULT_TTL = 24 * 3600
+
+WORD = re.compile(r"[a-z0-9]+")
+NUMBER = re.compile(r'\d+(?:\.\d+)?')
+
+# Paraphrases folded onto one feature (applied before stemming). Only true
+# synonyms: words naming different things (dog/cat, car/truck) or opposite
+# ends (open/close) stay distinct, since a hit returns the other question's answer.
+SYNONYMS = {
+    'tall': 'height', 'taller': 'height', 'high': 'height', 'higher': 'height', 'heights': 'height',
+    'max': 'limit', 'maximum': 'limit', 'most': 'limit', 'limits': 'limit', 'restriction': 'limit',
+    'restrictions': 'limit',
+    'animal': 'pet', 'animals': 'pet',
+    'swim': 'pool', 'swimming': 'pool',
+    'park': 'parking',
+    'time': 'hours', 'times': 'hours',
+    'dues': 'assessment', 'fees': 'fee',
+    'regulations': 'rules', 'regulation': 'rules', 'rule': 'rules', 'policies': 'rules', 'policy': 'rules',
+}
+EXTRA_STOP_WORDS = {'be', 'have', 'get', 'put', 'much', 'many', 'allowed', 'permitted', 'need', 'we', 'me',
+                    'our', 'you', 'your', 'hoa', 'please', 'tell', 'long', 'big'}
+# Present in many questions about different things - count for less
+LOW_WEIGHT = {'limit': 0.5, 'rules': 0.5, 'fee': 0.75}
+
+
+def _features(query: str) -> dict:
+    weights = {}
+    for word in WORD.findall(query.lower()):
+        if word in STOP_WORDS or word in EXTRA_STOP_WORDS or NUMBER.fullmatch(word):
+            continue
+        term = stem(SYNONYMS.get(word, word))
+        weights[term] = LOW_WEIGHT.get(term, 1.0)
+    return weights
+
+
+def embed(query: str) -> np.ndarray:
+    """Hashed-feature embedding (signed hashing trick), L2-normalized."""
+    vector = np.zeros(DIMENSIONS, dtype=np.float32)
+    for term, weight in _features(query).items():
+        h = zlib.crc32(term.encode())
+        vector[h % DIMENSIONS] += weight if (h >> 16) & 1 else -weight
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class _Bucket:
+    """One community's cached queries: a preallocated matrix plus entry metadata."""
+
+    def __init__(self, capacity: int):
+        self.vectors = np.zeros((capacity, DIMENSIONS), dtype=np.float32)
+        self.last_used = np.zeros(capacity, dtype=np.int64)
+        self.entries = [None] * capacity
+        self.size = 0
+
+
+class SemanticCache:
+    """Nearest-neighbour cache of answers keyed by query meaning, per community."""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, capacity: int = DEFAULT_CAPACITY,
+                 max_communities: int = DEFAULT_MAX_COMMUNITIES, ttl: float = DEFAULT_TTL):
+        self.threshold = threshold
+        self.capacity = capacity
+        self.max_communities = max_communities
+        self.ttl = ttl
+        self._buckets: 'OrderedDict[str, _Bucket]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._tick = 0
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'expired': 0}
+
+    def __len__(self) -> int:
+        return sum(b.size for b in self._buckets.values())
+
+    def lookup(self, community: str, query: str, kind: str = '') -> Optional[dict]:
+        """
+        The cached value of the most similar earlier query, with 'similarity'
+        and 'matched_query' added, or None.
+        """
+        vector = embed(query)
+        numbers = sorted(NUMBER.findall(query))
+        with self._lock:
+            bucket = self._buckets.get(community)
+            if bucket is None or not bucket.size or not vector.any():
+                self.stats['misses'] += 1
+                return None
+            self._buckets.move_to_end(community)
+            similarities = bucket.vectors[:bucket.size] @ vector
+            for index in np.argsort(-similarities)[:3]:
+                similarity = float(similarities[index])
+                if similarity < self.threshold:
+                    break
+                entry = bucket.entries[index]
+                if time.time() - entry['stored_at'] > self.ttl:
+                    self.stats['expired'] += 1
+                    continue
+                if entry['kind'] != kind or entry['numbers'] != numbers:
+                    continue
+                self._tick += 1
+                bucket.last_used[index] = self._tick
+                self.stats['hits'] += 1
+                return dict(entry['value'], similarity=round(similarity, 3), matched_query=entry['query'])
+            self.stats['misses'] += 1
+            return None
+
+    def store(self, community: str, query: str, value: dict, kind: str = '') -> None:
+        """Cache `value` for `query`; evicts the community's least recently used entry when full."""
+        vector = embed(query)
+        if not vector.any():
+            return
+        entry = {'query': query, 'kind': kind, 'numbers': sorted(NUMBER.findall(query)),
+                 'value': value, 'stored_at': time.time()}
+        with self._lock:
+            bucket = self._buckets.get(community)
+            if bucket is None:
+                if len(self._buckets) >= self.max_communities:
+                    _, dropped = self._buckets.popitem(last=False)
+                    self.stats['evictions'] += dropped.size
+                bucket = self._buckets[community] = _Bucket(self.capacity)
+            self._buckets.move_to_end(community)
+
+            # Same query again (or a near-duplicate): overwrite it
+            if bucket.size:
+                similarities = bucket.vectors[:bucket.size] @ vector
+                best = int(np.argmax(similarities))
+                if similarities[best] > 0.999 and bucket.entries[best]['kind'] == kind:
+                    index = best
+                else:
+                    index = None
+            else:
+                index = None
+            if index is None:
+                if bucket.size < self.capacity:
+                    index = bucket.size
+                    bucket.size += 1
+                else:
+                    index = int(np.argmin(bucket.last_used[:bucket.size]))
+                    self.stats['evictions'] += 1
+            self._tick += 1
+            bucket.vectors[index] = vector
+            bucket.last_used[index] = self._tick
+            bucket.entries[index] = entry
+            self.stats['stores'] += 1
+
+    def summary(self) -> dict:
+        return dict(self.stats, entries=len(self), communities=len(self._buckets), threshold=self.threshold)
@@ -0,0 +1,61 @@
+"""
+Session backend selection for Manager Wizard.
+
+Backends (SESSION_BACKEND):
+- cookie:     Flask's signed cookie session. Holds only the identity claims
+              set at login; no server-side state, so sessions survive
+              scale-out as long as every instance shares SECRET_KEY.
+              Without SECRET_KEY (app.config, from the environment) the
+              filesystem backend is used instead, with a startup warning;
+              this is the only place that fallback is decided. The Cloud Run deploy
+              (cloudbuild.yaml) mounts SECRET_KEY from Secret Manager.
+- redis:      Flask-Session server-side store shared by all instances
+              (REDIS_URL), for state too large for a cookie.
+- filesystem: Flask-Session files under SESSION_FILE_DIR (per instance).
+"""
+
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+SESSION_BACKENDS = ('cookie', 'redis', 'filesystem')
+DEFAULT_SESSION_BACKEND = 'cookie'
+
+
+def configure_session(app, backend=None):
+    """
+    Configure session storage on a Flask app (after app.config['SECRET_KEY']
+    is set, if it is going to be). Returns the backend in use.
+    """
+    backend = (backend or os.environ.get('SESSION_BACKEND') or DEFAULT_SESSION_BACKEND).lower()
+    if backend not in SESSION_BACKENDS:
+        logger.warning(f"Unknown SESSION_BACKEND '{backend}', using '{DEFAULT_SESSION_BACKEND}'")
+        backend = DEFAULT_SESSION_BACKEND
+
+    if backend == 'redis':
+        try:
+            import redis
+            app.config['SESSION_TYPE'] = 'redis'
+            app.config['SESSION_REDIS'] = redis.from_url(os.environ.get('REDIS_URL', 'redis://localhost:6379/0'))
+        except ImportError:
+            logger.error("SESSION_BACKEND=redis but the redis package is not installed")
+            backend = 'cookie'
+
+    if backend == 'cookie' and not app.config.get('SECRET_KEY'):
+        # A per-process random key would invalidate every cookie on restart and across workers/instances
+        logger.warning("SECRET_KEY not set - signed-cookie sessions would not survive restarts or span "
+                       "workers; falling back to the filesystem session backend. Set SECRET_KEY (see "
+                       "cloudbuild.yaml for the Secret Manager binding) for cookie sessions.")
+        backend = 'filesystem'
+
+    if backend == 'cookie':
+        # Flask's built-in SecureCookieSessionInterface (itsdangerous-signed, compressed JSON)
+        return backend
+    if backend == 'filesystem':
+        app.config['SESSION_TYPE'] = 'filesystem'
+        app.config.setdefault('SESSION_FILE_DIR', '/tmp/flask_session')
+
+    from flask_session import Session
+    Session(app)
+    return backend
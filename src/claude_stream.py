@@ -0,0 +1,262 @@
+"""
+Streaming Claude extraction helpers for Manager Wizard.
+
+The extraction prompts ask Claude for a single JSON object whose first
+field is "answer". Instead of waiting for the whole completion and then
+regex-searching for the object, these helpers stream the Messages API
+(server-sent events) and parse the JSON as it arrives, so each top-level
+field is available the moment its value is complete - the answer
+typically seconds before the quote, summary and follow-ups.
+
+All calls go through one LLMDispatcher (src/llm_dispatcher.py): identical
+concurrent requests are coalesced, requests are rate limited and queued by
+priority, and 429/529 responses are retried with jittered backoff.
+
+Usage:
+    from src.claude_stream import stream_claude_json
+
+    for kind, key, value in stream_claude_json(payload, api_key, timeout=30):
+        if kind == 'field':
+            ...                     # key/value of one completed top-level field
+        elif kind == 'usage':
+            usage = value           # tokens (incl. prompt-cache reads/writes) and latency
+        else:                       # kind == 'done'
+            result = value          # full parsed dict, or None
+"""
+
+import os
+import re
+import time
+import json
+import logging
+
+import requests
+
+try:
+    from src.llm_dispatcher import LLMDispatcher, RetryableError
+except ImportError:  # run as a script from src/
+    from llm_dispatcher import LLMDispatcher, RetryableError
+
+logger = logging.getLogger(__name__)
+
+ANTHROPIC_MESSAGES_URL = "https://api.anthropic.com/v1/messages"
+ANTHROPIC_VERSION = "2023-06-01"
+
+# Account rate limits (Anthropic console -> Limits); 0 disables a bucket
+LLM_REQUESTS_PER_MINUTE = float(os.environ.get('LLM_REQUESTS_PER_MINUTE', 50))
+LLM_INPUT_TOKENS_PER_MINUTE = float(os.environ.get('LLM_INPUT_TOKENS_PER_MINUTE', 50000))
+LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', 3))
+
+# 429 rate limited, 529 overloaded (and their streamed error-event equivalents)
+RETRYABLE_STATUS = (429, 529)
+RETRYABLE_ERRORS = {'rate_limit_error': 429, 'overloaded_error': 529}
+
+
+class IncrementalJsonParser:
+    """
+    Parse one JSON object from text fed in arbitrary chunks. feed() returns
+    the (key, value) pairs of top-level fields completed by that chunk.
+    Text before the opening brace (e.g. a ```json fence) is skipped.
+    """
+
+    def __init__(self):
+        self.text = ''
+        self.fields = {}
+        self.done = False
+        self._pos = 0
+        self._state = 'seek'      # seek, key, colon, value_start, value
+        self._key = None
+        self._start = 0           # start index of the current key or value
+        self._kind = None         # 'string', 'nested' or 'scalar' while in a value
+        self._depth = 0           # bracket depth inside a nested value
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> list:
+        self.text += chunk
+        completed = []
+        text = self.text
+        i = self._pos
+        n = len(text)
+        while i < n and not self.done:
+            c = text[i]
+            state = self._state
+            if state == 'seek':
+                if c == '{':
+                    self._state = 'key'
+            elif state == 'key':
+                if self._in_string:
+                    if self._escape:
+                        self._escape = False
+                    elif c == '\\':
+                        self._escape = True
+                    elif c == '"':
+                        self._in_string = False
+                        self._key = json.loads(text[self._start:i + 1])
+                        self._state = 'colon'
+                elif c == '"':
+                    self._in_string = True
+                    self._start = i
+                elif c == '}':
+                    self.done = True
+            elif state == 'colon':
+                if c == ':':
+                    self._state = 'value_start'
+            elif state == 'value_start':
+                if not c.isspace():
+                    self._start = i
+                    self._state = 'value'
+                    if c == '"':
+                        self._kind = 'string'
+                        self._in_string = True
+                    elif c in '{[':
+                        self._kind = 'nested'
+                        self._depth = 1
+                    else:
+                        self._kind = 'scalar'
+            elif self._kind == 'string' or (self._kind == 'nested' and self._in_string):
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._kind == 'string':
+                        completed.append(self._complete(text[self._start:i + 1]))
+            elif self._kind == 'nested':
+                if c == '"':
+                    self._in_string = True
+                elif c in '{[':
+                    self._depth += 1
+                elif c in '}]':
+                    self._depth -= 1
+                    if self._depth == 0:
+                        completed.append(self._complete(text[self._start:i + 1]))
+            elif c in ',}' or c.isspace():  # end of a scalar
+                completed.append(self._complete(text[self._start:i]))
+                if c == '}':
+                    self.done = True
+            i += 1
+        self._pos = i
+        return [field for field in completed if field is not None]
+
+    def _complete(self, raw: str):
+        self._state = 'key'
+        self._kind = None
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            value = raw.strip()
+        self.fields[self._key] = value
+        return self._key, value
+
+    def result(self):
+        """The parsed object, falling back to a whole-text parse if streaming parsing fell short."""
+        if self.done:
+            return self.fields
+        match = re.search(r'\{[\s\S]*\}', self.text)
+        if match:
+            try:
+                return json.loads(match.group())
+            except ValueError:
+                pass
+        return self.fields or None
+
+
+USAGE_FIELDS = ('input_tokens', 'output_tokens', 'cache_creation_input_tokens', 'cache_read_input_tokens')
+
+
+def iter_text_deltas(resp, usage=None):
+    """
+    Yield text deltas from a streaming Messages API response. Token counts
+    from message_start / message_delta are written into `usage` if given.
+    """
+    for line in resp.iter_lines(decode_unicode=True):
+        if not line or not line.startswith('data:'):
+            continue
+        event = json.loads(line[5:].strip())
+        event_type = event.get('type')
+        if event_type == 'content_block_delta' and event['delta'].get('type') == 'text_delta':
+            yield event['delta']['text']
+        elif event_type in ('message_start', 'message_delta') and usage is not None:
+            counts = (event.get('message') or {}).get('usage') or event.get('usage') or {}
+            usage.update({k: v for k, v in counts.items() if k in USAGE_FIELDS and v is not None})
+        elif event_type == 'message_stop':
+            return
+        elif event_type == 'error':
+            error = event.get('error', {})
+            if error.get('type') in RETRYABLE_ERRORS:
+                raise RetryableError(RETRYABLE_ERRORS[error['type']], message=error.get('message', ''))
+            raise RuntimeError(f"Claude stream error: {error.get('message', event)}")
+
+
+def _retry_after(resp):
+    try:
+        return float(resp.headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+def _send_json_stream(payload: dict, api_key: str, timeout: float = 30):
+    """
+    One streamed Messages API call (no retries). Raises RetryableError for
+    429/529 before yielding anything; other failures end with ('done', None, None).
+    """
+    parser = IncrementalJsonParser()
+    usage = {}
+    start = time.monotonic()
+    try:
+        resp = requests.post(
+            ANTHROPIC_MESSAGES_URL,
+            headers={
+                "x-api-key": api_key,
+                "anthropic-version": ANTHROPIC_VERSION,
+                "content-type": "application/json"
+            },
+            json=dict(payload, stream=True),
+            stream=True,
+            timeout=timeout
+        )
+        with resp:
+            if resp.status_code in RETRYABLE_STATUS:
+                raise RetryableError(resp.status_code, _retry_after(resp))
+            if resp.status_code != 200:
+                logger.error(f"Claude API failed: {resp.status_code} - {resp.text[:200]}")
+                yield 'done', None, None
+                return
+            for delta in iter_text_deltas(resp, usage):
+                if 'first_token_ms' not in usage:
+                    usage['first_token_ms'] = round((time.monotonic() - start) * 1000)
+                for key, value in parser.feed(delta):
+                    yield 'field', key, value
+    except RetryableError:
+        raise
+    except Exception as e:
+        logger.error(f"Claude streaming request failed: {e}")
+        yield 'done', None, None
+        return
+    usage['latency_ms'] = round((time.monotonic() - start) * 1000)
+    yield 'usage', None, usage
+    yield 'done', None, parser.result()
+
+
+dispatcher = LLMDispatcher(
+    _send_json_stream,
+    requests_per_minute=LLM_REQUESTS_PER_MINUTE,
+    input_tokens_per_minute=LLM_INPUT_TOKENS_PER_MINUTE,
+    max_retries=LLM_MAX_RETRIES,
+)
+
+
+def stream_claude_json(payload: dict, api_key: str, timeout: float = 30, priority: str = 'interactive',
+                       cancel=None):
+    """
+    Stream a Messages API call whose reply is one JSON object.
+    Yields ('field', key, value) as top-level fields complete, then
+    ('usage', None, usage) with token counts, first_token_ms, latency_ms,
+    queue_wait_ms and retries, then ('done', None, result) with the parsed
+    dict (None on failure). priority='batch' yields to interactive callers.
+    Setting `cancel` (threading.Event) abandons the call while it is queued,
+    backing off, or streaming; the stream then simply ends.
+    """
+    yield from dispatcher.stream(payload, api_key, timeout=timeout, priority=priority, cancel=cancel)
@@ -0,0 +1,149 @@
+"""
+Compact, query-focused document context for Claude extraction prompts.
+
+Instead of pasting the first 2,000-4,000 characters of each of the top five
+chunks, the context is assembled from the passages that best match the
+question (src/passage_ranker.py):
+
+- Sentences are split out of every document and de-duplicated across
+  documents (the same boilerplate paragraph often appears in several
+  chunks of one PDF and in amended copies)
+- Windows of consecutive sentences are ranked with BM25 against the
+  question's keywords, with a small bonus for numbers when the question
+  asks for one
+- The best window of each document is taken first (so every relevant
+  source is represented), then the rest by score, until the character
+  budget is spent; chosen sentences are printed in document order
+
+Usage:
+    from src.context_builder import build_compact_context
+
+    context, stats = build_compact_context(query, documents, token_budget=1500)
+"""
+
+import re
+from typing import Optional, Tuple
+
+try:
+    from src.passage_ranker import WORD, query_terms, rank_windows, split_sentences
+except ImportError:  # run as a script from src/
+    from passage_ranker import WORD, query_terms, rank_windows, split_sentences
+
+# Rough characters-per-token for English prose (Claude tokenizer)
+CHARS_PER_TOKEN = 4
+DEFAULT_TOKEN_BUDGET = 1500
+MAX_DOCUMENTS = 5
+
+# Questions asking for an amount, limit, time or date
+NUMERIC_QUESTION = re.compile(r'\b(how (many|much|long|tall|high|late|early)|height|limit|max|minimum|fee|'
+                              r'hours?|amount|balance|cost|size|weight|number|when|date|deadline)\b', re.I)
+NUMBER = re.compile(r'\d|\b(one|two|three|four|five|six|seven|eight|nine|ten|twelve|fifteen|twenty|thirty)\b', re.I)
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _dedup_key(sentence: str) -> str:
+    return ' '.join(WORD.findall(sentence.lower()))
+
+
+def _doc_header(index: int, doc: dict) -> str:
+    header = f"[{index}] {doc.get('title', 'Unknown Document')}"
+    details = [d for d in (doc.get('community'), doc.get('doc_type_info', {}).get('label')) if d]
+    if details:
+        header += f" ({', '.join(details)})"
+    if doc.get('is_archived'):
+        header += " [ARCHIVED - may be outdated]"
+    return header
+
+
+def build_compact_context(query: str, documents: list, token_budget: int = DEFAULT_TOKEN_BUDGET,
+                          max_documents: int = MAX_DOCUMENTS,
+                          char_budget: Optional[int] = None) -> Tuple[str, dict]:
+    """
+    Build the document section of an extraction prompt within `char_budget`
+    characters (default token_budget * CHARS_PER_TOKEN).
+    Returns (context text, stats) where stats has documents, sentences,
+    duplicates_dropped, chars and est_tokens.
+    """
+    documents = documents[:max_documents]
+    if char_budget is None:
+        char_budget = token_budget * CHARS_PER_TOKEN
+
+    # Unique sentences per document, keeping their original order
+    doc_sentences = []
+    seen = set()
+    duplicates = 0
+    for doc in documents:
+        unique = []
+        for sentence in split_sentences(doc.get('content', '')):
+            key = _dedup_key(sentence)
+            if key in seen:
+                duplicates += 1
+                continue
+            seen.add(key)
+            unique.append(sentence)
+        doc_sentences.append(unique)
+
+    boost = None
+    if NUMERIC_QUESTION.search(query):
+        def boost(text):
+            return 1.25 if NUMBER.search(text) else 1.0
+    passages = rank_windows(query_terms(query), doc_sentences, boost=boost)
+
+    headers = [_doc_header(i + 1, doc) for i, doc in enumerate(documents)]
+    budget = max(char_budget - sum(len(h) + 2 for h in headers), 0)
+    chosen = {}  # (doc, sentence index) -> text
+
+    def take(doc, start, sentences):
+        """Add a window's sentences not already chosen, if they fit."""
+        nonlocal budget
+        new = [(start + k, s) for k, s in enumerate(sentences) if (doc, start + k) not in chosen]
+        cost = sum(len(s) + 3 for _, s in new)
+        if not new or cost > budget:
+            return False
+        for position, sentence in new:
+            chosen[(doc, position)] = sentence
+        budget -= cost
+        return True
+
+    best_per_doc = {}
+    for passage in passages:
+        best_per_doc.setdefault(passage.doc, passage)
+    for passage in sorted(best_per_doc.values(), key=lambda p: -p.score):
+        take(passage.doc, passage.start, passage.sentences)
+    for passage in passages:
+        take(passage.doc, passage.start, passage.sentences)
+
+    if not chosen:
+        # Nothing matched the question's keywords - fall back to each chunk's opening sentences
+        for d, sentences in enumerate(doc_sentences):
+            for position, sentence in enumerate(sentences[:3]):
+                take(d, position, (sentence,))
+
+    lines = []
+    for i, doc in enumerate(documents):
+        lines.append(headers[i])
+        picked = sorted((pos, s) for (d, pos), s in chosen.items() if d == i)
+        if picked:
+            previous = None
+            for position, sentence in picked:
+                if previous is not None and position != previous + 1:
+                    lines.append("  ...")
+                lines.append(f"- {sentence}")
+                previous = position
+        elif not doc.get('content'):
+            lines.append("- (no text content available)")
+        else:
+            lines.append("- (no passage relevant to the question)")
+        lines.append('')
+    context = '\n'.join(lines).strip()
+
+    return context, {
+        'documents': len(documents),
+        'sentences': len(chosen),
+        'duplicates_dropped': duplicates,
+        'chars': len(context),
+        'est_tokens': estimate_tokens(context),
+    }
@@ -0,0 +1,348 @@
+"""
+Rate-limit aware dispatcher for Claude calls.
+
+Every Messages API call in the app goes through one LLMDispatcher
+(src/claude_stream.py), which:
+
+- Coalesces identical in-flight requests: when several managers ask the same
+  question at once (e.g. after a community email blast), the first caller
+  makes the call and the others replay its streamed events
+- Enforces token-bucket limits on requests and estimated input tokens per
+  minute, matching the account's Anthropic rate limits
+- Queues callers by priority when the buckets are empty - interactive
+  searches before batch jobs (scripts/build_policy_facts.py), FIFO within a
+  priority - and gives up once a caller's own deadline would pass
+- Retries 429 (rate limited) and 529 (overloaded) responses with full-jitter
+  exponential backoff, honouring retry-after, as long as nothing has been
+  streamed to the caller yet
+- Runs each call on its own thread and streams its events to every caller
+  attached to it; a caller whose `cancel` event is set just detaches. The
+  call itself is abandoned only once no caller is left: in the queue, before
+  a retry backoff, or between streamed events (a request already waiting on
+  the API's first byte still runs until that arrives or times out)
+
+Usage:
+    from src.llm_dispatcher import LLMDispatcher, RetryableError
+
+    dispatcher = LLMDispatcher(send, requests_per_minute=50)
+    for kind, key, value in dispatcher.stream(payload, api_key, timeout=30, priority='interactive'):
+        ...
+
+`send(payload, api_key, timeout)` yields ('field'|'usage'|'done', key, value)
+events and raises RetryableError for a 429/529 before its first event.
+"""
+
+import json
+import time
+import heapq
+import random
+import hashlib
+import logging
+import itertools
+import threading
+from collections import deque
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = {'interactive': 0, 'batch': 1}
+
+WAIT_SAMPLES = 1000  # recent queue waits kept per priority for percentiles
+CANCEL_POLL_SECONDS = 0.25  # how often blocked waits re-check a caller's cancel event
+
+
+class RetryableError(Exception):
+    """A 429/529 from the API: safe to retry after backing off."""
+
+    def __init__(self, status: int, retry_after: Optional[float] = None, message: str = ''):
+        super().__init__(message or f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+class DispatcherBusy(Exception):
+    """The rate limit would delay the call past the caller's deadline."""
+
+
+class DispatchCancelled(Exception):
+    """The caller gave up on the call (its cancel event was set) before it was sent."""
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, cost: float, now: float) -> float:
+        """Seconds until `cost` tokens are available (0 if they are now)."""
+        self._refill(now)
+        cost = min(cost, self.capacity)
+        return 0.0 if self.tokens >= cost else (cost - self.tokens) / self.rate
+
+    def take(self, cost: float) -> None:
+        self.tokens -= min(cost, self.capacity)
+
+
+class _SharedCall:
+    """Events of one in-flight call, replayable by every caller attached to it."""
+
+    def __init__(self):
+        self.events = []
+        self.finished = False
+        self.cond = threading.Condition()
+        self.consumers = 1
+        self.abandoned = threading.Event()  # set once every caller has detached
+
+    def attach(self) -> None:
+        with self.cond:
+            self.consumers += 1
+
+    def detach(self) -> None:
+        with self.cond:
+            self.consumers -= 1
+            if self.consumers <= 0:
+                self.abandoned.set()
+
+    def publish(self, event) -> None:
+        with self.cond:
+            self.events.append(event)
+            self.cond.notify_all()
+
+    def finish(self) -> None:
+        with self.cond:
+            self.finished = True
+            self.cond.notify_all()
+
+    def replay(self, timeout: float, cancel: Optional[threading.Event] = None):
+        deadline = time.monotonic() + timeout
+        index = 0
+        while True:
+            with self.cond:
+                while index >= len(self.events) and not self.finished:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or (cancel is not None and cancel.is_set()):
+                        return
+                    self.cond.wait(remaining if cancel is None else min(remaining, CANCEL_POLL_SECONDS))
+                if index >= len(self.events):
+                    return
+                event = self.events[index]
+            index += 1
+            yield event
+
+
+class LLMDispatcher:
+    """Coalescing, rate-limited, prioritized, retrying front for streamed LLM calls."""
+
+    def __init__(self, send: Callable, requests_per_minute: float = 50, input_tokens_per_minute: float = 50000,
+                 max_retries: int = 3, backoff_base: float = 1.0, backoff_cap: float = 20.0):
+        self.send = send
+        self.requests = TokenBucket(requests_per_minute / 60, max(requests_per_minute / 6, 1)) \
+            if requests_per_minute else None
+        self.input_tokens = TokenBucket(input_tokens_per_minute / 60, input_tokens_per_minute / 6) \
+            if input_tokens_per_minute else None
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.on_wait = None  # optional callback(seconds, priority name) for a metrics histogram
+
+        self._cond = threading.Condition()
+        self._waiting = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self._waits = {name: deque(maxlen=WAIT_SAMPLES) for name in PRIORITIES}
+        self.stats = {'calls': 0, 'coalesced': 0, 'throttled': 0, 'retries': 0, 'rejected': 0, 'failed': 0,
+                      'cancelled': 0}
+
+    # -------------------------------------------------------------------------
+    # Rate limiting
+    # -------------------------------------------------------------------------
+
+    def _wait_time(self, cost: float, now: float) -> float:
+        waits = [0.0]
+        if self.requests:
+            waits.append(self.requests.wait_time(1, now))
+        if self.input_tokens:
+            waits.append(self.input_tokens.wait_time(cost, now))
+        return max(waits)
+
+    def _acquire(self, priority: str, cost: float, deadline: float,
+                 cancel: Optional[threading.Event] = None) -> float:
+        """
+        Block until this caller is first in line and the buckets allow it.
+        Returns seconds waited; raises DispatcherBusy past the deadline and
+        DispatchCancelled once `cancel` is set.
+        """
+        entry = (PRIORITIES.get(priority, 0), next(self._seq))
+        start = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+            while True:
+                if cancel is not None and cancel.is_set():
+                    self._waiting.remove(entry)
+                    heapq.heapify(self._waiting)
+                    self._cond.notify_all()
+                    raise DispatchCancelled(f"caller gave up while queued ({priority})")
+                now = time.monotonic()
+                wait = None
+                if self._waiting[0] == entry:
+                    wait = self._wait_time(cost, now)
+                    if wait <= 0:
+                        heapq.heappop(self._waiting)
+                        if self.requests:
+                            self.requests.take(1)
+                        if self.input_tokens:
+                            self.input_tokens.take(cost)
+                        self._cond.notify_all()
+                        break
+                remaining = deadline - now
+                if remaining <= 0 or (wait is not None and wait > remaining):
+                    self._waiting.remove(entry)
+                    heapq.heapify(self._waiting)
+                    self._cond.notify_all()
+                    self.stats['rejected'] += 1
+                    raise DispatcherBusy(f"rate limit wait exceeds deadline ({priority})")
+                timeout = min(wait, remaining) if wait is not None else remaining
+                self._cond.wait(timeout if cancel is None else min(timeout, CANCEL_POLL_SECONDS))
+        waited = time.monotonic() - start
+        self._waits[priority if priority in PRIORITIES else 'interactive'].append(waited)
+        if self.on_wait:
+            self.on_wait(waited, priority)
+        return waited
+
+    # -------------------------------------------------------------------------
+    # Calls
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def coalescing_key(payload: dict) -> str:
+        return hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def stream(self, payload: dict, api_key: str, timeout: float = 30, priority: str = 'interactive',
+               cancel: Optional[threading.Event] = None):
+        """
+        Yield the events of `send(payload, ...)`. Identical concurrent
+        payloads share one call; followers' 'usage' event carries no token
+        counts (they were not billed) and has coalesced=True. Setting
+        `cancel` (threading.Event) ends this caller's stream; the shared call
+        keeps running for any other caller still attached to it.
+        """
+        key = self.coalescing_key(payload)
+        with self._inflight_lock:
+            call = self._inflight.get(key)
+            leader = call is None or call.abandoned.is_set()
+            if leader:
+                call = self._inflight[key] = _SharedCall()
+                self.stats['calls'] += 1
+            else:
+                call.attach()
+                self.stats['coalesced'] += 1
+
+        if leader:
+            threading.Thread(target=self._produce, args=(call, key, payload, api_key, timeout, priority),
+                             name='llm-call', daemon=True).start()
+        start = time.monotonic()
+        try:
+            for kind, field, value in call.replay(timeout, cancel):
+                if kind == 'usage' and not leader:
+                    value = {'coalesced': True, 'latency_ms': round((time.monotonic() - start) * 1000)}
+                yield kind, field, value
+        finally:
+            call.detach()
+
+    def _produce(self, call: _SharedCall, key: str, payload: dict, api_key: str, timeout: float, priority: str):
+        """Run one call and publish its events; always ends the stream with a 'done' event."""
+        try:
+            self._lead(call, payload, api_key, timeout, priority)
+        except Exception as e:
+            logger.error(f"Claude call failed: {e}")
+        finally:
+            with self._inflight_lock:
+                if self._inflight.get(key) is call:
+                    del self._inflight[key]
+            if not call.events or call.events[-1][0] != 'done':
+                call.publish(('done', None, None))
+            call.finish()
+
+    def _lead(self, call: _SharedCall, payload: dict, api_key: str, timeout: float, priority: str):
+        # The call is given up only when every attached caller has gone
+        cancel = call.abandoned
+        deadline = time.monotonic() + timeout
+        cost = len(json.dumps(payload)) / 4  # rough input tokens
+        waited = 0.0
+        attempt = 0
+        while True:
+            try:
+                waited += self._acquire(priority, cost, deadline, cancel)
+            except DispatcherBusy as e:
+                logger.warning(f"Claude call not sent: {e}")
+                break
+            except DispatchCancelled:
+                self.stats['cancelled'] += 1
+                return
+            streamed = False
+            try:
+                for kind, field, value in self.send(payload, api_key, max(deadline - time.monotonic(), 1)):
+                    if cancel.is_set():
+                        # Returning closes send()'s generator and with it the HTTP stream
+                        self.stats['cancelled'] += 1
+                        return
+                    if kind == 'field':
+                        streamed = True
+                    elif kind == 'usage':
+                        value = dict(value, queue_wait_ms=round(waited * 1000), retries=attempt)
+                    call.publish((kind, field, value))
+                return
+            except RetryableError as e:
+                self.stats['throttled'] += 1
+                delay = max(e.retry_after or 0,
+                            random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt)))
+                if streamed or attempt >= self.max_retries or time.monotonic() + delay >= deadline:
+                    logger.error(f"Claude API {e.status}, giving up after {attempt} retries")
+                    break
+                attempt += 1
+                self.stats['retries'] += 1
+                logger.warning(f"Claude API {e.status}, retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                if cancel.wait(delay):
+                    self.stats['cancelled'] += 1
+                    return
+        self.stats['failed'] += 1
+        call.publish(('done', None, None))
+
+    # -------------------------------------------------------------------------
+    # Reporting
+    # -------------------------------------------------------------------------
+
+    def queue_depth(self) -> dict:
+        with self._cond:
+            waiting = list(self._waiting)
+        return {name: sum(1 for p, _ in waiting if p == value) for name, value in PRIORITIES.items()}
+
+    def snapshot(self) -> dict:
+        """Queue depth, recent wait percentiles, bucket levels and counters."""
+        waits = {}
+        for name, samples in self._waits.items():
+            ordered = sorted(samples)
+            if ordered:
+                waits[name] = {
+                    'p50_ms': round(ordered[len(ordered) // 2] * 1000),
+                    'p95_ms': round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)] * 1000),
+                    'max_ms': round(ordered[-1] * 1000),
+                }
+        now = time.monotonic()
+        buckets = {}
+        for name, bucket in (('requests', self.requests), ('input_tokens', self.input_tokens)):
+            if bucket:
+                bucket.wait_time(0, now)  # refill
+                buckets[name] = {'available': round(bucket.tokens), 'capacity': round(bucket.capacity)}
+        with self._inflight_lock:
+            inflight = len(self._inflight)
+        return dict(self.stats, queue_depth=self.queue_depth(), waits=waits, buckets=buckets, inflight=inflight)
@@ -10,15 +10,29 @@ Usage:
     result = extract_answer_with_claude_v2(query, documents, community)
     # Returns dict with: found, answer, confidence, quote, source, follow_ups
 
+    # Or per-document extraction in parallel, merged with conflict detection
+    result = extract_answer(query, documents, community, mode='map_reduce')
+
 Author: Claude
 Created: 2026-01-28
 """
 
 import re
 import json
+import time
 import logging
-import requests
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+
+try:
+    from src.claude_stream import stream_claude_json
+    from src.context_builder import build_compact_context
+    from src.passage_ranker import STOP_WORDS
+except ImportError:  # run as a script from src/
+    from claude_stream import stream_claude_json
+    from context_builder import build_compact_context
+    from passage_ranker import STOP_WORDS
 
 logger = logging.getLogger(__name__)
 
@@ -29,26 +43,22 @@ logger = logging.getLogger(__name__)
 ANTHROPIC_API_KEY = os.environ.get('ANTHROPIC_API_KEY', '')
 MODEL = "claude-3-5-haiku-20241022"  # Fast and cost-effective for extraction
 MAX_TOKENS = 800
-
-# Stop words to filter from keyword matching
-STOP_WORDS = {
-    'what', 'is', 'the', 'are', 'for', 'in', 'at', 'a', 'an', 'how', 'can',
-    'i', 'my', 'do', 'does', 'about', 'where', 'when', 'why', 'which', 'who',
-    'there', 'that', 'this', 'be', 'to', 'of', 'and', 'or', 'on', 'it'
-}
+CONTEXT_TOKEN_BUDGET = 1500  # document excerpts per extraction call
+# Map-reduce mode: one small call per document, run concurrently, then a short merge
+EXTRACTION_MODE = os.environ.get('EXTRACTION_MODE', 'single')  # 'single' or 'map_reduce'
+MAP_WORKERS = int(os.environ.get('EXTRACTION_MAP_WORKERS', 5))
+MAP_CONTEXT_TOKENS = 600
+MAP_MAX_TOKENS = 300
+# STOP_WORDS (keyword matching) live in src/passage_ranker.py, shared with the ranker
 
 # =============================================================================
 # OPTIMIZED EXTRACTION PROMPT
 # =============================================================================
 
-EXTRACTION_PROMPT_V2 = """You are an expert document analyst for PS Property Management.
+# Static instructions, sent as a cacheable system prefix (no per-request values)
+EXTRACTION_SYSTEM_V2 = """You are an expert document analyst for PS Property Management.
 A community manager needs a SPECIFIC answer from HOA documents.
-
-**QUESTION:** {query}
-**COMMUNITY:** {community}
-
-**DOCUMENTS PROVIDED:**
-{doc_context}
+The user message gives the QUESTION, the COMMUNITY and the most relevant excerpts of each DOCUMENT.
 
 ---
 
@@ -80,7 +90,7 @@ A community manager needs a SPECIFIC answer from HOA documents.
 
 Return ONLY this JSON structure, nothing else:
 
-{{
+{
     "found": true,
     "answer": "Direct answer starting with the key fact. 1-2 sentences max.",
     "confidence": "high",
@@ -90,11 +100,11 @@ Return ONLY this JSON structure, nothing else:
     "answer_type": "definitive",
     "related_info": "Optional additional context",
     "follow_up_questions": ["Related question 1", "Related question 2"]
-}}
+}
 
 If NOT found:
 
-{{
+{
     "found": false,
     "answer": "The specific information was not found in the available documents.",
     "confidence": "low",
@@ -104,7 +114,7 @@ If NOT found:
     "answer_type": "not_found",
     "related_info": "What WAS found that's related, if anything",
     "follow_up_questions": ["Alternative answerable question 1", "Alternative answerable question 2"]
-}}
+}
 
 ---
 
@@ -114,7 +124,7 @@ QUESTION: "What is the fence height limit?"
 DOCUMENT: "...Fences shall not exceed six (6) feet in height from natural grade..."
 
 CORRECT RESPONSE:
-{{
+{
     "found": true,
     "answer": "6 feet maximum height from natural grade.",
     "confidence": "high",
@@ -124,12 +134,19 @@ CORRECT RESPONSE:
     "answer_type": "definitive",
     "related_info": "Front yard fences may have additional restrictions.",
     "follow_up_questions": ["What fence materials are approved?", "Is ARC approval required?"]
-}}
+}
 
 ---
 
 Return ONLY the JSON. No markdown code blocks, no explanatory text."""
 
+# Per-request part of the prompt
+EXTRACTION_USER_V2 = """**QUESTION:** {query}
+**COMMUNITY:** {community}
+
+**DOCUMENTS PROVIDED:**
+{doc_context}"""
+
 
 # =============================================================================
 # FOLLOW-UP QUESTION SUGGESTIONS
@@ -303,10 +320,16 @@ def calculate_confidence_score(extraction_result, query, documents):
         return "low"
 
 
-def build_document_context(documents, max_chars_per_doc=3000):
+def build_document_context(documents, max_chars_per_doc=3000, query=None):
     """
     Build document context for the prompt, prioritizing relevant sections.
+    With a query, the best BM25-ranked passages across all documents are
+    used (see src/context_builder.py); without one, each document's
+    leading max_chars_per_doc characters.
     """
+    if query:
+        return build_compact_context(query, documents, token_budget=CONTEXT_TOKEN_BUDGET)[0]
+
     context_parts = []
 
     for i, doc in enumerate(documents[:5]):  # Top 5 docs
@@ -378,7 +401,7 @@ def generate_not_found_response(query, documents_searched, category=None):
 # MAIN EXTRACTION FUNCTION
 # =============================================================================
 
-def extract_answer_with_claude_v2(query, documents, community=None):
+def extract_answer_with_claude_v2(query, documents, community=None, on_field=None):
     """
     Enhanced answer extraction using Claude with confidence scoring and follow-ups.
 
@@ -386,6 +409,8 @@ def extract_answer_with_claude_v2(query, documents, community=None):
         query: The user's question
         documents: List of document dicts with 'title', 'content', 'url', etc.
         community: Optional community name for context
+        on_field: Optional callback(key, value), called as each field of
+                  Claude's streamed JSON reply completes ("answer" first)
 
     Returns:
         dict with: found, answer, confidence, quote, source_document, source_section,
@@ -400,87 +425,88 @@ def extract_answer_with_claude_v2(query, documents, community=None):
         return generate_not_found_response(query, [], detect_query_category(query))
 
     # Build document context
-    doc_context = build_document_context(documents)
+    doc_context, context_stats = build_compact_context(query, documents, token_budget=CONTEXT_TOKEN_BUDGET)
 
-    # Format the prompt
-    prompt = EXTRACTION_PROMPT_V2.format(
+    # Format the per-request part of the prompt
+    prompt = EXTRACTION_USER_V2.format(
         query=query,
         community=community or "Not specified",
         doc_context=doc_context
     )
 
-    try:
-        resp = requests.post(
-            "https://api.anthropic.com/v1/messages",
-            headers={
-                "x-api-key": ANTHROPIC_API_KEY,
-                "anthropic-version": "2023-06-01",
-                "content-type": "application/json"
-            },
-            json={
-                "model": MODEL,
-                "max_tokens": MAX_TOKENS,
-                "messages": [{"role": "user", "content": prompt}]
-            },
-            timeout=30
-        )
-
-        if resp.status_code != 200:
-            logger.error(f"Claude API failed: {resp.status_code} - {resp.text[:200]}")
-            return None
+    payload = {
+        "model": MODEL,
+        "max_tokens": MAX_TOKENS,
+        "system": [{"type": "text", "text": EXTRACTION_SYSTEM_V2, "cache_control": {"type": "ephemeral"}}],
+        "messages": [{"role": "user", "content": prompt}]
+    }
+    result = None
+    usage = {}
+    for kind, key, value in stream_claude_json(payload, ANTHROPIC_API_KEY, timeout=30):
+        if kind == 'field':
+            if on_field:
+                on_field(key, value)
+        elif kind == 'usage':
+            usage = value
+        else:
+            result = value
+    logger.info(f"Claude v2 usage: {usage} context={context_stats}")
+
+    if not isinstance(result, dict):
+        return None
 
-        content = resp.json()['content'][0]['text']
+    # Validate and enhance result
+    if not result.get('answer'):
+        result['answer'] = "No specific information found in the available documents."
+        result['found'] = False
 
-        # Parse JSON response
-        try:
-            # Find JSON in response (handles markdown code blocks)
-            json_match = re.search(r'\{[\s\S]*\}', content)
-            if json_match:
-                result = json.loads(json_match.group())
+    # Calculate confidence if not provided or validate existing
+    if 'confidence' not in result or result['confidence'] not in ['high', 'medium', 'low']:
+        result['confidence'] = calculate_confidence_score(result, query, documents)
 
-                # Validate and enhance result
-                if not result.get('answer'):
-                    result['answer'] = "No specific information found in the available documents."
-                    result['found'] = False
+    # Add follow-up questions if not provided
+    if 'follow_up_questions' not in result or not result['follow_up_questions']:
+        result['follow_up_questions'] = get_follow_up_questions(query)
 
-                # Calculate confidence if not provided or validate existing
-                if 'confidence' not in result or result['confidence'] not in ['high', 'medium', 'low']:
-                    result['confidence'] = calculate_confidence_score(result, query, documents)
+    # Ensure all expected fields exist
+    result.setdefault('found', False)
+    result.setdefault('quote', None)
+    result.setdefault('source_document', None)
+    result.setdefault('source_section', None)
+    result.setdefault('answer_type', 'definitive' if result.get('found') else 'not_found')
+    result.setdefault('related_info', None)
 
-                # Add follow-up questions if not provided
-                if 'follow_up_questions' not in result or not result['follow_up_questions']:
-                    result['follow_up_questions'] = get_follow_up_questions(query)
+    # Add extraction metadata
+    result['extraction_type'] = detect_query_category(query)
+    result['usage'] = usage
+    result['context'] = context_stats
 
-                # Ensure all expected fields exist
-                result.setdefault('found', False)
-                result.setdefault('quote', None)
-                result.setdefault('source_document', None)
-                result.setdefault('source_section', None)
-                result.setdefault('answer_type', 'definitive' if result.get('found') else 'not_found')
-                result.setdefault('related_info', None)
+    return result
 
-                # Add extraction metadata
-                result['extraction_type'] = detect_query_category(query)
 
-                return result
+# =============================================================================
+# MULTI-DOCUMENT SYNTHESIS (MAP-REDUCE)
+# =============================================================================
 
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse Claude JSON response: {e}")
-            logger.debug(f"Raw response: {content[:500]}")
+# Map step: what ONE document says (short output, cacheable instructions)
+MAP_SYSTEM = """You are reading ONE HOA document excerpt for a community manager's question.
+Report only what THIS excerpt states. NEVER infer or use general knowledge about HOAs.
 
-        return None
+Return ONLY this JSON, nothing else:
 
-    except requests.exceptions.Timeout:
-        logger.error("Claude API timeout")
-        return None
-    except Exception as e:
-        logger.error(f"Claude extraction failed: {e}")
-        return None
+{
+    "found": true,
+    "answer": "The fact that answers the question, number first, under 25 words (null if not found)",
+    "quote": "Exact supporting text from the excerpt, 5-30 words (null if not found)",
+    "source_section": "Article X.X or section name if shown, else null",
+    "effective_date": "Date or amendment the excerpt is from if stated, else null"
+}"""
 
+MAP_USER = """**QUESTION:** {query}
+**COMMUNITY:** {community}
 
-# =============================================================================
-# MULTI-DOCUMENT SYNTHESIS
-# =============================================================================
+**DOCUMENT:**
+{doc_context}"""
 
 SYNTHESIS_PROMPT = """You are synthesizing information from MULTIPLE HOA documents.
 
@@ -513,21 +539,142 @@ SYNTHESIS_PROMPT = """You are synthesizing information from MULTIPLE HOA documen
 
 Return ONLY JSON."""
 
+# A number with its unit: "$250", "6 feet", "6-foot", "2 pets", "10 pm", "15%"
+QUANTITY = re.compile(r'(\$)?(\d[\d,]*(?:\.\d+)?)(?:\s*-?\s*(%|[a-z]+))?', re.IGNORECASE)
+YEAR = re.compile(r'^(19|20)\d\d$')
+UNIT_ALIASES = {
+    'foot': 'ft', 'feet': 'ft', 'ft': 'ft',
+    'inch': 'in', 'inches': 'in',
+    'hour': 'hr', 'hours': 'hr', 'hrs': 'hr', 'hr': 'hr',
+    'minute': 'min', 'minutes': 'min', 'mins': 'min',
+    'percent': '%', '%': '%',
+    'a': 'am', 'p': 'pm',
+}
+# Words after a number that are not its unit ("6 to 8 feet", "2 or more")
+NOT_UNITS = {'and', 'or', 'to', 'of', 'per', 'the', 'in', 'at', 'for', 'from', 'through', 'than', 'x'}
+
+_map_executor = None
+
+
+def _get_map_executor():
+    global _map_executor
+    if _map_executor is None:
+        _map_executor = ThreadPoolExecutor(max_workers=MAP_WORKERS, thread_name_prefix='extract-map')
+    return _map_executor
+
 
-def synthesize_multiple_documents(query, documents, community=None):
+def _add_usage(total, usage):
+    for field in ('input_tokens', 'output_tokens', 'cache_read_input_tokens', 'cache_creation_input_tokens'):
+        if usage.get(field):
+            total[field] = total.get(field, 0) + usage[field]
+
+
+def extract_from_document(query, doc, community=None, timeout=20, cancel=None):
+    """
+    Map step: extract what a single document says about the question.
+    `cancel` (threading.Event) abandons the call once the caller has given
+    up on it. Returns (finding dict or None, usage dict).
+    """
+    if cancel is not None and cancel.is_set():
+        return None, {}
+    doc_context, _ = build_compact_context(query, [doc], token_budget=MAP_CONTEXT_TOKENS, max_documents=1)
+    payload = {
+        "model": MODEL,
+        "max_tokens": MAP_MAX_TOKENS,
+        "system": [{"type": "text", "text": MAP_SYSTEM, "cache_control": {"type": "ephemeral"}}],
+        "messages": [{"role": "user", "content": MAP_USER.format(
+            query=query, community=community or "Not specified", doc_context=doc_context)}]
+    }
+    result, usage = None, {}
+    for kind, _, value in stream_claude_json(payload, ANTHROPIC_API_KEY, timeout=timeout, cancel=cancel):
+        if cancel is not None and cancel.is_set():
+            # Closing the generator closes the HTTP stream and frees the map worker
+            return None, usage
+        if kind == 'usage':
+            usage = value
+        elif kind == 'done':
+            result = value
+    if not isinstance(result, dict):
+        return None, usage
+    result['source_document'] = doc.get('title', 'Unknown')
+    result['is_archived'] = bool(doc.get('is_archived'))
+    return result, usage
+
+
+def answer_quantities(answer):
+    """
+    {unit: frozenset(values)} for the numbers in an answer ("6 feet" ->
+    {'ft': {'6'}}, "$250" -> {'$': {'250'}}). Years are left out; a number
+    without a unit is keyed by ''.
+    """
+    quantities = {}
+    for dollar, number, word in QUANTITY.findall(answer or ''):
+        number = number.replace(',', '')
+        if YEAR.match(number) and not dollar:
+            continue
+        word = word.lower()
+        if dollar:
+            unit = '$'
+        elif not word or word in NOT_UNITS:
+            unit = ''
+        else:
+            unit = UNIT_ALIASES.get(word) or (word[:-1] if word.endswith('s') and len(word) > 3 else word)
+        quantities.setdefault(unit, set()).add(number)
+    return {unit: frozenset(values) for unit, values in quantities.items()}
+
+
+def _format_quantity(unit, value):
+    return f"${value}" if unit == '$' else f"{value} {unit}".strip()
+
+
+def detect_conflicts(findings):
+    """
+    Findings (found=True) that state different numbers for the same unit -
+    e.g. a 6 ft limit in the CC&Rs and 8 ft in an amendment. Numbers with
+    different units ("2 pets", "6 ft") are different facts, not a conflict.
+    Archived documents are ignored when a current one answers.
+    Returns [(value set, document), ...] or [].
+    """
+    current = [f for f in findings if not f.get('is_archived')] or findings
+    quantities = [(answer_quantities(f.get('answer')), f['source_document']) for f in current]
+    units = {unit for found, _ in quantities for unit in found}
+    conflicting = {unit for unit in units if len({found[unit] for found, _ in quantities if unit in found}) > 1}
+    values = []
+    for found, document in quantities:
+        stated = frozenset(_format_quantity(unit, v) for unit in conflicting & found.keys() for v in found[unit])
+        if stated:
+            values.append((stated, document))
+    return values
+
+
+def synthesize_multiple_documents(query, documents, community=None, findings=None, conflicts=None,
+                                  on_field=None, timeout=30):
     """
     Synthesize answers from multiple documents that all contain relevant info.
-    Use when 2+ documents have matching content.
+    Use when 2+ documents have matching content. With `findings` (map-step
+    results) the prompt carries those short per-document answers instead of
+    raw content, which keeps the reduce call small.
+    Returns (result dict or None, usage dict).
     """
-    if not ANTHROPIC_API_KEY or len(documents) < 2:
-        return None
+    if not ANTHROPIC_API_KEY or len(findings or documents) < 2:
+        return None, {}
 
     # Build summaries of each document
     doc_summaries = []
-    for i, doc in enumerate(documents[:5]):
-        title = doc.get('title', 'Unknown')
-        content = doc.get('content', '')[:2000]
-        doc_summaries.append(f"[{i+1}] {title}\n{content}\n")
+    if findings:
+        for i, f in enumerate(findings):
+            archived = ' [ARCHIVED - may be outdated]' if f.get('is_archived') else ''
+            doc_summaries.append(
+                f"[{i+1}] {f['source_document']}{archived}\nAnswer: {f.get('answer')}\nQuote: {f.get('quote')}\n"
+                f"Section: {f.get('source_section')}\nDate: {f.get('effective_date')}\n")
+        if conflicts:
+            doc_summaries.append("NOTE: these documents state different values: "
+                                 + '; '.join(f"{doc}: {', '.join(sorted(v))}" for v, doc in conflicts))
+    else:
+        for i, doc in enumerate(documents[:5]):
+            title = doc.get('title', 'Unknown')
+            content = doc.get('content', '')[:2000]
+            doc_summaries.append(f"[{i+1}] {title}\n{content}\n")
 
     prompt = SYNTHESIS_PROMPT.format(
         query=query,
@@ -535,33 +682,146 @@ def synthesize_multiple_documents(query, documents, community=None):
         doc_summaries='\n'.join(doc_summaries)
     )
 
-    try:
-        resp = requests.post(
-            "https://api.anthropic.com/v1/messages",
-            headers={
-                "x-api-key": ANTHROPIC_API_KEY,
-                "anthropic-version": "2023-06-01",
-                "content-type": "application/json"
-            },
-            json={
-                "model": MODEL,
-                "max_tokens": MAX_TOKENS,
-                "messages": [{"role": "user", "content": prompt}]
-            },
-            timeout=30
-        )
-
-        if resp.status_code == 200:
-            content = resp.json()['content'][0]['text']
-            json_match = re.search(r'\{[\s\S]*\}', content)
-            if json_match:
-                return json.loads(json_match.group())
+    payload = {
+        "model": MODEL,
+        "max_tokens": MAX_TOKENS,
+        "messages": [{"role": "user", "content": prompt}]
+    }
+    result, usage = None, {}
+    for kind, key, value in stream_claude_json(payload, ANTHROPIC_API_KEY, timeout=timeout):
+        if kind == 'field':
+            if on_field:
+                on_field(key, value)
+        elif kind == 'usage':
+            usage = value
+        else:
+            result = value
+    return (result if isinstance(result, dict) else None), usage
 
-        return None
 
-    except Exception as e:
-        logger.error(f"Document synthesis failed: {e}")
+def extract_answer_map_reduce(query, documents, community=None, on_field=None, timeout=30):
+    """
+    Map-reduce extraction: one small extraction per document, run
+    concurrently on a bounded pool, then a merge. The merge is local when
+    zero, one, or agreeing documents answer; only disagreeing or
+    complementary findings go to a short synthesis call. Latency is the
+    slowest map call plus (at most) one reduce call, instead of one prompt
+    over all five documents.
+
+    Returns the extract_answer_with_claude_v2 fields plus sources,
+    conflicts_found, conflict_note, mode='map_reduce' and timings, or None.
+    """
+    if not ANTHROPIC_API_KEY:
+        logger.warning("ANTHROPIC_API_KEY not set")
         return None
+    documents = documents[:5]
+    if not documents:
+        return generate_not_found_response(query, [], detect_query_category(query))
+
+    start = time.monotonic()
+    deadline = start + timeout
+    usage = {}
+    executor = _get_map_executor()
+    cancel = threading.Event()
+    futures = [executor.submit(extract_from_document, query, doc, community, timeout, cancel)
+               for doc in documents]
+    findings = []
+    for future in futures:  # document order = search rank order
+        try:
+            finding, call_usage = future.result(timeout=max(deadline - time.monotonic(), 0))
+        except FuturesTimeoutError:
+            logger.warning("Map extraction timed out")
+            continue
+        except Exception as e:
+            logger.error(f"Map extraction failed: {e}")
+            continue
+        _add_usage(usage, call_usage)
+        if finding and finding.get('found') and finding.get('answer'):
+            findings.append(finding)
+    # Timed-out calls would keep holding shared map workers: drop queued ones, stop running ones
+    cancel.set()
+    for future in futures:
+        future.cancel()
+    map_ms = round((time.monotonic() - start) * 1000)
+
+    if not findings:
+        usage['latency_ms'] = map_ms
+        return dict(generate_not_found_response(query, documents), mode='map_reduce',
+                    extraction_type=detect_query_category(query), usage=usage,
+                    timings={'map_ms': map_ms, 'reduce_ms': 0})
+
+    conflicts = detect_conflicts(findings)
+    reduce_start = time.monotonic()
+    current = [f for f in findings if not f.get('is_archived')] or findings
+    agreeing = not conflicts and len({(f.get('answer') or '').strip().lower() for f in current}) == 1
+    # Same value for a unit every answer states (a year alone, or unrelated units, is not agreement)
+    stated = [set(answer_quantities(f.get('answer'))) - {''} for f in current]
+    numeric_agree = not conflicts and bool(set.intersection(*stated))
+
+    if len(current) == 1 or agreeing or numeric_agree:
+        # Local reduce: the top-ranked current document's answer, corroborated by the rest
+        best = current[0]
+        result = {
+            'found': True,
+            'answer': best['answer'],
+            'confidence': 'high' if len(current) > 1 else calculate_confidence_score(best, query, documents),
+            'quote': best.get('quote'),
+            'source_document': best['source_document'],
+            'source_section': best.get('source_section'),
+            'sources': [{'document': f['source_document'], 'contribution': f['answer'], 'quote': f.get('quote')}
+                        for f in current],
+            'conflicts_found': False,
+            'conflict_note': None,
+        }
+        if on_field:
+            on_field('answer', result['answer'])
+    else:
+        merged, reduce_usage = synthesize_multiple_documents(
+            query, documents, community, findings=findings, conflicts=conflicts, on_field=on_field,
+            timeout=max(deadline - time.monotonic(), 1))
+        _add_usage(usage, reduce_usage)
+        if not merged:
+            return None
+        # Cite the document the merged answer credits first
+        cited = [s.get('document') for s in merged.get('sources') or [] if isinstance(s, dict)]
+        best = next((f for doc in cited for f in findings if f['source_document'] == doc), current[0])
+        result = dict(merged, quote=best.get('quote'), source_document=best['source_document'],
+                      source_section=best.get('source_section'))
+        if conflicts and not result.get('conflicts_found'):
+            result['conflicts_found'] = True
+            result['conflict_note'] = 'Documents state different values: ' + '; '.join(
+                f"{doc}: {', '.join(sorted(v))}" for v, doc in conflicts)
+    reduce_ms = round((time.monotonic() - reduce_start) * 1000)
+
+    if result.get('confidence') not in ('high', 'medium', 'low'):
+        result['confidence'] = calculate_confidence_score(result, query, documents)
+    if result.get('conflicts_found') and result['confidence'] == 'high':
+        result['confidence'] = 'medium'
+    if not result.get('follow_up_questions'):
+        result['follow_up_questions'] = get_follow_up_questions(query)
+    result.setdefault('related_info', None)
+    result['answer_type'] = 'definitive'
+    result['extraction_type'] = detect_query_category(query)
+    result['mode'] = 'map_reduce'
+    usage['latency_ms'] = map_ms + reduce_ms
+    result['usage'] = usage
+    result['timings'] = {'map_ms': map_ms, 'reduce_ms': reduce_ms, 'documents': len(documents),
+                         'answering': len(findings)}
+    logger.info(f"Map-reduce extraction: {len(findings)}/{len(documents)} documents answered, "
+                f"map={map_ms}ms reduce={reduce_ms}ms conflicts={bool(result.get('conflicts_found'))}")
+    return result
+
+
+def extract_answer(query, documents, community=None, on_field=None, mode=None):
+    """
+    Extraction entry point. mode (default EXTRACTION_MODE env var):
+    'single' - one prompt over the top documents (extract_answer_with_claude_v2)
+    'map_reduce' - concurrent per-document extraction plus a merge
+    """
+    mode = mode or EXTRACTION_MODE
+    if mode == 'map_reduce':
+        return extract_answer_map_reduce(query, documents, community, on_field=on_field)
+    return extract_answer_with_claude_v2(query, documents, community, on_field=on_field)
 
 
 # =============================================================================
@@ -0,0 +1,132 @@
+"""
+Local BM25 passage ranking for Manager Wizard's extraction prompts.
+
+Provides:
+- Shared tokenization for query/passage matching: lowercase words, a crude
+  suffix stemmer, and STOP_WORDS (question words plus HOA boilerplate terms
+  that appear in every governing document)
+- split_sentences(): sentence / list-item segmentation of chunk text
+- rank_windows(): BM25 (k1=1.2, b=0.75) over sliding windows of consecutive
+  sentences from all retrieved documents, so the passage that answers the
+  question scores highest wherever it sits in the chunk - including balances
+  "deep in the doc" that a first-N-characters cut would drop
+
+Pure Python, no index to build: five chunks of a few thousand characters
+rank in well under a millisecond per query.
+"""
+
+import re
+import math
+from collections import Counter
+from typing import List, NamedTuple
+
+# Question words and fillers (shared with src/optimized_extraction.py)
+STOP_WORDS = {
+    'what', 'is', 'the', 'are', 'for', 'in', 'at', 'a', 'an', 'how', 'can',
+    'i', 'my', 'do', 'does', 'about', 'where', 'when', 'why', 'which', 'who',
+    'there', 'that', 'this', 'be', 'to', 'of', 'and', 'or', 'on', 'it'
+}
+# Present in nearly every governing document, so they carry no ranking signal
+DOMAIN_STOP_WORDS = {
+    'we', 'our', 'any', 'with', 'from', 'by', 'as', 'if', 'allowed', 'rules', 'rule',
+    'policy', 'hoa', 'community',
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+WINDOW_SENTENCES = 2
+MAX_SENTENCE_CHARS = 600
+
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?;])\s+(?=[A-Z0-9(\"])|\n\s*\n|\n(?=\s*(?:[-*•]|\d+[.)]|[A-Z][A-Z ]{3,}:?\s*$))')
+WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+WHITESPACE = re.compile(r'\s+')
+
+
+class Passage(NamedTuple):
+    score: float
+    doc: int          # index into the documents list
+    start: int        # first sentence index within that document
+    sentences: tuple  # sentence texts
+
+
+def stem(word: str) -> str:
+    """Crude suffix strip so 'fences'/'fencing'/'fence' all become 'fenc'."""
+    if len(word) > 4 and word.endswith('s') and not word.endswith('ss'):
+        word = word[:-1]
+    for suffix in ('ing', 'ed'):
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            word = word[:-len(suffix)]
+            break
+    if len(word) > 4 and word.endswith('e'):
+        word = word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    return [stem(w) for w in WORD.findall(text.lower())]
+
+
+def query_terms(query: str) -> List[str]:
+    """Stemmed, de-duplicated content words of the question."""
+    terms = []
+    for word in WORD.findall(query.lower()):
+        if word in STOP_WORDS or word in DOMAIN_STOP_WORDS or len(word) < 3:
+            continue
+        term = stem(word)
+        if term not in terms:
+            terms.append(term)
+    return terms
+
+
+def split_sentences(text: str) -> List[str]:
+    """Sentences / list items of a chunk, whitespace-collapsed, long ones clipped."""
+    sentences = []
+    for part in SENTENCE_SPLIT.split(text or ''):
+        part = WHITESPACE.sub(' ', part).strip()
+        if len(part) < 12:
+            continue
+        if len(part) > MAX_SENTENCE_CHARS:
+            part = part[:MAX_SENTENCE_CHARS].rsplit(' ', 1)[0] + '...'
+        sentences.append(part)
+    return sentences
+
+
+def rank_windows(terms: List[str], doc_sentences: List[List[str]], window: int = WINDOW_SENTENCES,
+                 boost=None) -> List[Passage]:
+    """
+    Score every window of `window` consecutive sentences (per document) with
+    BM25 against the query terms. `boost(text)` may return a multiplier
+    (e.g. favour windows with numbers for numeric questions).
+    Returns passages with a positive score, best first.
+    """
+    windows = []
+    for d, sentences in enumerate(doc_sentences):
+        tokenized = [tokenize(s) for s in sentences]
+        for start in range(max(len(sentences) - window + 1, 1 if sentences else 0)):
+            tokens = [t for toks in tokenized[start:start + window] for t in toks]
+            windows.append((d, start, tuple(sentences[start:start + window]), Counter(tokens), len(tokens)))
+    if not windows or not terms:
+        return []
+
+    n = len(windows)
+    avg_len = sum(w[4] for w in windows) / n or 1.0
+    idf = {}
+    for term in terms:
+        df = sum(1 for w in windows if term in w[3])
+        idf[term] = math.log((n - df + 0.5) / (df + 0.5) + 1.0) if df else 0.0
+
+    passages = []
+    for d, start, sentences, tf, length in windows:
+        score = 0.0
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_len)
+        for term in terms:
+            f = tf.get(term)
+            if f:
+                score += idf[term] * f * (BM25_K1 + 1) / (f + norm)
+        if score <= 0:
+            continue
+        if boost:
+            score *= boost(' '.join(sentences))
+        passages.append(Passage(score, d, start, sentences))
+    passages.sort(key=lambda p: (-p.score, p.doc, p.start))
+    return passages
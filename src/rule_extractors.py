@@ -0,0 +1,184 @@
+"""
+Deterministic fast-path answers for numeric policy questions.
+
+Questions like "fence height Avalon" or "pool hours" are answered by a
+plain pattern in the chunk text ("shall not exceed six (6) feet",
+"8:00 a.m. to 10:00 p.m."). Each rule below belongs to one extraction type
+(fence, pool, pet, parking), fires only when the question asks for what the
+rule extracts, and scans the retrieved documents sentence by sentence with
+precompiled patterns. A match comes back in the same shape as the Claude
+extraction, with the sentence as the quote - in well under a millisecond.
+
+A rule only answers when it is unambiguous: if current (non-archived)
+documents yield different values (front vs rear fence heights, two sets of
+pool hours) it returns None and the caller falls back to Claude.
+
+Usage:
+    from src.rule_extractors import extract_rule_answer
+
+    ai_answer = extract_rule_answer(query, documents, extraction_type)
+    if ai_answer is None:
+        ...                         # no rule matched - ask Claude
+"""
+
+import re
+import time
+from typing import NamedTuple, Optional, Pattern
+
+try:
+    from src.passage_ranker import split_sentences
+except ImportError:  # run as a script from src/
+    from passage_ranker import split_sentences
+
+NUMBER_WORDS = {
+    'one': '1', 'two': '2', 'three': '3', 'four': '4', 'five': '5', 'six': '6', 'seven': '7',
+    'eight': '8', 'nine': '9', 'ten': '10', 'eleven': '11', 'twelve': '12', 'fifteen': '15',
+    'twenty': '20', 'twenty-four': '24', 'thirty': '30', 'forty-eight': '48', 'seventy-two': '72',
+}
+
+# "six (6)", "6", "6.5" or "six"
+NUM = (r"(?:[a-z]+(?:-[a-z]+)?\s*\(\d+(?:\.\d+)?\)|\d+(?:\.\d+)?|(?:"
+       + '|'.join(sorted(NUMBER_WORDS, key=len, reverse=True)) + r")\b)")
+TIME = r"(?:\d{1,2}(?::\d{2})?\s*(?:a\.?\s?m\.?|p\.?\s?m\.?)|noon|midnight)"
+FEET = r"(?:feet|foot|ft\b\.?|')"
+# "dogs", "dogs or cats", "dogs, cats and/or birds" - the whole list, so no species is dropped
+PET_KIND = r"(?:pets|animals|dogs|cats|birds|rabbits)\b"
+PET_KINDS = PET_KIND + r"(?:\s*(?:,|,?\s*and/or|,?\s*and|,?\s*or)\s+(?:household\s+)?" + PET_KIND + r")*"
+
+WORD_WITH_DIGITS = re.compile(r"\b[a-z]+(?:-[a-z]+)?\s*\((\d+(?:\.\d+)?)\)", re.I)
+NUMBER_WORD = re.compile(r"\b(" + '|'.join(sorted(NUMBER_WORDS, key=len, reverse=True)) + r")\b", re.I)
+AM_PM = re.compile(r"\b([ap])\.?\s?m\b\.?", re.I)
+WHITESPACE = re.compile(r'\s+')
+
+
+class Rule(NamedTuple):
+    name: str
+    extraction_type: str
+    trigger: Pattern   # the question asks for this value
+    context: Pattern   # the sentence is about the right subject
+    pattern: Pattern   # the value itself (named groups)
+    answer: str        # format string over the normalized named groups
+    subject: Optional[Pattern] = None   # the question must also name the subject
+    exclude: Optional[Pattern] = None   # sentences about something else that looks alike
+
+
+def _rule(name, extraction_type, trigger, context, pattern, answer, subject=None, exclude=None):
+    return Rule(name, extraction_type, re.compile(trigger, re.I), re.compile(context, re.I),
+                re.compile(pattern, re.I), answer,
+                re.compile(subject, re.I) if subject else None, re.compile(exclude, re.I) if exclude else None)
+
+
+RULES = [
+    _rule('fence_height', 'fence',
+          r'\b(height|tall|high|feet|ft|how big)\b',
+          r'\b(fenc\w*|walls?)\b',
+          r"(?:exceed|maximum(?:\s+height)?\s+of|max(?:imum)?\.?|(?:not|no)\s+(?:be\s+)?(?:more|higher|taller|greater)"
+          r"\s+than|in\s+excess\s+of|height\s+of|up\s+to|limited\s+to)\s+(?P<height>" + NUM + r")\s*" + FEET,
+          '{height} feet maximum height'),
+    _rule('fence_height', 'fence',
+          r'\b(height|tall|high|feet|ft|how big)\b',
+          r'\b(fenc\w*|walls?)\b',
+          r"(?P<height>" + NUM + r")[\s-]*" + FEET + r"\s*(?:in\s+height\s*)?(?:maximum|max\b|or\s+less|high\s+maximum)",
+          '{height} feet maximum height'),
+    _rule('pool_hours', 'pool',
+          r'\b(hours?|open\w*|clos\w*|times?|when)\b',
+          r'\b(pools?|swim\w*)\b',
+          r"(?P<open>" + TIME + r"|dawn|sunrise)\s*(?:to|until|till|through|-|–|—)\s*"
+          r"(?P<close>" + TIME + r"|dusk|sunset)",
+          'Pool hours: {open} to {close}',
+          subject=r'\b(pools?|swim\w*)\b',
+          exclude=r'\b(quiet|office|gate|business|construction|clubhouse)\s+hours\b'),
+    _rule('pet_count', 'pet',
+          r'\b(how many|number|limit|max\w*|more than)\b',
+          r'\b(pets?|animals?|dogs?|cats?)\b',
+          r"(?:no\s+more\s+than|not\s+(?:to\s+)?exceed|maximum\s+of|max(?:imum)?\.?|up\s+to|limited\s+to|limit\s+of)"
+          r"\s+(?P<count>" + NUM + r")\s+(?:\w+\s+){0,2}?(?P<kind>" + PET_KINDS + r")",
+          '{count} {kind} maximum per household'),
+    _rule('pet_weight', 'pet',
+          r'\b(weigh\w*|lbs?|pounds?|size|big|large)\b',
+          r'\b(pets?|animals?|dogs?)\b',
+          r"(?P<weight>\d+)\s*(?:lbs?\b\.?|pounds)",
+          '{weight} lb weight limit'),
+    _rule('parking_time_limit', 'parking',
+          r'\b(how long|hours?|days?|overnight|limit|time)\b',
+          r'\b(park\w*|vehicles?)\b',
+          r"(?:more\s+than|longer\s+than|exceed(?:ing)?|in\s+excess\s+of|maximum\s+of)\s+(?P<limit>" + NUM
+          + r"\s*(?:consecutive\s+)?(?:hours?|days?))",
+          'Vehicles may not be parked for more than {limit}'),
+]
+
+RULES_BY_TYPE = {}
+for _r in RULES:
+    RULES_BY_TYPE.setdefault(_r.extraction_type, []).append(_r)
+
+
+def normalize_value(text: str) -> str:
+    """'six (6) feet' -> '6 feet', 'seven' -> '7', '10:00 p.m.' -> '10:00 PM'."""
+    text = WORD_WITH_DIGITS.sub(r'\1', text)
+    text = NUMBER_WORD.sub(lambda m: NUMBER_WORDS[m.group(1).lower()], text)
+    text = AM_PM.sub(lambda m: m.group(1).upper() + 'M', text)
+    return WHITESPACE.sub(' ', text).strip()
+
+
+def _find(rule: Rule, sentence: str) -> Optional[str]:
+    if not rule.context.search(sentence):
+        return None
+    if rule.exclude and rule.exclude.search(sentence):
+        return None
+    match = rule.pattern.search(sentence)
+    if not match:
+        return None
+    values = {k: normalize_value(v) for k, v in match.groupdict().items() if v}
+    return rule.answer.format(**values)
+
+
+def extract_rule_answer(query: str, documents: list, extraction_type: str) -> Optional[dict]:
+    """
+    Answer `query` from the documents' text with the rules for
+    `extraction_type`. Returns an ai_answer dict (extracted, extraction_type,
+    method='rules', rule, latency_ms) or None when no rule matches or the
+    documents disagree.
+    """
+    rules = [r for r in RULES_BY_TYPE.get(extraction_type, ())
+             if r.trigger.search(query) and (r.subject is None or r.subject.search(query))]
+    if not rules or not documents:
+        return None
+    start = time.perf_counter()
+
+    # (answer, rule, document, sentence) for every match, current documents before archived ones
+    matches = []
+    for doc in sorted(documents, key=lambda d: bool(d.get('is_archived'))):
+        for sentence in split_sentences(doc.get('content', '')):
+            for rule in rules:
+                answer = _find(rule, sentence)
+                if answer:
+                    matches.append((answer, rule, doc, sentence))
+    if not matches:
+        return None
+
+    current = [m for m in matches if not m[2].get('is_archived')] or matches
+    if len({m[0] for m in current}) > 1:
+        return None  # conflicting values - let Claude reconcile them
+
+    answer, rule, doc, sentence = current[0]
+    title = doc.get('title', 'Unknown Document')
+    documents_found = []
+    for m in current:
+        if m[2].get('title') not in documents_found:
+            documents_found.append(m[2].get('title'))
+    return {
+        'extracted': {
+            'answer': answer,
+            'source': title,
+            'quote': sentence,
+            'summary': f"{answer}, per {title}.",
+            'documents_found': documents_found,
+            'category': extraction_type,
+            'from_archive': bool(doc.get('is_archived')),
+            'confidence': 'high',
+        },
+        'extraction_type': extraction_type,
+        'method': 'rules',
+        'rule': rule.name,
+        'latency_ms': round((time.perf_counter() - start) * 1000, 2),
+    }
@@ -0,0 +1,188 @@
+"""
+Server-side PDF first-page thumbnails and text previews for Manager Wizard.
+
+Provides:
+- First-page PNG rendering (fixed width) and a short first-page text preview
+- A disk store keyed by SharePoint path + Graph eTag, with one JSON sidecar
+  per entry (text preview, page count, image size)
+- Negative entries for PDFs that are not rendered (e.g. too large to
+  download), so they are not queued again on every search
+- Entry-count bounded eviction (oldest first) from an in-memory index of
+  the entries, built with one directory scan on the first write
+
+Rendering uses pypdfium2 (Apache-2.0/BSD-3 PDFium bindings) with Pillow
+for PNG encoding. Without them HAS_RENDERER is False, the store still serves
+previously rendered entries, render_first_page() returns None, and the UI
+renders previews with PDF.js in the browser.
+"""
+
+import io
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pypdfium2 as pdfium
+    import PIL.Image  # noqa: F401 - needed by pypdfium2's to_pil()
+    HAS_RENDERER = True
+except ImportError:
+    pdfium = None
+    HAS_RENDERER = False
+
+THUMBNAIL_WIDTH = 500
+PREVIEW_TEXT_CHARS = 600
+
+
+def render_first_page(pdf_path: str, width: int = THUMBNAIL_WIDTH,
+                      text_chars: int = PREVIEW_TEXT_CHARS) -> Optional[dict]:
+    """
+    Render page 1 of a PDF file to PNG bytes and extract its leading text.
+    Returns {'png', 'text', 'pages', 'width', 'height'} or None.
+    PDFium is not thread-safe: callers must not render from two threads at once.
+    """
+    if not HAS_RENDERER:
+        return None
+    doc = None
+    try:
+        doc = pdfium.PdfDocument(pdf_path)
+        if len(doc) == 0:
+            return None
+        page = doc[0]
+        page_width = page.get_width()
+        scale = width / page_width if page_width else 1.0
+        image = page.render(scale=scale).to_pil()
+        text = ' '.join(page.get_textpage().get_text_range().split())[:text_chars]
+        png = io.BytesIO()
+        image.save(png, format='PNG', optimize=True)
+        return {
+            'png': png.getvalue(),
+            'text': text,
+            'pages': len(doc),
+            'width': image.width,
+            'height': image.height,
+        }
+    except Exception as e:
+        logger.warning(f"Thumbnail render failed for {pdf_path}: {e}")
+        return None
+    finally:
+        if doc is not None:
+            doc.close()
+
+
+class ThumbnailStore:
+    """Rendered first-page images and text previews on local disk."""
+
+    def __init__(self, store_dir: str, max_entries: int = 5000):
+        self.store_dir = store_dir
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._index: Optional['OrderedDict[str, float]'] = None  # key -> written at, oldest first
+        os.makedirs(store_dir, exist_ok=True)
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return hashlib.sha256(path.encode('utf-8')).hexdigest()
+
+    def image_path(self, path: str) -> str:
+        return os.path.join(self.store_dir, f'{self._key(path)}.png')
+
+    def _meta_path(self, path: str) -> str:
+        return os.path.join(self.store_dir, f'{self._key(path)}.json')
+
+    def get(self, path: str) -> Optional[dict]:
+        """
+        Return stored metadata (path, etag, text, pages, width, height) or None.
+        A negative entry has 'skipped' (the reason) and no image or text.
+        """
+        try:
+            with open(self._meta_path(path)) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not meta.get('skipped') and not os.path.exists(self.image_path(path)):
+            return None
+        return meta
+
+    def _write_meta(self, path: str, meta: dict) -> None:
+        tmp = self._meta_path(path) + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._meta_path(path))
+
+    def touch(self, path: str) -> None:
+        """Mark an entry as checked now (its eTag is unchanged) so it is not re-queued for a day."""
+        with self._lock:
+            meta = self.get(path)
+            if not meta:
+                return
+            meta['rendered_at'] = time.time()
+            self._write_meta(path, meta)
+
+    def put_skipped(self, path: str, etag: str, reason: str) -> dict:
+        """Record that a path/eTag will not be rendered (e.g. 'too_large')."""
+        meta = {'path': path, 'etag': etag, 'skipped': reason, 'rendered_at': time.time()}
+        with self._lock:
+            try:
+                os.remove(self.image_path(path))
+            except OSError:
+                pass
+            self._write_meta(path, meta)
+            index = self._load_index()
+            index[self._key(path)] = meta['rendered_at']
+            index.move_to_end(self._key(path))
+            self._evict(index)
+        return meta
+
+    def put(self, path: str, etag: str, rendered: dict) -> dict:
+        """Store a render_first_page() result for a path/eTag."""
+        meta = {
+            'path': path,
+            'etag': etag,
+            'text': rendered['text'],
+            'pages': rendered['pages'],
+            'width': rendered['width'],
+            'height': rendered['height'],
+            'rendered_at': time.time(),
+        }
+        with self._lock:
+            tmp = self.image_path(path) + '.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(rendered['png'])
+            os.replace(tmp, self.image_path(path))
+            self._write_meta(path, meta)
+            index = self._load_index()
+            index[self._key(path)] = meta['rendered_at']
+            index.move_to_end(self._key(path))
+            self._evict(index)
+        return meta
+
+    def _load_index(self) -> 'OrderedDict[str, float]':
+        """Stored entries oldest first, scanned from disk once (lock held)."""
+        if self._index is None:
+            entries = []
+            for name in os.listdir(self.store_dir):
+                if name.endswith('.json'):
+                    try:
+                        entries.append((os.path.getmtime(os.path.join(self.store_dir, name)), name[:-5]))
+                    except OSError:
+                        pass
+            entries.sort()
+            self._index = OrderedDict((key, mtime) for mtime, key in entries)
+        return self._index
+
+    def _evict(self, index: 'OrderedDict[str, float]') -> None:
+        """Drop the oldest renders beyond max_entries (lock held)."""
+        while len(index) > self.max_entries:
+            key, _ = index.popitem(last=False)
+            for suffix in ('.json', '.png'):
+                try:
+                    os.remove(os.path.join(self.store_dir, key + suffix))
+                except OSError:
+                    pass
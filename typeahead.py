@@ -0,0 +1,188 @@
+"""
+In-process typeahead engine for Manager Wizard /api/suggest.
+
+Provides:
+- Word-prefix lookup over owner names, property addresses and association
+  names using sorted key arrays and bisect (no Dataverse round trip)
+- Popularity ranking from search analytics counts, credited to every value
+  a searched string is a word prefix of ("smi" boosts "Smith, John")
+- Precomputed top results for short prefixes, where ranges are widest
+
+Every word start of a value is indexed ("Smith, John" is reachable from
+"smi" and "joh"), which covers what the old contains() filters were used
+for while keeping each lookup to a bisect plus a bounded scan.
+"""
+
+import re
+import time
+import heapq
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+SUGGESTION_TYPES = ('person', 'address', 'community')
+
+# Suggestions returned per type (same caps the Dataverse path used)
+TYPE_LIMITS = {'person': 5, 'address': 4, 'community': 3}
+
+# Word starts indexed per value (long legal names don't need every word)
+MAX_WORDS_PER_VALUE = 6
+
+# Prefixes up to this length get their top results precomputed at build time
+PRECOMPUTED_PREFIX_LEN = 3
+
+# Upper bound on keys scanned for a longer prefix (keeps worst case bounded)
+MAX_SCAN = 5000
+
+# Searched strings shorter than this are too unspecific to credit popularity
+MIN_POPULAR_QUERY_LEN = 3
+
+_WORD_START_RE = re.compile(r'(?<![a-z0-9])[a-z0-9#]')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize_key(text: str) -> str:
+    """Lowercase, drop commas ("Smith, John" -> "smith john") and collapse whitespace."""
+    return _SPACE_RE.sub(' ', (text or '').lower().replace(',', ' ')).strip()
+
+
+class _PrefixTable:
+    """Sorted word-start keys for one suggestion type, ranked by popularity."""
+
+    def __init__(self):
+        self.keys: List[str] = []
+        self.entry_ids: List[int] = []
+        self.top_by_prefix: Dict[str, List[int]] = {}
+
+    def index(self, entries: List[dict]) -> None:
+        """Index every word start of each entry's key."""
+        pairs = []
+        for entry_id, entry in enumerate(entries):
+            key = entry['key']
+            for n, match in enumerate(_WORD_START_RE.finditer(key)):
+                if n >= MAX_WORDS_PER_VALUE:
+                    break
+                pairs.append((key[match.start():], entry_id))
+        pairs.sort()
+        self.keys = [k for k, _ in pairs]
+        self.entry_ids = [e for _, e in pairs]
+
+    def rank(self, entries: List[dict], limit: int) -> None:
+        """Precompute top entries for short prefixes (call after index() and ranking)."""
+        # Short prefixes match thousands of keys - rank them once here
+        candidates: Dict[str, set] = {}
+        for key, entry_id in zip(self.keys, self.entry_ids):
+            for length in range(1, min(PRECOMPUTED_PREFIX_LEN, len(key)) + 1):
+                candidates.setdefault(key[:length], set()).add(entry_id)
+        self.top_by_prefix = {
+            prefix: heapq.nsmallest(limit, ids, key=lambda i: entries[i]['rank'])
+            for prefix, ids in candidates.items()
+        }
+
+    def matching(self, prefix: str) -> set:
+        """Entry ids with a word starting with `prefix` (bounded by MAX_SCAN)."""
+        start = bisect_left(self.keys, prefix)
+        matched = set()
+        keys, entry_ids = self.keys, self.entry_ids
+        end = min(len(keys), start + MAX_SCAN)
+        for pos in range(start, end):
+            if not keys[pos].startswith(prefix):
+                break
+            matched.add(entry_ids[pos])
+        return matched
+
+    def search(self, prefix: str, entries: List[dict], limit: int) -> List[int]:
+        if len(prefix) <= PRECOMPUTED_PREFIX_LEN:
+            return self.top_by_prefix.get(prefix, [])
+        return heapq.nsmallest(limit, self.matching(prefix), key=lambda i: entries[i]['rank'])
+
+
+class TypeaheadIndex:
+    """Prefix index over homeowner snapshot records and community names."""
+
+    def __init__(self):
+        self.entries: Dict[str, List[dict]] = {t: [] for t in SUGGESTION_TYPES}
+        self.tables: Dict[str, _PrefixTable] = {t: _PrefixTable() for t in SUGGESTION_TYPES}
+        self.built_at = time.time()
+
+    @classmethod
+    def build(cls, records: Iterable[dict], popularity: Optional[Dict[str, int]] = None) -> 'TypeaheadIndex':
+        """
+        Build from Dataverse homeowner rows (cr258_owner_name,
+        cr258_property_address, cr258_assoc_name). `popularity` maps a
+        normalized search string to how often it was searched; each count
+        goes to the values that have a word starting with every token of
+        the string, so partial and reordered searches still rank them.
+        """
+        popularity = popularity or {}
+        index = cls()
+        seen: Dict[str, set] = {t: set() for t in SUGGESTION_TYPES}
+
+        def add(kind, text, subtext):
+            key = normalize_key(text)
+            if not key or key in seen[kind]:
+                return
+            seen[kind].add(key)
+            index.entries[kind].append({'key': key, 'text': text, 'subtext': subtext,
+                                        'popularity': 0})
+
+        for rec in records:
+            name = rec.get('cr258_owner_name')
+            address = rec.get('cr258_property_address')
+            community = rec.get('cr258_assoc_name')
+            if name:
+                add('person', name, address or '')
+            if address:
+                add('address', address, community or '')
+            if community:
+                add('community', community, 'Community')
+
+        for kind in SUGGESTION_TYPES:
+            entries = index.entries[kind]
+            table = index.tables[kind]
+            table.index(entries)
+            for query, count in popularity.items():
+                for entry_id in index._popular_matches(table, query):
+                    entries[entry_id]['popularity'] += count
+            # Most searched first, then shorter (closer) values, then alphabetical
+            for entry in entries:
+                entry['rank'] = (-entry['popularity'], len(entry['key']), entry['key'])
+            table.rank(entries, TYPE_LIMITS[kind])
+        return index
+
+    @staticmethod
+    def _popular_matches(table: _PrefixTable, query: str) -> set:
+        """Entry ids with a word start matching every token of a searched string."""
+        query = normalize_key(query)
+        if len(query) < MIN_POPULAR_QUERY_LEN:
+            return set()
+        matched = None
+        # Longest token first: it matches the fewest keys
+        for token in sorted(query.split(' '), key=len, reverse=True):
+            ids = table.matching(token)
+            matched = ids if matched is None else matched & ids
+            if not matched:
+                return set()
+        return matched
+
+    def suggest(self, query: str, include_addresses: bool = True) -> List[Tuple[str, dict]]:
+        """Return (type, entry) pairs for a query, persons then addresses then communities."""
+        prefix = normalize_key(query)
+        if not prefix:
+            return []
+        results = []
+        for kind in SUGGESTION_TYPES:
+            if kind == 'address' and not include_addresses:
+                continue
+            entries = self.entries[kind]
+            for entry_id in self.tables[kind].search(prefix, entries, TYPE_LIMITS[kind]):
+                results.append((kind, entries[entry_id]))
+        return results
+
+    def size(self) -> int:
+        """Number of distinct values indexed."""
+        return sum(len(v) for v in self.entries.values())
+
+    def age_seconds(self) -> float:
+        """Seconds since the index was built."""
+        return time.time() - self.built_at